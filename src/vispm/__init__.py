@@ -6,6 +6,15 @@ __version__ = "0.0.6.2"
 ## static presentors
 from .static.dotted import StaticDottedChartPresentor
 from .static.directed import DirectlyFollowsPresentor
+## batch rendering
+from .static.batch import RenderJob, RenderResult, render_batch
+## exporting
+from .static.export import SaveReport, save_hybrid
+## animated presentors
+from .animation.dotted import AnimatedDottedChartPresentor
+## running presentors
+from .running.dotted import RunningDottedChartPresentor
+from .running.sources import replay, feed_queue
 
 
 # Extensions
@@ -0,0 +1 @@
+from .dotted import AnimatedDottedChartPresentor
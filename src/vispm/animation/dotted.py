@@ -0,0 +1,185 @@
+from ..helpers.data.density import DensityAccumulator
+from ..static.dotted import StaticDottedChartPresentor, PLOT_STATE
+
+from typing import Any, List, Tuple, Union
+from os import PathLike
+import os
+
+import numpy as np
+
+from matplotlib.animation import FuncAnimation
+from matplotlib.artist import Artist
+from matplotlib.figure import Figure
+
+class AnimatedDottedChartPresentor(StaticDottedChartPresentor):
+    """
+    Presentor for an animated dotted chart, where events are revealed as a
+    sweep moves along the time axis of the chart.\n
+    The events are sorted by time once and the last event of each frame is
+    found with a binary search, so that each frame shows a slice of the
+    sorted events. In the density render mode only the events of a new
+    frame are added to the image, so each frame costs about the same
+    however many events have been revealed, which suits large logs.
+
+    Call sequence:
+    ---
+    To use presentor call the following methods:
+    ```
+    presentor = AnimatedDottedChartPresentor(log, frames=120)
+    animation = presentor.animate()
+    plt.show()
+    # or
+    presentor.save("dotted.gif")
+    ```
+
+    Parameters:
+    ----
+    event_log:`EventLog`\n
+    [Required] The log to plot, see StaticDottedChartPresentor.\n
+    \n
+    frames:`int=100`\n
+    [Optional] The number of frames in the sweep, the last frame shows every
+    event.\n
+    \n
+    interval:`int=40`\n
+    [Optional] The delay between frames in milliseconds.\n
+    \n
+    **options\n
+    [Optional] Keyword arguments for StaticDottedChartPresentor, where the
+    render_mode is either `points` or `density`.\n
+    """
+
+    def __init__(self, event_log:Any, frames:int=100, interval:int=40,
+                 **options:Any) -> None:
+        if frames < 1:
+            raise ValueError(f"Animation needs at least one frame :: given {frames}")
+        super().__init__(event_log, **options)
+        if self._render_mode == self.RenderMode.LevelOfDetail:
+            raise ValueError("Animated dotted charts can only be drawn as points or density.")
+        self._frames = frames
+        self._interval = interval
+        self._animation = None
+        self._sweep_data = None
+        self._sweep_line = None
+
+    def _compile_frame(self, sequences:Any) -> Tuple[np.ndarray,np.ndarray,np.ndarray,Union[float,np.ndarray]]:
+        # keep the compiled events for the sweep
+        self._sweep_data = super()._compile_frame(sequences)
+        return self._sweep_data
+
+    def plot(self) -> Figure:
+        super().plot()
+        self._prepare_sweep()
+        return self._fig
+
+    def _prepare_sweep(self) -> None:
+        """
+        Sorts the events by time and finds the events shown in each frame.
+        """
+        x_data, y_data, colors, sizes = self._sweep_data
+        order = np.argsort(x_data, kind="stable")
+        times = x_data[order]
+        self._sweep_x = times
+        self._sweep_y = y_data[order]
+        # the positions of the events, sliced for each frame of points
+        self._sweep_offsets = np.column_stack((self._sweep_x, self._sweep_y))
+        self._sweep_colors = np.asarray(colors)[order]
+        self._sweep_sizes = sizes[order] if np.ndim(sizes) > 0 else sizes
+        left, right = self._ax.get_xlim()
+        if len(times) > 0:
+            left, right = times[0], times[-1]
+        self._sweep_times = np.linspace(left, right, self._frames)
+        # the events up to the end of each frame
+        self._sweep_ends = np.searchsorted(times, self._sweep_times, side="right")
+        self._sweep_ends[-1] = len(times)
+        if self._sweep_line != None and self._sweep_line in self._ax.lines:
+            self._sweep_line.remove()
+        self._sweep_line = self._ax.axvline(left, color="grey", alpha=0.66,
+                                            linewidth=1)
+        self._sweep_frame = -1
+        self._sweep_layer = self._layers[-1]
+        self._sweep_density = None
+
+    def rerender(self, event_log:Any, log_name:str=None) -> Figure:
+        """
+        Replaces the log of the chart, see StaticDottedChartPresentor, and 
+        prepares the sweep over the events of the new log. An animation 
+        already returned by `animate` continues with the new sweep.
+        """
+        plotted = self._plot_state != PLOT_STATE.INIT and self._layers != None
+        super().rerender(event_log, log_name=log_name)
+        if plotted:
+            # plot prepares the sweep otherwise
+            self._prepare_sweep()
+        return self._fig
+
+    def _reset_density(self) -> None:
+        left, right, bottom, top = self._sweep_layer.get_extent()
+        self._sweep_density = DensityAccumulator((left, right, bottom, top),
+                                                 self._density_shape(self._ax),
+                                                 blend=self._density_blend)
+
+    def _draw_sweep(self, frame:int) -> List[Artist]:
+        """
+        Shows the events up to the end of the frame.
+        """
+        start = 0
+        if 0 <= self._sweep_frame <= frame:
+            start = self._sweep_ends[self._sweep_frame]
+        end = self._sweep_ends[frame] if frame >= 0 else 0
+        if self._render_mode == self.RenderMode.Density:
+            if self._sweep_density != None and \
+                self._sweep_density.shape != self._density_shape(self._ax):
+                # the axes were resized, so the revealed events are redrawn
+                start = 0
+            if start == 0 or self._sweep_density == None:
+                self._reset_density()
+            self._sweep_density.add(self._sweep_x[start:end],
+                                    self._sweep_y[start:end],
+                                    self._sweep_colors[start:end])
+            self._sweep_layer.set_data(self._sweep_density.image())
+        else:
+            self._sweep_layer.set_offsets(self._sweep_offsets[:end])
+            self._sweep_layer.set_facecolors(self._sweep_colors[:end])
+            if np.ndim(self._sweep_sizes) > 0:
+                self._sweep_layer.set_sizes(self._sweep_sizes[:end])
+        time = self._sweep_times[frame] if frame >= 0 else self._sweep_times[0]
+        self._sweep_line.set_xdata([time, time])
+        self._sweep_frame = frame
+        return [ self._sweep_layer, self._sweep_line ]
+
+    def animate(self, blit:bool=True, repeat:bool=True) -> FuncAnimation:
+        """
+        Returns the animation of the sweep, plotting the chart if needed.
+        When blitting, only the events and the sweep are redrawn for each
+        frame.
+        """
+        if self._plot_state == PLOT_STATE.INIT:
+            self.plot()
+        self._animation = FuncAnimation(
+            self._fig,
+            self._draw_sweep,
+            frames=self._frames,
+            init_func=lambda: self._draw_sweep(-1),
+            interval=self._interval,
+            blit=blit,
+            repeat=repeat
+        )
+        return self._animation
+
+    def save(self, path:Union[str,PathLike], fps:float=None, writer:Any=None,
+             dpi:float=None, **kwargs:Any) -> None:
+        """
+        Saves the animation through a matplotlib writer, e.g. as a GIF
+        (using pillow) or a MP4 (using ffmpeg). The writer is picked from the
+        suffix of the path when not given, and fps defaults to the interval
+        of the animation.
+        """
+        if self._animation == None:
+            self.animate()
+        if writer == None:
+            suffix = os.path.splitext(os.fspath(path))[1].lower()
+            writer = "pillow" if suffix in (".gif", ".webp") else "ffmpeg"
+        if fps == None:
+            fps = 1000.0 / self._interval
+        self._animation.save(path, writer=writer, fps=fps, dpi=dpi, **kwargs)
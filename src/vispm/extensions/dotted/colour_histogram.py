@@ -81,16 +81,16 @@ class DottedColourHistogramExtension(ChartExtension):
         else: 
             return ("yr", ( 60 * 60 * 24 * 365))
 
-    def draw(self, x_data:List[float], y_data:List[float], colors:List[Tuple[float,float,float,float]], colour_imputer:ColourImputer, *args, **kwags) -> Axes:
+    def draw(self, x_data:np.ndarray, y_data:np.ndarray, colors:np.ndarray, colour_imputer:ColourImputer, *args, **kwags) -> Axes:
         # set plot axis 
         self._debug("ploting histogram...")
-        plot_axis = x_data if self._bin_axes == self.PlotAxes.X else y_data
+        plot_axis = np.asarray(x_data if self._bin_axes == self.PlotAxes.X else y_data)
+        colors = np.asarray(colors).reshape(-1, 4)
 
         x_rects = [] 
         seen_colors = colour_imputer.get_seen_order()
         for color in  seen_colors:
-            x_subset = [ x for x,c in zip(plot_axis, colors) if c.__eq__(color)]
-            x_rects.append(x_subset)
+            x_rects.append(plot_axis[(colors == np.asarray(color)).all(axis=1)])
 
         if self._direction == self.Direction.EAST or self._direction == self.Direction.WEST:
             orientation = 'horizontal'
@@ -98,7 +98,15 @@ class DottedColourHistogramExtension(ChartExtension):
             orientation = 'vertical'
 
         # plot
-        n,bins,_ = self._axes.hist(x_rects, histtype='barstacked', bins=100, color=seen_colors, orientation=orientation)
+        # estimate the counts over time for the whole log when the chart is 
+        # sampled, each trace identifier is still counted as is
+        sample_rate = kwags.get("sample_rate", 1.0)
+        weights = None
+        count_label = "No. events"
+        if sample_rate < 1.0 and self._bin_axes == self.PlotAxes.X:
+            weights = [ np.full(len(rects), 1.0 / sample_rate) for rects in x_rects ]
+            count_label = "Est. no. events"
+        n,bins,_ = self._axes.hist(x_rects, histtype='barstacked', bins=100, color=seen_colors, orientation=orientation, weights=weights)
 
         tops = [ 
             max([ stack[i] for stack in n ])
@@ -124,12 +132,12 @@ class DottedColourHistogramExtension(ChartExtension):
         else:
             if orientation == 'horizontal':
                 self._axes.set_ylabel("time of event")
-                self._axes.set_xlabel("No. events")
+                self._axes.set_xlabel(count_label)
                 self._axes.set_xticks([0, count_mid, count_max])
                 self._axes.set_xlim(0, count_max)
             else:
                 self._axes.set_xlabel("time of event")
-                self._axes.set_ylabel("No. events")
+                self._axes.set_ylabel(count_label)
                 self._axes.set_yticks([0, count_mid, count_max])
                 self._axes.set_ylim(0, count_max)
         
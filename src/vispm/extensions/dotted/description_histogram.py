@@ -1,13 +1,14 @@
 from .._base import ChartExtension
 from ...static.dotted import StaticDottedChartPresentor
 from ...helpers.metaclasses.vispm import Presentor
-from ...helpers.data.log_data import SequenceData
+from ...helpers.data.log_data import SequenceData, SequenceTable
+from ...helpers.data.log_data import as_sequence_table
 from vispm.helpers.imputers.event_imputers import EventLabelImputer
 from ...helpers.colours.colourmaps import HIGH_CONTRAST_COOL
 
 DEFAULT_CM = HIGH_CONTRAST_COOL
 
-from typing import Any, Tuple, List
+from typing import Any, Tuple, List, Union
 from enum import Enum, auto
 
 import numpy as np
@@ -97,7 +98,7 @@ class DescriptionHistogramExtension(ChartExtension):
     def get_size(self) -> Tuple[float, float]:
         return self._size
 
-    def _create_bins(self, sequences:List[List[SequenceData]]) -> Tuple[List[List[float]], List[Tuple[float,float,float,float]], List[float], List[str]]:
+    def _create_bins(self, sequences:SequenceTable) -> Tuple[List[List[float]], List[Tuple[float,float,float,float]], List[float], List[str]]:
         if self._describe == self.Describe.EventLabel:
             return self._create_label_bins(sequences)
         elif self._describe == self.Describe.Monthday:
@@ -113,31 +114,27 @@ class DescriptionHistogramExtension(ChartExtension):
         else:
             raise ValueError(f"Description type not support :: {self._describe}")
 
-    def _create_hourly_bins(self, sequences:List[List[SequenceData]]) -> Tuple[List[List[float]], List[Tuple[float,float,float,float]], List[float], List[str]]:
-        bin_values= []
+    def _create_hourly_bins(self, sequences:SequenceTable) -> Tuple[List[List[float]], List[Tuple[float,float,float,float]], List[float], List[str]]:
         bin_edges= list(range(0,25))
         bin_labels=[]
         colours = []
         colour_maximun = 24
 
         self._colourmap = get_cmap(self._colormap, colour_maximun)
+        counts = self._count_values(sequences, sequences.hour, range(0,colour_maximun))
+        bin_values = [ hourly+0.5 for hourly in range(0,colour_maximun) ]
         for hourly,label in zip(range(0,colour_maximun), range(0,colour_maximun)):
-            if self._counter == self.Density.Event:
-                x_subset = [ hourly+0.5 for seq in sequences for s in seq if s.hour == hourly ]
-            elif self._counter ==self.Density.Trace:
-                x_subset = [ hourly+0.5 for seq in sequences if hourly in [ s.hour for s in seq] ]
-            bin_values = bin_values + x_subset
             colours.append(self._colormap(hourly/colour_maximun))
             bin_labels.append(label)
 
-        return bin_values, colours, bin_edges, bin_labels, colour_maximun 
+        return (bin_values, counts), colours, bin_edges, bin_labels, colour_maximun 
 
-    def _create_tlen_bins(self, sequences:List[List[SequenceData]]) -> Tuple[List[List[float]], List[Tuple[float,float,float,float]], List[float], List[str]]:
+    def _create_tlen_bins(self, sequences:SequenceTable) -> Tuple[List[List[float]], List[Tuple[float,float,float,float]], List[float], List[str]]:
         bin_values= []
         bin_labels=[]
         colours = []
 
-        durs = [ len(seq) for seq in sequences ]
+        durs = sequences.trace_lengths()
         min_edge = int(np.floor(min(durs)))
         max_edge = int(np.ceil(max(durs)))
         edge_dist = ((max_edge - min_edge)) /100
@@ -154,89 +151,69 @@ class DescriptionHistogramExtension(ChartExtension):
 
         return bin_values, colours, bin_edges, bin_labels, colour_maximun 
 
-    def _create_label_bins(self, sequences:List[List[SequenceData]]) -> Tuple[List[List[float]], List[Tuple[float,float,float,float]], List[float], List[str]]:
-        seen_activities = []
-        for seq in sequences:
-            activities = [ sa['act'] for sa in seen_activities]
-            seq_acts = [ s.label for s in seq ]
-            unique_acts =set(seq_acts)
-            for act in unique_acts:
-                places = [ i for i,s in enumerate(seq_acts) if s == act]
-                count = len(places)
-                if act not in activities:
-                    seen_activities.append({'act': act, 'count': count, 'place': sum(places)})
-                else:
-                    counter = [sa for sa in seen_activities if sa['act'] == act ][0]
-                    counter['count'] += count
-                    counter['place'] += sum(places)
+    def _create_label_bins(self, sequences:SequenceTable) -> Tuple[List[List[float]], List[Tuple[float,float,float,float]], List[float], List[str]]:
+        # summarise each activity by its count and likely place in a trace
+        num_labels = len(sequences.label_vocab)
+        counts = np.bincount(sequences.label, minlength=num_labels)
+        places = np.bincount(sequences.label, weights=sequences.positions(), minlength=num_labels)
+        seen = np.flatnonzero(counts)
+        seen = seen[np.lexsort((counts[seen], places[seen]/counts[seen]))]
 
         bin_values= []
         bin_edges= []
         bin_labels=[]
         colours = []
-        seen_activities = sorted(seen_activities, key=lambda x: (x['place']/x['count'],x['count']) )
-        max_spot = np.ceil(max([ sa['place'] / sa["count"] for sa in seen_activities ]))
+        max_spot = np.ceil(max(places[seen]/counts[seen]))
         self._labeler = EventLabelImputer(type=EventLabelImputer.IMPUTER_TYPE.find(self._imputer_type))
         self._colourmap = get_cmap(self._colormap, max_spot)
-        for index,sa in enumerate(seen_activities):
-            label = sa["act"]
+        bin_counts = self._count_values(sequences, sequences.label, seen)
+        for index,code in enumerate(seen):
+            label = sequences.label_vocab[code]
             bin_edges.append(index)
-            if self._counter == self.Density.Event:
-                x_subset = [ index+0.5 for seq in sequences for s in seq if s.label == label ]
-            elif self._counter ==self.Density.Trace:
-                x_subset = [ index+0.5 for seq in sequences if label in [ s.label for s in seq] ]
-            likely_place = sa['place'] / sa["count"]
+            likely_place = places[code] / counts[code]
             colours.append(self._colormap(likely_place/max_spot))
-            bin_values = bin_values + x_subset
+            bin_values.append(index+0.5)
             self._labeler.add_label(label)
             bin_labels.append(self._labeler.get_label(label))
-        bin_edges.append(len(seen_activities))
+        bin_edges.append(len(seen))
         self._debug(f"Event labels are imputed as :: {self._labeler._lookup}")
-        return bin_values, colours, bin_edges, bin_labels, max_spot
+        return (bin_values, bin_counts), colours, bin_edges, bin_labels, max_spot
 
-    def _create_monthday_bins(self, sequences:List[List[SequenceData]]) -> Tuple[List[List[float]], List[Tuple[float,float,float,float]]]:
-        bin_values= []
+    def _create_monthday_bins(self, sequences:SequenceTable) -> Tuple[List[List[float]], List[Tuple[float,float,float,float]]]:
         bin_edges= list(range(1,33))
         bin_labels=[]
         colours = []
         colour_maximun = 31
 
         self._colourmap = get_cmap(self._colormap, colour_maximun)
+        counts = self._count_values(sequences, sequences.monthday, range(1,32))
+        bin_values = [ monthday+0.5 for monthday in range(1,32) ]
         for monthday in range(1,32):
-            if self._counter == self.Density.Event:
-                x_subset = [ monthday+0.5 for seq in sequences for s in seq if s.monthday == monthday ]
-            elif self._counter ==self.Density.Trace:
-                x_subset = [ monthday+0.5 for seq in sequences if monthday in [ s.monthday for s in seq] ]
-            bin_values = bin_values + x_subset
             colours.append(self._colormap(monthday/colour_maximun))
             bin_labels.append(monthday)
 
-        return bin_values, colours, bin_edges, bin_labels, colour_maximun 
+        return (bin_values, counts), colours, bin_edges, bin_labels, colour_maximun 
 
-    def _create_weekday_bins(self, sequences:List[List[SequenceData]]) -> Tuple[List[List[float]], List[Tuple[float,float,float,float]]]:
-        bin_values= []
+    def _create_weekday_bins(self, sequences:SequenceTable) -> Tuple[List[List[float]], List[Tuple[float,float,float,float]]]:
         bin_edges= list(range(0,8))
         bin_labels=[]
         colours = []
         colour_maximun = 7
 
         self._colourmap = get_cmap(self._colormap, colour_maximun)
+        counts = self._count_values(sequences, sequences.weekday, range(0,7))
+        bin_values = [ day+0.5 for day in range(0,7) ]
         for day,label in zip(range(0,7), ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]):
-            if self._counter == self.Density.Event:
-                x_subset = [ day+0.5 for seq in sequences for s in seq if s.weekday == day ]
-            elif self._counter ==self.Density.Trace:
-                x_subset = [ day+0.5 for seq in sequences if day in [ s.weekday for s in seq] ]
-            bin_values = bin_values + x_subset
             colours.append(self._colormap(day/colour_maximun))
             bin_labels.append(label)
 
 
-        return bin_values, colours, bin_edges, bin_labels, colour_maximun 
+        return (bin_values, counts), colours, bin_edges, bin_labels, colour_maximun 
 
-    def _create_tdur_bins(self, sequences:List[List[SequenceData]]) -> Tuple[List[List[float]], List[Tuple[float,float,float,float]]]:
+    def _create_tdur_bins(self, sequences:SequenceTable) -> Tuple[List[List[float]], List[Tuple[float,float,float,float]]]:
         bin_values= []
 
-        durs = [ seq[-1].time - seq[0].time for seq in sequences ]
+        durs = sequences.last_times() - sequences.first_times()
         min_edge = int(np.floor(min(durs)))
         max_edge = int(np.ceil(max(durs)))
         scale_unit,scale = self._find_scale(max_edge - min_edge)
@@ -256,6 +233,20 @@ class DescriptionHistogramExtension(ChartExtension):
             
         return bin_values, scale, bin_edges, scale_unit, colour_maximun 
 
+    def _count_values(self, sequences:SequenceTable, column:np.ndarray, values:List[int]) -> List[int]:
+        """
+        Counts the events (or traces) that have each of the given values in 
+        the column, depending on the density of this extension.
+        """
+        if self._counter == self.Density.Trace:
+            # count each trace at most once per value
+            traces = sequences.trace_index()
+            pairs = np.unique(np.stack([traces, column.astype(np.int64)]), axis=1)
+            column = pairs[1]
+        found, found_counts = np.unique(column, return_counts=True)
+        lookup = dict(zip(found.tolist(), found_counts.tolist()))
+        return [ lookup.get(int(v), 0) for v in values ]
+
     def _find_scale(self, seconds:float) -> Tuple[str,float]:
         if seconds < (60 * 3):
             return ("minutes" , 60)
@@ -266,8 +257,9 @@ class DescriptionHistogramExtension(ChartExtension):
         else: 
             return ("years", ( 60 * 60 * 24 * 365))
 
-    def draw(self, sequences:List[List[SequenceData]], *args, **kwags) -> Axes:
+    def draw(self, sequences:Union[SequenceTable,List[List[SequenceData]]], *args, **kwags) -> Axes:
         self._debug("plotting histogram")
+        sequences = as_sequence_table(sequences)
         # compute bin edges
         if self._describe == self.Describe.TraceDuration:
             bin_values, scale, bin_edges, scale_unit, colour_maximun = self._create_bins(sequences)
@@ -281,7 +273,19 @@ class DescriptionHistogramExtension(ChartExtension):
         # determine rwidth
         rwidth = 0.85
         # plot histogram
-        n,_,rects = self._axes.hist(bin_values, bins=bin_edges, orientation=orientation,rwidth=rwidth)
+        # estimate the counts for the whole log when the chart is sampled
+        sample_rate = kwags.get("sample_rate", 1.0)
+        weights = None
+        if isinstance(bin_values, tuple):
+            # counted bins are drawn as one weighted value per bin
+            bin_values, weights = bin_values
+            weights = np.asarray(weights, dtype=np.float64)
+        if sample_rate < 1.0:
+            if isinstance(weights, np.ndarray):
+                weights = weights / sample_rate
+            else:
+                weights = np.full(len(bin_values), 1.0 / sample_rate)
+        n,_,rects = self._axes.hist(bin_values, bins=bin_edges, orientation=orientation,rwidth=rwidth,weights=weights)
         dist = max(n)
         portion = dist / 10 
         tickers = [0] + [int(1 + portion*i) for i in range(1,10) ] + [int(max(n))]
@@ -380,6 +384,8 @@ class DescriptionHistogramExtension(ChartExtension):
             height_label = "No. of events"
         else:
             height_label = "No. of traces"
+        if sample_rate < 1.0:
+            height_label = f"Est. {height_label.lower()}"
 
         #add bin label
         bin_label = ""
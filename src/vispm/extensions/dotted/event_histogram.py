@@ -1,12 +1,13 @@
 from vispm.helpers.imputers.event_imputers import EventLabelImputer
 from .._base import ChartExtension
-from ...helpers.data.log_data import SequenceData
+from ...helpers.data.log_data import SequenceData, SequenceTable
+from ...helpers.data.log_data import as_sequence_table
 from ...helpers.metaclasses.vispm import Presentor
 from ...static.dotted import StaticDottedChartPresentor
 from ...helpers.imputers.colour_imputers import EventLabelColourer
 from ...helpers.colours.colourmaps import HIGH_CONTRAST_WARM
 
-from typing import Any, Tuple, List
+from typing import Any, Tuple, List, Union
 from enum import Enum, auto
 
 import numpy as np
@@ -92,44 +93,35 @@ class DottedEventHistogramExtension(ChartExtension):
         else: 
             return ("yr", ( 60 * 60 * 24 * 365))
 
-    def draw(self,x_data:List[float], y_data:List[float],sequences:List[List[SequenceData]], *args, **kwags) -> Axes:
+    def draw(self,x_data:np.ndarray, y_data:np.ndarray,sequences:Union[SequenceTable,List[List[SequenceData]]], *args, **kwags) -> Axes:
         # set plot axis 
         self._debug("ploting histogram...")
-        plot_axis = x_data if self._bin_axes == self.PlotAxes.X else y_data
-        copy_sequences = [ s for seq in sequences for s in seq]
+        sequences = as_sequence_table(sequences)
+        plot_axis = np.asarray(x_data if self._bin_axes == self.PlotAxes.X else y_data)
 
-        seen_activities = []
-        for seq in sequences:
-            activities = [ sa['act'] for sa in seen_activities]
-            seq_acts = [ s.label for s in seq ]
-            unique_acts =set(seq_acts)
-            for act in unique_acts:
-                places = [ i for i,s in enumerate(seq_acts) if s == act]
-                count = len(places)
-                if act not in activities:
-                    seen_activities.append({'act': act, 'count': count, 'place': sum(places)})
-                else:
-                    counter = [sa for sa in seen_activities if sa['act'] == act ][0]
-                    counter['count'] += count
-                    counter['place'] += sum(places)
+        # summarise each activity by its count and likely place in a trace
+        num_labels = len(sequences.label_vocab)
+        counts = np.bincount(sequences.label, minlength=num_labels)
+        places = np.bincount(sequences.label, weights=sequences.positions(), minlength=num_labels)
+        seen = np.flatnonzero(counts)
+        seen = seen[np.lexsort((counts[seen], places[seen]/counts[seen]))]
 
         x_rects = []
         colours = []
-        seen_activities = sorted(seen_activities, key=lambda x: (x['place']/x['count'],x['count']) )
         
         # try looking up the cmap and resetting length otherwise use as is.
         try:
-            self._colourer._set_cm(get_cmap(self._colourmap, len(seen_activities))) 
+            self._colourer._set_cm(get_cmap(self._colourmap, len(seen))) 
         except:
             self._colourer._set_cm(self._colourmap)
         
-        for sa in seen_activities:
-            label = sa["act"]
-            x_subset = [ (x,c) for x,c in zip(plot_axis, copy_sequences) if c.label == label ]
-            x_rects.append([ x for x,c in x_subset])
-            colours.append(self._colourer([x_subset[0][1]])[0])
+        seen_activities = []
+        for code in seen:
+            label = sequences.label_vocab[code]
+            x_rects.append(plot_axis[sequences.label == code])
+            colours.append(self._colourer._colour_for_key(label))
             self._event_mapper.add_label(label)
-            sa['act'] = self._event_mapper.get_label(label)
+            seen_activities.append({'act': self._event_mapper.get_label(label)})
 
         # display event imputing for debugging
         self._debug(f"Event labels are imputed as :: {self._event_mapper._lookup}")
@@ -140,7 +132,15 @@ class DottedEventHistogramExtension(ChartExtension):
             orientation = 'vertical'
 
         # plot
-        n,bins,_ = self._axes.hist(x_rects, histtype='barstacked', bins=100, color=colours, orientation=orientation)
+        # estimate the counts over time for the whole log when the chart is 
+        # sampled, each trace identifier is still counted as is
+        sample_rate = kwags.get("sample_rate", 1.0)
+        weights = None
+        count_label = "No. events"
+        if sample_rate < 1.0 and self._bin_axes == self.PlotAxes.X:
+            weights = [ np.full(len(rects), 1.0 / sample_rate) for rects in x_rects ]
+            count_label = "Est. no. events"
+        n,bins,_ = self._axes.hist(x_rects, histtype='barstacked', bins=100, color=colours, orientation=orientation, weights=weights)
         
         # handle colour bar for event labels
         divider = make_axes_locatable(self._axes)
@@ -189,12 +189,12 @@ class DottedEventHistogramExtension(ChartExtension):
         else:
             if orientation == 'horizontal':
                 self._axes.set_ylabel("time of event")
-                self._axes.set_xlabel("No. events")
+                self._axes.set_xlabel(count_label)
                 self._axes.set_xticks([0, count_mid, count_max])
                 self._axes.set_xlim(0, count_max)
             else:
                 self._axes.set_xlabel("time of event")
-                self._axes.set_ylabel("No. events")
+                self._axes.set_ylabel(count_label)
                 self._axes.set_yticks([0, count_mid, count_max])
                 self._axes.set_ylim(0, count_max)
         
@@ -0,0 +1,220 @@
+"""
+Aggregating events to a grid of pixels, so that charts of very large logs can
+be drawn as a single image rather than a marker per event.
+"""
+from typing import Tuple
+
+import numpy as np
+
+def density_image(x:np.ndarray, y:np.ndarray, colors:np.ndarray,
+                  extent:Tuple[float,float,float,float],
+                  shape:Tuple[int,int], blend:bool=True) -> np.ndarray:
+    """
+    Returns an RGBA image of the given shape (rows, columns), with the lowest
+    row first, where each pixel covers a cell of the extent (left, right,
+    bottom, top). Events outside of the extent are skipped.\n
+    When blend is true, a pixel has the mean colour of its events, otherwise
+    it has the most common colour of its events. The opacity of a pixel
+    grows with the number of its events on a log scale, pixels without
+    events are transparent.
+    """
+    rows, cols = shape
+    left, right, bottom, top = extent
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    colors = np.asarray(colors, dtype=np.float64).reshape(-1, 4)
+    inside = (x >= left) & (x <= right) & (y >= bottom) & (y <= top)
+    if not inside.all():
+        x, y, colors = x[inside], y[inside], colors[inside]
+    width = (right - left) if right > left else 1.0
+    height = (top - bottom) if top > bottom else 1.0
+    column = np.minimum(((x - left) / width * cols).astype(np.int64), cols - 1)
+    row = np.minimum(((y - bottom) / height * rows).astype(np.int64), rows - 1)
+    pixel = row * cols + column
+    size = rows * cols
+    counts = np.bincount(pixel, minlength=size)
+    image = np.zeros((size, 4), dtype=np.float64)
+    filled = counts > 0
+    if not filled.any():
+        return image.reshape(rows, cols, 4)
+    if blend:
+        for channel in range(3):
+            image[filled, channel] = np.bincount(
+                pixel, weights=colors[:, channel], minlength=size
+            )[filled] / counts[filled]
+    else:
+        palette, category = np.unique(colors[:, :3], axis=0, return_inverse=True)
+        category = category.reshape(-1)
+        # count each colour in each pixel, then keep the most common
+        keys, found = np.unique(pixel * len(palette) + category, return_counts=True)
+        pixels, categories = keys // len(palette), keys % len(palette)
+        order = np.lexsort((-found, pixels))
+        firsts = order[np.r_[True, pixels[order][1:] != pixels[order][:-1]]]
+        image[pixels[firsts], :3] = palette[categories[firsts]]
+    image[filled, 3] = 0.35 + 0.65 * np.log1p(counts[filled]) / np.log1p(counts.max())
+    return image.reshape(rows, cols, 4)
+
+class DensityAccumulator():
+    """
+    Builds the image of density_image over batches of events, where adding
+    a batch only costs its own events and making the image only costs the 
+    pixels, e.g. to reveal events over the frames of an animation.\n
+
+    Parameters:
+    ----
+    extent:`Tuple[float,float,float,float]`\n
+    [Required] The (left, right, bottom, top) covered by the image.\n
+    \n
+    shape:`Tuple[int,int]`\n
+    [Required] The (rows, columns) of the image.\n
+    \n
+    blend:`bool=True`\n
+    [Optional] Sets whether a pixel has the mean colour of its events, or 
+    the most common colour of its events. Colours are told apart by their
+    8-bit RGB values when not blending.\n
+    """
+
+    def __init__(self, extent:Tuple[float,float,float,float],
+                 shape:Tuple[int,int], blend:bool=True) -> None:
+        self._extent = extent
+        self._shape = shape
+        self._blend = blend
+        size = shape[0] * shape[1]
+        self._counts = np.zeros(size, dtype=np.int64)
+        # blending keeps the sum of each channel, otherwise the count of 
+        # each colour seen so far
+        self._sums = np.zeros((size, 3), dtype=np.float64)
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._votes = np.zeros((size, 0), dtype=np.int32)
+
+    @property
+    def shape(self) -> Tuple[int,int]:
+        return self._shape
+
+    def _pixels(self, x:np.ndarray, y:np.ndarray) -> Tuple[np.ndarray,np.ndarray]:
+        rows, cols = self._shape
+        left, right, bottom, top = self._extent
+        inside = (x >= left) & (x <= right) & (y >= bottom) & (y <= top)
+        width = (right - left) if right > left else 1.0
+        height = (top - bottom) if top > bottom else 1.0
+        column = np.minimum(((x[inside] - left) / width * cols).astype(np.int64), cols - 1)
+        row = np.minimum(((y[inside] - bottom) / height * rows).astype(np.int64), rows - 1)
+        return row * cols + column, inside
+
+    def add(self, x:np.ndarray, y:np.ndarray, colors:np.ndarray) -> None:
+        """
+        Adds a batch of events, events outside of the extent are skipped.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        colors = np.asarray(colors, dtype=np.float64).reshape(-1, 4)
+        pixel, inside = self._pixels(x, y)
+        colors = colors[inside]
+        size = len(self._counts)
+        self._counts += np.bincount(pixel, minlength=size)
+        if self._blend:
+            for channel in range(3):
+                self._sums[:, channel] += np.bincount(
+                    pixel, weights=colors[:, channel], minlength=size)
+            return
+        rgb = np.rint(colors[:, :3] * 255).astype(np.int64)
+        keys = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+        found = np.unique(keys)
+        new = found[~np.isin(found, self._keys)]
+        if len(new) > 0:
+            # keep the colours sorted, so that ties go to the same colour as
+            # in density_image
+            merged = np.union1d(self._keys, new)
+            votes = np.zeros((size, len(merged)), dtype=np.int32)
+            votes[:, np.searchsorted(merged, self._keys)] = self._votes
+            self._keys, self._votes = merged, votes
+        category = np.searchsorted(self._keys, keys)
+        np.add.at(self._votes, (pixel, category), 1)
+
+    def image(self) -> np.ndarray:
+        """
+        Returns the RGBA image of the events added so far, with the lowest 
+        row first.
+        """
+        rows, cols = self._shape
+        image = np.zeros((len(self._counts), 4), dtype=np.float64)
+        filled = self._counts > 0
+        if not filled.any():
+            return image.reshape(rows, cols, 4)
+        counts = self._counts[filled]
+        if self._blend:
+            image[filled, :3] = self._sums[filled] / counts[:, None]
+        else:
+            best = self._keys[self._votes[filled].argmax(axis=1)]
+            image[filled, 0] = (best >> 16) & 255
+            image[filled, 1] = (best >> 8) & 255
+            image[filled, 2] = best & 255
+            image[filled, :3] /= 255
+        image[filled, 3] = 0.35 + 0.65 * np.log1p(counts) / np.log1p(counts.max())
+        return image.reshape(rows, cols, 4)
+
+class DetailIndex():
+    """
+    Sorted views of the positions of events, so that the events within a 
+    region of a chart can be found with a binary search on each axis rather
+    than a scan over every event.\n
+
+    Parameters:
+    ----
+    x:`np.ndarray`\n
+    [Required] The x position of each event.\n
+    \n
+    y:`np.ndarray`\n
+    [Required] The y position of each event.\n
+    """
+
+    def __init__(self, x:np.ndarray, y:np.ndarray) -> None:
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self._by_x, self._xs = self._sorted(self.x)
+        self._by_y, self._ys = self._sorted(self.y)
+
+    def _sorted(self, values:np.ndarray) -> Tuple[np.ndarray,np.ndarray]:
+        # events are already in row order, so y is usually sorted
+        if len(values) < 2 or (values[1:] >= values[:-1]).all():
+            return None, values
+        order = np.argsort(values, kind="stable")
+        return order, values[order]
+
+    def bounds(self, xlim:Tuple[float,float], 
+               ylim:Tuple[float,float]) -> Tuple[int,int,int,int]:
+        """
+        Returns where the limits fall in the sorted positions of each axis,
+        limits with the same bounds have the same events within them.
+        """
+        left, right = sorted(xlim)
+        bottom, top = sorted(ylim)
+        return (
+            int(np.searchsorted(self._xs, left, side="left")),
+            int(np.searchsorted(self._xs, right, side="right")),
+            int(np.searchsorted(self._ys, bottom, side="left")),
+            int(np.searchsorted(self._ys, top, side="right"))
+        )
+
+    def _take(self, order:np.ndarray, start:int, end:int) -> np.ndarray:
+        if order is None:
+            return np.arange(start, end, dtype=np.int64)
+        return order[start:end]
+
+    def visible(self, xlim:Tuple[float,float], 
+                ylim:Tuple[float,float]) -> np.ndarray:
+        """
+        Returns the (sorted) indices of the events within the limits.
+        """
+        left, right = sorted(xlim)
+        bottom, top = sorted(ylim)
+        x_start, x_end, y_start, y_end = self.bounds(xlim, ylim)
+        # search the narrower axis, then check the other axis of the events
+        # found
+        if x_end - x_start < y_end - y_start:
+            found = self._take(self._by_x, x_start, x_end)
+            found = found[(self.y[found] >= bottom) & (self.y[found] <= top)]
+        else:
+            found = self._take(self._by_y, y_start, y_end)
+            found = found[(self.x[found] >= left) & (self.x[found] <= right)]
+        return np.sort(found)
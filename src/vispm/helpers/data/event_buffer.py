@@ -0,0 +1,108 @@
+"""
+Growable columns for events that arrive over time, e.g. from a live case
+stream. Capacity is allocated ahead of the events and doubled when full, so
+that appending a batch of events is a single array copy.\n
+With a window, the columns become a ring buffer that keeps only the latest
+events, so that memory stays bounded while monitoring.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+class EventBuffer():
+    """
+    Columns of the time, row and colour of events, in preallocated arrays.\n
+
+    Parameters:
+    ----
+    capacity:`int=4096`\n
+    [Optional] The number of events to allocate for at first.\n
+    \n
+    window:`int=None`\n
+    [Optional] The most events to keep, when more events are added the
+    oldest events are overwritten.\n
+    """
+
+    def __init__(self, capacity:int=4096, window:Optional[int]=None) -> None:
+        if window != None and window < 1:
+            raise ValueError(f"Buffer window must be at least one :: given {window}")
+        capacity = max(int(capacity), 1)
+        if window != None:
+            capacity = min(capacity, window)
+        self._window = window
+        self._size = 0
+        self._next = 0
+        self._total = 0
+        self.time = np.zeros(capacity, dtype=np.float64)
+        self.row = np.zeros(capacity, dtype=np.int64)
+        self.colors = np.zeros((capacity, 4), dtype=np.float64)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self.time)
+
+    @property
+    def total(self) -> int:
+        """
+        The number of events added, including those overwritten.
+        """
+        return self._total
+
+    @property
+    def window(self) -> Optional[int]:
+        return self._window
+
+    def _grow(self, needed:int) -> None:
+        capacity = max(self.capacity * 2, needed)
+        if self._window != None:
+            capacity = min(capacity, self._window)
+        for name in ("time", "row", "colors"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def extend(self, time:np.ndarray, row:np.ndarray, colors:np.ndarray) -> None:
+        """
+        Adds a batch of events, in the order they arrived.
+        """
+        time = np.asarray(time, dtype=np.float64)
+        count = len(time)
+        self._total += count
+        if count == 0:
+            return
+        row = np.asarray(row, dtype=np.int64)
+        colors = np.asarray(colors, dtype=np.float64).reshape(-1, 4)
+        if self._window != None and count > self._window:
+            # only the latest events of the batch fit
+            time, row, colors = time[-self._window:], row[-self._window:], colors[-self._window:]
+            count = self._window
+        # fill the free space first
+        free = count
+        if self._window != None:
+            free = min(count, self._window - self._size)
+        if free > 0:
+            if self._size + free > self.capacity:
+                self._grow(self._size + free)
+            end = self._size + free
+            self.time[self._size:end] = time[:free]
+            self.row[self._size:end] = row[:free]
+            self.colors[self._size:end] = colors[:free]
+            self._size = end
+        if free < count:
+            # then overwrite the oldest events
+            places = (self._next + np.arange(count - free)) % self._window
+            self.time[places] = time[free:]
+            self.row[places] = row[free:]
+            self.colors[places] = colors[free:]
+            self._next = int(places[-1] + 1) % self._window
+
+    def columns(self) -> Tuple[np.ndarray,np.ndarray,np.ndarray]:
+        """
+        Returns views of the time, row and colour of the kept events. Once a
+        window is full, the events are not in the order they arrived.
+        """
+        return self.time[:self._size], self.row[:self._size], self.colors[:self._size]
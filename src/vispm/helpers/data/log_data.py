@@ -1,11 +1,537 @@
 
 from dataclasses import dataclass
+from array import array
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
 @dataclass(frozen=True)
 class SequenceData():
     time:float
     weekday:int
-    monthday:int 
+    monthday:int
     hour:int
     label:str
     lifecycle:str
-    resource:str
\ No newline at end of file
+    resource:str
+
+@dataclass(frozen=True)
+class ExtractionInfo():
+    """
+    How a SequenceTable was extracted, i.e. the names of the trace sorting 
+    and timestamp transform used, the origin (as seconds) that event 
+    times were made relative to (None if there was no common origin), and
+    the case attribute or activity that traces were sorted by (if any).
+    The sample_rate is the fraction of traces that were kept when the log
+    was sampled.
+    """
+    sorting:str
+    time_transform:str
+    origin:Optional[float] = None
+    sort_by:Optional[str] = None
+    sample_rate:float = 1.0
+
+class TraceView(Sequence):
+    """
+    A thin row-view over a single trace within a SequenceTable. Indexing
+    or iterating over the view returns SequenceData for each event, so code
+    written for a list of SequenceData continues to work. The columns for
+    the trace are also available as array slices (no copies are made).
+    """
+
+    def __init__(self, table:'SequenceTable', trace_no:int) -> None:
+        self._table = table
+        self._start = int(table.offsets[trace_no])
+        self._end = int(table.offsets[trace_no+1])
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __getitem__(self, idx:Union[int,slice]) -> Union[SequenceData,List[SequenceData]]:
+        if isinstance(idx, slice):
+            return [ self[i] for i in range(*idx.indices(len(self))) ]
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError("trace view index out of range")
+        return self._table.row(self._start + idx)
+
+    @property
+    def table(self) -> 'SequenceTable':
+        return self._table
+
+    @property
+    def time(self) -> np.ndarray:
+        return self._table.time[self._start:self._end]
+
+    @property
+    def label(self) -> np.ndarray:
+        return self._table.label[self._start:self._end]
+
+    @property
+    def lifecycle(self) -> np.ndarray:
+        return self._table.lifecycle[self._start:self._end]
+
+    @property
+    def resource(self) -> np.ndarray:
+        return self._table.resource[self._start:self._end]
+
+class SequenceTable(Sequence):
+    """
+    A columnar form of the sequence data extracted from an event log.\n
+    Events are stored trace after trace in flat numpy arrays, where the
+    events of the i-th trace are found between offsets[i] and offsets[i+1].
+    Labels, lifecycles and resources are stored as integer codes into the
+    vocabularies (`label_vocab`, `lifecycle_vocab`, `resource_vocab`).\n
+    The instant of each event is kept in `timestamp` (seconds since the 
+    epoch in UTC, NaN when missing) with the offset of its wall clock from
+    UTC in `utc_offset`. The calendar fields `weekday`, `monthday` and 
+    `hour` are derived from these on first use and then cached, they are
+    -1 for events without a timestamp.\n
+    Indexing the table returns a TraceView, which keeps code that iterates
+    over List[List[SequenceData]] working.\n
+    Tables returned by the SequenceDataExtractor carry an ExtractionInfo in
+    `extraction`, which allows new traces to be appended in sort order.\n
+    Case attributes kept during extraction are found in `attributes`, which
+    maps each attribute to a list with a value (or None) for each trace.
+    """
+
+    CALENDAR = ("weekday", "monthday", "hour")
+    FREQUENCY = "variant:frequency"
+
+    def __init__(self, time:np.ndarray, timestamp:np.ndarray,
+                 utc_offset:np.ndarray, label:np.ndarray,
+                 lifecycle:np.ndarray, resource:np.ndarray,
+                 offsets:np.ndarray, label_vocab:List[str],
+                 lifecycle_vocab:List[str], resource_vocab:List[str],
+                 extraction:ExtractionInfo=None,
+                 calendar:Dict[str,np.ndarray]=None,
+                 attributes:Dict[str,List[Any]]=None) -> None:
+        self.time = np.asarray(time, dtype=np.float64)
+        self.timestamp = np.asarray(timestamp, dtype=np.float64)
+        self.utc_offset = np.asarray(utc_offset, dtype=np.int32)
+        self.label = np.asarray(label, dtype=np.int32)
+        self.lifecycle = np.asarray(lifecycle, dtype=np.int32)
+        self.resource = np.asarray(resource, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.label_vocab = list(label_vocab)
+        self.lifecycle_vocab = list(lifecycle_vocab)
+        self.resource_vocab = list(resource_vocab)
+        self.extraction = extraction
+        self.attributes:Dict[str,List[Any]] = dict()
+        if attributes != None:
+            for key, values in attributes.items():
+                self.attributes[key] = list(values)
+        self._calendar:Dict[str,np.ndarray] = dict()
+        if calendar != None:
+            for name in self.CALENDAR:
+                self._calendar[name] = np.asarray(calendar[name], dtype=np.int8)
+
+    # data model functions
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx:Union[int,slice]) -> Union[TraceView,List[TraceView]]:
+        if isinstance(idx, slice):
+            return [ self[i] for i in range(*idx.indices(len(self))) ]
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError("sequence table index out of range")
+        return TraceView(self, idx)
+
+    def __iter__(self) -> Iterator[TraceView]:
+        for i in range(len(self)):
+            yield TraceView(self, i)
+
+    # accessors
+    @property
+    def num_events(self) -> int:
+        return len(self.time)
+
+    def stamps(self) -> np.ndarray:
+        """
+        Returns the timestamp of each event as datetime64[us] in UTC, with 
+        NaT for events without a timestamp.
+        """
+        missing = np.isnan(self.timestamp)
+        micros = np.round(np.where(missing, 0.0, self.timestamp) * 1e6).astype(np.int64)
+        stamps = micros.view("datetime64[us]")
+        stamps[missing] = np.datetime64("NaT")
+        return stamps
+
+    def _compute_calendar(self) -> None:
+        # the wall clock time of each event, as days and time of day
+        wall = self.stamps() + self.utc_offset.astype("timedelta64[s]")
+        missing = np.isnat(wall)
+        days = wall.astype("datetime64[D]")
+        # 1970-01-01 was a Thursday, i.e. weekday 3
+        weekday = (days.view(np.int64) + 3) % 7
+        monthday = (days - days.astype("datetime64[M]")).astype(np.int64) + 1
+        hour = (wall - days).astype("timedelta64[h]").astype(np.int64)
+        for name, values in zip(self.CALENDAR, (weekday, monthday, hour)):
+            values[missing] = -1
+            self._calendar[name] = values.astype(np.int8)
+
+    def _calendar_column(self, name:str) -> np.ndarray:
+        if not name in self._calendar:
+            self._compute_calendar()
+        return self._calendar[name]
+
+    @property
+    def weekday(self) -> np.ndarray:
+        """
+        The day of the week (Monday is 0) of each event.
+        """
+        return self._calendar_column("weekday")
+
+    @property
+    def monthday(self) -> np.ndarray:
+        """
+        The day of the month of each event.
+        """
+        return self._calendar_column("monthday")
+
+    @property
+    def hour(self) -> np.ndarray:
+        """
+        The hour of the day of each event.
+        """
+        return self._calendar_column("hour")
+
+    def row(self, event_no:int) -> SequenceData:
+        """
+        Returns the event at the given (flat) position as SequenceData.
+        """
+        return SequenceData(
+            float(self.time[event_no]),
+            int(self.weekday[event_no]),
+            int(self.monthday[event_no]),
+            int(self.hour[event_no]),
+            self.label_vocab[self.label[event_no]],
+            self.lifecycle_vocab[self.lifecycle[event_no]],
+            self.resource_vocab[self.resource[event_no]],
+        )
+
+    def trace_lengths(self) -> np.ndarray:
+        """
+        Returns the number of events in each trace.
+        """
+        return np.diff(self.offsets)
+
+    def trace_index(self) -> np.ndarray:
+        """
+        Returns the trace number of each event in the table.
+        """
+        return np.repeat(np.arange(len(self)), self.trace_lengths())
+
+    def positions(self) -> np.ndarray:
+        """
+        Returns the position of each event within its trace.
+        """
+        return np.arange(self.num_events, dtype=np.int64) \
+               - np.repeat(self.offsets[:-1], self.trace_lengths())
+
+    def vocab(self, column:str) -> List[str]:
+        """
+        Returns the vocabulary for a coded column, i.e. label, lifecycle or 
+        resource.
+        """
+        return getattr(self, f"{column}_vocab")
+
+    def first_times(self, default:float=0.0) -> np.ndarray:
+        """
+        Returns the time of the first event for each trace, using the given
+        default for empty traces.
+        """
+        lengths = self.trace_lengths()
+        firsts = np.full(len(self), default, dtype=np.float64)
+        filled = lengths > 0
+        firsts[filled] = self.time[self.offsets[:-1][filled]]
+        return firsts
+
+    def last_times(self, default:float=0.0) -> np.ndarray:
+        """
+        Returns the time of the last event for each trace, using the given
+        default for empty traces.
+        """
+        lengths = self.trace_lengths()
+        lasts = np.full(len(self), default, dtype=np.float64)
+        filled = lengths > 0
+        lasts[filled] = self.time[self.offsets[1:][filled] - 1]
+        return lasts
+
+    def variants(self) -> Tuple[np.ndarray,np.ndarray]:
+        """
+        Returns the variant (sequence of labels) of each trace, as an index
+        in order of first appearance, and the number of traces of each 
+        variant (counting the traces that each row stands for in a 
+        collapsed table).
+        """
+        seen:Dict[bytes,int] = dict()
+        label = self.label
+        offsets = self.offsets.tolist()
+        variant = np.array([
+            seen.setdefault(label[start:end].tobytes(), len(seen))
+            for start, end in zip(offsets[:-1], offsets[1:])
+        ], dtype=np.int64)
+        if self.collapsed:
+            counts = np.bincount(variant, weights=self.frequencies(), 
+                                 minlength=len(seen))
+            return variant, counts.astype(np.int64)
+        return variant, np.bincount(variant, minlength=len(seen))
+
+    @property
+    def collapsed(self) -> bool:
+        """
+        Whether each trace of this table stands for all the traces of its
+        variant, see collapse_variants.
+        """
+        return self.FREQUENCY in self.attributes
+
+    def frequencies(self) -> np.ndarray:
+        """
+        Returns the number of traces that each trace of this table stands 
+        for, which is one unless the table is collapsed.
+        """
+        if self.collapsed:
+            return np.asarray(self.attributes[self.FREQUENCY], dtype=np.int64)
+        return np.ones(len(self), dtype=np.int64)
+
+    def collapse_variants(self) -> 'SequenceTable':
+        """
+        Returns a table with one trace per variant, the first trace of each
+        variant in this table, where the number of traces of each variant
+        is kept in the attributes under FREQUENCY.
+        """
+        variant, counts = self.variants()
+        _, firsts = np.unique(variant, return_index=True)
+        table = self.take(firsts)
+        table.attributes[self.FREQUENCY] = counts.tolist()
+        table.extraction = self.extraction
+        return table
+
+    def take(self, order:np.ndarray) -> 'SequenceTable':
+        """
+        Returns a new table with traces arranged by the given order, i.e.
+        the i-th trace of the new table is trace order[i] of this table.
+        """
+        order = np.asarray(order, dtype=np.int64)
+        lengths = self.trace_lengths()[order]
+        offsets = np.zeros(len(order)+1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # gather event positions for each trace in the new order
+        starts = self.offsets[:-1][order]
+        events = np.repeat(starts - offsets[:-1], lengths) \
+                 + np.arange(offsets[-1], dtype=np.int64)
+        calendar = None
+        if len(self._calendar) > 0:
+            calendar = { 
+                name : values[events] 
+                for name, values in self._calendar.items() 
+            }
+        return SequenceTable(
+            self.time[events], self.timestamp[events], self.utc_offset[events],
+            self.label[events], self.lifecycle[events],
+            self.resource[events], offsets, self.label_vocab,
+            self.lifecycle_vocab, self.resource_vocab, calendar=calendar,
+            attributes={
+                key : [ values[i] for i in order ]
+                for key, values in self.attributes.items()
+            }
+        )
+
+    def append(self, traces:Any, workers:int=1) -> 'SequenceTable':
+        """
+        Returns a new table with the given traces (any log type accepted by
+        the SequenceDataExtractor) converted and merged into this table, 
+        using the same sorting, timestamp transform and origin as this 
+        table. Only the new traces are converted.
+        """
+        from ..handlers.log_runners import SequenceDataExtractor
+        return SequenceDataExtractor().append(self, traces, workers=workers)
+
+    def to_sequences(self) -> List[List[SequenceData]]:
+        """
+        Returns the table in the older nested list form.
+        """
+        return [ list(trace) for trace in self ]
+
+    def save(self, path:str) -> None:
+        """
+        Saves this table to the given directory, see 
+        vispm.helpers.data.sequence_storage for the layout.
+        """
+        from .sequence_storage import save_table
+        save_table(self, path)
+
+    @staticmethod
+    def load(path:str, mmap:bool=True) -> 'SequenceTable':
+        """
+        Loads a table saved to the given directory, by default the columns
+        are memory-mapped so that opening is near-instant and pages are 
+        shared between processes.
+        """
+        from .sequence_storage import load_table
+        return load_table(path, mmap=mmap)
+
+    @staticmethod
+    def concat(tables:List['SequenceTable']) -> 'SequenceTable':
+        """
+        Joins tables one after another into a single table, merging the 
+        vocabularies of each table.
+        """
+        if len(tables) == 0:
+            return SequenceTableBuilder().build()
+        vocabs = [ dict(), dict(), dict() ]
+        columns = [ [], [], [] ]
+        for table in tables:
+            for vocab, column, codes, words in zip(vocabs, columns,
+                (table.label, table.lifecycle, table.resource),
+                (table.label_vocab, table.lifecycle_vocab, table.resource_vocab)):
+                remap = np.array([ vocab.setdefault(w, len(vocab)) for w in words ], dtype=np.int32)
+                column.append(remap[codes] if len(codes) > 0 else codes)
+        lengths = [ table.trace_lengths() for table in tables ]
+        offsets = np.zeros(sum(len(l) for l in lengths)+1, dtype=np.int64)
+        np.cumsum(np.concatenate(lengths), out=offsets[1:])
+        attributes = {
+            key : [ value for t in tables 
+                    for value in t.attributes.get(key, [ None ] * len(t)) ]
+            for key in { key for t in tables for key in t.attributes.keys() }
+        }
+        calendar = None
+        if any( len(t._calendar) > 0 for t in tables ):
+            calendar = {
+                name : np.concatenate([ getattr(t, name) for t in tables ])
+                for name in SequenceTable.CALENDAR
+            }
+        return SequenceTable(
+            np.concatenate([ t.time for t in tables ]),
+            np.concatenate([ t.timestamp for t in tables ]),
+            np.concatenate([ t.utc_offset for t in tables ]),
+            np.concatenate(columns[0]),
+            np.concatenate(columns[1]),
+            np.concatenate(columns[2]),
+            offsets,
+            list(vocabs[0].keys()),
+            list(vocabs[1].keys()),
+            list(vocabs[2].keys()),
+            calendar=calendar, attributes=attributes
+        )
+
+    @staticmethod
+    def from_sequences(sequences:List[List[SequenceData]]) -> 'SequenceTable':
+        """
+        Builds a table from the older nested list form.
+        """
+        builder = SequenceTableBuilder()
+        calendar = { name : [] for name in SequenceTable.CALENDAR }
+        for seq in sequences:
+            builder.add_trace(
+                [ s.time for s in seq ],
+                [ np.nan for _ in seq ],
+                [ 0 for _ in seq ],
+                [ s.label for s in seq ],
+                [ s.lifecycle for s in seq ],
+                [ s.resource for s in seq ],
+            )
+            for name, values in calendar.items():
+                values.extend( getattr(s, name) for s in seq )
+        table = builder.build()
+        # the instants are not known, so keep the given calendar fields
+        table._calendar = {
+            name : np.asarray(values, dtype=np.int8)
+            for name, values in calendar.items()
+        }
+        return table
+
+class SequenceTableBuilder():
+    """
+    Accumulates traces column by column and builds a SequenceTable, labels,
+    lifecycles and resources are interned into vocabularies as they are
+    added. Columns are buffered in typed arrays, so the cost per event 
+    is a few bytes rather than a python object.\n
+    Values are interned as given and only converted to strings once per 
+    vocabulary entry when the table is built.
+    """
+
+    def __init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        self._time = array('d')
+        self._timestamp = array('d')
+        self._utc_offset = array('i')
+        self._label = array('i')
+        self._lifecycle = array('i')
+        self._resource = array('i')
+        self._lengths = array('q')
+        self._label_vocab:Dict[Any,int] = dict()
+        self._lifecycle_vocab:Dict[Any,int] = dict()
+        self._resource_vocab:Dict[Any,int] = dict()
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def _intern(self, vocab:Dict[Any,int], values:List[Any]) -> List[int]:
+        return [ vocab.setdefault(v, len(vocab)) for v in values ]
+
+    def _as_numpy(self, buffer:array, dtype:type) -> np.ndarray:
+        if len(buffer) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.frombuffer(buffer, dtype=dtype)
+
+    def _as_vocab(self, vocab:Dict[Any,int], buffer:array) -> Tuple[np.ndarray,List[str]]:
+        codes = self._as_numpy(buffer, np.int32)
+        words = [ str(v) for v in vocab.keys() ]
+        merged:Dict[str,int] = dict()
+        remap = np.array([ merged.setdefault(w, len(merged)) for w in words ], dtype=np.int32)
+        # values that only differ before str, e.g. 1 and "1", share a code
+        if len(merged) < len(words):
+            codes = remap[codes]
+        return codes, list(merged.keys())
+
+    def add_trace(self, time:List[float], timestamp:List[float],
+                  utc_offset:List[int], label:List[str],
+                  lifecycle:List[str], resource:List[str]) -> None:
+        """
+        Adds the columns of a single trace to the table being built.
+        """
+        self._time.extend(time)
+        self._timestamp.extend(timestamp)
+        self._utc_offset.extend(utc_offset)
+        self._label.extend(self._intern(self._label_vocab, label))
+        self._lifecycle.extend(self._intern(self._lifecycle_vocab, lifecycle))
+        self._resource.extend(self._intern(self._resource_vocab, resource))
+        self._lengths.append(len(time))
+
+    def build(self) -> SequenceTable:
+        """
+        Returns the table for the traces added so far, the builder is reset
+        so that the buffers are handed over to the table without a copy.
+        """
+        offsets = np.zeros(len(self._lengths)+1, dtype=np.int64)
+        np.cumsum(self._as_numpy(self._lengths, np.int64), out=offsets[1:])
+        label, label_vocab = self._as_vocab(self._label_vocab, self._label)
+        lifecycle, lifecycle_vocab = self._as_vocab(self._lifecycle_vocab, self._lifecycle)
+        resource, resource_vocab = self._as_vocab(self._resource_vocab, self._resource)
+        table = SequenceTable(
+            self._as_numpy(self._time, np.float64),
+            self._as_numpy(self._timestamp, np.float64),
+            self._as_numpy(self._utc_offset, np.int32),
+            label, lifecycle, resource,
+            offsets,
+            label_vocab, lifecycle_vocab, resource_vocab,
+        )
+        self._reset()
+        return table
+
+def as_sequence_table(sequences:Union[SequenceTable,List[List[SequenceData]]]) -> SequenceTable:
+    """
+    Returns the given sequences as a SequenceTable, converting from the older
+    nested list form if needed.
+    """
+    if isinstance(sequences, SequenceTable):
+        return sequences
+    return SequenceTable.from_sequences(sequences)
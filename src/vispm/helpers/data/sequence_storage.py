@@ -0,0 +1,142 @@
+"""
+Reading and writing SequenceTables to disk.\n
+
+Layout:
+---
+A saved table is a directory with the following files:\n
+\t`manifest.json`, describing the format, version, number of traces and
+\tevents, and the file and dtype for each column.\n
+\t`time.npy`, float64 (little endian), the time of each event.\n
+\t`timestamp.npy`, float64 (little endian), the instant of each event as
+\tseconds since the epoch in UTC (NaN when the event has no timestamp).\n
+\t`utc_offset.npy`, int32 (little endian), the offset in seconds of the
+\twall clock time of each event from UTC.\n
+\t`label.npy`, `lifecycle.npy`, `resource.npy`, int32 (little endian),
+\tcodes into the matching vocabulary.\n
+\t`offsets.npy`, int64 (little endian), the start of each trace, with an
+\textra entry for the end of the last trace.\n
+\t`label_vocab.json`, `lifecycle_vocab.json`, `resource_vocab.json`, a
+\tjson list of strings, where the i-th string is the value for code i.\n
+\t`attributes.json`, only when the table keeps case attributes, a json 
+\tobject mapping each attribute to a list with its value for each trace
+\t(values that are not json types are stored as strings).\n
+The manifest may also hold an `extraction` entry, with the sorting, timestamp
+transform, origin, sort key and sample rate used to extract the table.\n
+Each column is a standard numpy `.npy` file, so that loading can memory-map
+the columns and share pages between processes reading the same table.
+"""
+from .log_data import ExtractionInfo, SequenceTable
+
+from typing import Any, Dict, List, Union
+from os import PathLike
+import json
+import os
+
+import numpy as np
+
+FORMAT = "vispm-sequence-table"
+VERSION = 2
+MANIFEST = "manifest.json"
+
+COLUMNS:Dict[str,str] = {
+    "time" : "<f8",
+    "timestamp" : "<f8",
+    "utc_offset" : "<i4",
+    "label" : "<i4",
+    "lifecycle" : "<i4",
+    "resource" : "<i4",
+    "offsets" : "<i8",
+}
+VOCABS:List[str] = [ "label_vocab", "lifecycle_vocab", "resource_vocab" ]
+
+def save_table(table:SequenceTable, path:Union[str,PathLike]) -> None:
+    """
+    Saves the table to the given directory, using the layout described in
+    this module.
+    """
+    path = os.fspath(path)
+    os.makedirs(path, exist_ok=True)
+    manifest = {
+        "format" : FORMAT,
+        "version" : VERSION,
+        "traces" : len(table),
+        "events" : table.num_events,
+        "columns" : dict(),
+        "vocabularies" : dict(),
+    }
+    for name, dtype in COLUMNS.items():
+        filename = f"{name}.npy"
+        np.save(os.path.join(path, filename),
+                np.ascontiguousarray(getattr(table, name), dtype=dtype))
+        manifest["columns"][name] = { "file" : filename, "dtype" : dtype }
+    for name in VOCABS:
+        filename = f"{name}.json"
+        with open(os.path.join(path, filename), "w", encoding="utf-8") as handle:
+            json.dump([ str(v) for v in getattr(table, name) ], handle)
+        manifest["vocabularies"][name] = { "file" : filename }
+    if table.extraction != None:
+        manifest["extraction"] = {
+            "sorting" : table.extraction.sorting,
+            "time_transform" : table.extraction.time_transform,
+            "origin" : table.extraction.origin,
+            "sort_by" : table.extraction.sort_by,
+            "sample_rate" : table.extraction.sample_rate,
+        }
+    if len(table.attributes) > 0:
+        filename = "attributes.json"
+        with open(os.path.join(path, filename), "w", encoding="utf-8") as handle:
+            json.dump(table.attributes, handle, default=str)
+        manifest["attributes"] = { "file" : filename }
+    # the manifest is written last, so a partial save is not readable
+    with open(os.path.join(path, MANIFEST), "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=1)
+
+def load_table(path:Union[str,PathLike], mmap:bool=True) -> SequenceTable:
+    """
+    Loads a table saved with save_table. When mmap is true the columns are
+    memory-mapped (read only) rather than read into memory.
+    """
+    path = os.fspath(path)
+    with open(os.path.join(path, MANIFEST), "r", encoding="utf-8") as handle:
+        manifest:Dict[str,Any] = json.load(handle)
+    if manifest.get("format") != FORMAT:
+        raise ValueError(f"Not a saved sequence table :: {path}")
+    if manifest.get("version", 0) != VERSION:
+        raise ValueError(f"Saved sequence table is from another version :: found {manifest.get('version')} but only support {VERSION}")
+    columns = dict()
+    for name in COLUMNS.keys():
+        filename = manifest["columns"][name]["file"]
+        columns[name] = np.load(os.path.join(path, filename),
+                                mmap_mode="r" if mmap else None,
+                                allow_pickle=False)
+    vocabs = dict()
+    for name in VOCABS:
+        filename = manifest["vocabularies"][name]["file"]
+        with open(os.path.join(path, filename), "r", encoding="utf-8") as handle:
+            vocabs[name] = json.load(handle)
+    extraction = None
+    if "extraction" in manifest:
+        extraction = ExtractionInfo(**manifest["extraction"])
+    attributes = None
+    if "attributes" in manifest:
+        filename = manifest["attributes"]["file"]
+        with open(os.path.join(path, filename), "r", encoding="utf-8") as handle:
+            attributes = json.load(handle)
+    return SequenceTable(
+        columns["time"], columns["timestamp"], columns["utc_offset"],
+        columns["label"], columns["lifecycle"],
+        columns["resource"], columns["offsets"],
+        vocabs["label_vocab"], vocabs["lifecycle_vocab"],
+        vocabs["resource_vocab"], extraction=extraction, 
+        attributes=attributes
+    )
+
+def storage_size(path:Union[str,PathLike]) -> int:
+    """
+    Returns the size in bytes of a saved table.
+    """
+    path = os.fspath(path)
+    return sum(
+        os.stat(os.path.join(path, name)).st_size
+        for name in os.listdir(path)
+    )
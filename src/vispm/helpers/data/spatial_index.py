@@ -0,0 +1,78 @@
+"""
+Indexes over the positions of events on a chart, for finding the event
+nearest to a point (e.g. the mouse) without testing every event.
+"""
+from math import ceil, floor
+
+import numpy as np
+
+class EventGrid():
+    """
+    A uniform grid over points in display coordinates, where the points of
+    each cell are stored together. The nearest point to a position is found
+    by only measuring the points in the cells around the position, so a
+    query costs about the same however many points are indexed.\n
+
+    Parameters:
+    ----
+    x:`np.ndarray`\n
+    [Required] The x position of each point in pixels.\n
+    \n
+    y:`np.ndarray`\n
+    [Required] The y position of each point in pixels.\n
+    \n
+    cell:`float=8.0`\n
+    [Optional] The width and height of each cell in pixels, ideally close to
+    the radius that is searched.\n
+    """
+
+    def __init__(self, x:np.ndarray, y:np.ndarray, cell:float=8.0) -> None:
+        if cell <= 0:
+            raise ValueError(f"Grid cells must have a positive size :: given {cell}")
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.cell = float(cell)
+        self._left = float(self.x.min()) if len(self.x) > 0 else 0.0
+        self._bottom = float(self.y.min()) if len(self.y) > 0 else 0.0
+        columns = ((self.x - self._left) // self.cell).astype(np.int64)
+        rows = ((self.y - self._bottom) // self.cell).astype(np.int64)
+        self._columns = int(columns.max()) + 1 if len(columns) > 0 else 1
+        self._rows = int(rows.max()) + 1 if len(rows) > 0 else 1
+        # points are sorted by cell, so each row of cells is a contiguous run
+        keys = rows * self._columns + columns
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+        self._x = self.x[self._order]
+        self._y = self.y[self._order]
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def nearest(self, x:float, y:float, radius:float) -> int:
+        """
+        Returns the position of the nearest point within radius pixels of
+        (x,y), or -1 if there is no point that close.
+        """
+        if len(self.x) == 0:
+            return -1
+        reach = ceil(radius / self.cell)
+        column = floor((x - self._left) / self.cell)
+        row = floor((y - self._bottom) / self.cell)
+        first = max(column - reach, 0)
+        last = min(column + reach, self._columns - 1)
+        if first > last:
+            return -1
+        best, closest = -1, radius ** 2
+        for cells in range(max(row - reach, 0), min(row + reach, self._rows - 1) + 1):
+            start = np.searchsorted(self._keys, cells * self._columns + first, side="left")
+            end = np.searchsorted(self._keys, cells * self._columns + last, side="right")
+            if start == end:
+                continue
+            distances = (self._x[start:end] - x) ** 2 + (self._y[start:end] - y) ** 2
+            nearest = int(np.argmin(distances))
+            if distances[nearest] < closest or \
+                (best < 0 and distances[nearest] == closest):
+                best, closest = start + nearest, distances[nearest]
+        if best < 0:
+            return -1
+        return int(self._order[best])
@@ -0,0 +1,212 @@
+from ..data.log_data import SequenceTable
+from ..data.sequence_storage import save_table, load_table, storage_size
+from .xes_readers import XesStreamReader
+from .log_adapters import find_adapter
+
+from typing import Any, List, Optional, Union
+from datetime import datetime
+from hashlib import blake2b
+from os import PathLike
+from shutil import rmtree
+import os
+
+class ExtractionCache():
+    """
+    An opt-in on-disk cache for the sequence data extracted from event logs.
+    Each extraction is stored as a compact binary file, keyed by a
+    fingerprint of the log and the options used to extract it. Entries 
+    use the layout of vispm.helpers.data.sequence_storage and are 
+    memory-mapped when read. When the cache grows beyond the given size, 
+    the least recently used entries are evicted.\n
+
+    Call sequence:
+    ---
+    ```
+    cache = ExtractionCache("./.vispm_cache")
+    presentor = StaticDottedChartPresentor(log, cache=cache)
+    ```
+
+    Parameters:
+    ----
+    directory:`str`\n
+    [Required] The directory to store extractions in, created if needed.\n
+    \n
+    max_bytes:`int=2GB`\n
+    [Optional] The total size of files to keep before evicting.\n
+
+    Fingerprints:
+    ----
+    Paths to XES files are fingerprinted by their location, size and
+    modification time. Dataframes are fingerprinted by hashing the columns
+    used for extraction. Other event logs are fingerprinted from cheap
+    invariants, i.e. the number of traces and of events, and the case
+    identifier, length and first and last timestamp of each trace, so that
+    a cache hit costs far less than extracting the log. The tradeoff is 
+    that edits which keep these invariants, e.g. relabelling an event in 
+    the middle of a trace, are not noticed, so if a log may change 
+    elsewhere pass a `log_key` to name each version of the log instead.
+    """
+
+    VERSION = 7
+    SUFFIX = ".vispm"
+    FINGERPRINT_KEYS = [
+        "case:concept:name", "time:timestamp", "concept:name",
+        "lifecycle:transition", "org:resource"
+    ]
+
+    def __init__(self, directory:Union[str,PathLike],
+                 max_bytes:int=2 * 1024**3) -> None:
+        self._directory = os.fspath(directory)
+        self._max_bytes = max_bytes
+        os.makedirs(self._directory, exist_ok=True)
+
+    def _update(self, hasher:Any, *values:Any) -> None:
+        for value in values:
+            hasher.update(repr(value).encode("utf-8"))
+            hasher.update(b"\x00")
+
+    def _event_time(self, event:Any) -> Any:
+        try :
+            return event[self.FINGERPRINT_KEYS[1]]
+        except:
+            return None
+
+    def fingerprint(self, log:Any) -> Optional[str]:
+        """
+        Returns a fingerprint for the given log, or None if the log cannot be
+        fingerprinted.
+        """
+        hasher = blake2b(digest_size=20)
+        if isinstance(log, (str, PathLike)):
+            stats = os.stat(log)
+            self._update(hasher, "path", os.path.abspath(os.fspath(log)),
+                         stats.st_size, stats.st_mtime_ns)
+            return hasher.hexdigest()
+        if isinstance(log, XesStreamReader):
+            return self.fingerprint(log._path)
+        try :
+            from pandas import DataFrame
+            from pandas.util import hash_pandas_object
+            if isinstance(log, DataFrame):
+                columns = [ c for c in self.FINGERPRINT_KEYS if c in log.columns ]
+                hashes = hash_pandas_object(log[columns], index=False)
+                self._update(hasher, "frame", columns, len(log))
+                hasher.update(hashes.to_numpy().tobytes())
+                return hasher.hexdigest()
+        except ImportError:
+            pass
+        try :
+            adapter = find_adapter(log)
+        except ValueError:
+            return None
+        try :
+            from pmkoalas.complex import ComplexEventLog
+            if isinstance(log, ComplexEventLog):
+                log = [ trace for _, instances in log for trace in instances ]
+        except ImportError:
+            pass
+        try :
+            events = 0
+            for trace in log:
+                length = len(trace)
+                events += length
+                self._update(hasher, adapter.attribute(trace, "concept:name"), 
+                             length)
+                if length > 0:
+                    self._update(hasher, self._event_time(trace[0]),
+                                 self._event_time(trace[length-1]))
+            self._update(hasher, "log", len(log), events)
+            return hasher.hexdigest()
+        except:
+            return None
+
+    def key(self, log:Any, start_time:datetime=None, sorting:Any=None,
+            time_transform:Any=None, log_key:str=None, 
+            sort_by:str=None, filters:Any=None, 
+            sample:Any=None, collapse_variants:bool=False) -> Optional[str]:
+        """
+        Returns the cache key for extracting the given log with the given
+        options, or None if the log cannot be fingerprinted. Filters and 
+        samples are part of the key through their repr.
+        """
+        fingerprint = log_key if log_key != None else self.fingerprint(log)
+        if fingerprint == None:
+            return None
+        hasher = blake2b(digest_size=20)
+        self._update(hasher, self.VERSION, fingerprint,
+            start_time.timestamp() if start_time != None else None,
+            sorting.name if sorting != None else None,
+            time_transform.name if time_transform != None else None,
+            sort_by, filters, sample, collapse_variants
+        )
+        return hasher.hexdigest()
+
+    def _path_for(self, key:str) -> str:
+        return os.path.join(self._directory, key + self.SUFFIX)
+
+    def get(self, key:str) -> Optional[SequenceTable]:
+        """
+        Returns the table stored under the key, or None if it is not cached.
+        """
+        path = self._path_for(key)
+        if not os.path.isdir(path):
+            return None
+        try :
+            table = load_table(path, mmap=True)
+        except Exception:
+            # treat unreadable entries as a miss
+            rmtree(path, ignore_errors=True)
+            return None
+        # mark as recently used
+        os.utime(path)
+        return table
+
+    def put(self, key:str, table:SequenceTable) -> None:
+        """
+        Stores the table under the key, then evicts the least recently used
+        entries to keep the cache within its size bound.
+        """
+        path = self._path_for(key)
+        partial = path + f".{os.getpid()}.partial"
+        save_table(table, partial)
+        rmtree(path, ignore_errors=True)
+        os.replace(partial, path)
+        self.evict()
+
+    def entries(self) -> List[str]:
+        """
+        Returns the paths of cached entries, least recently used first.
+        """
+        paths = [
+            os.path.join(self._directory, name)
+            for name in os.listdir(self._directory)
+            if name.endswith(self.SUFFIX)
+        ]
+        return sorted(paths, key=lambda p: os.stat(p).st_mtime_ns)
+
+    def size(self) -> int:
+        """
+        Returns the total size in bytes of the cached entries.
+        """
+        return sum( storage_size(p) for p in self.entries() )
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used entries until the cache is within
+        its size bound.
+        """
+        entries = self.entries()
+        sizes = [ storage_size(p) for p in entries ]
+        total = sum(sizes)
+        for path, size in zip(entries, sizes):
+            if total <= self._max_bytes:
+                break
+            total -= size
+            rmtree(path, ignore_errors=True)
+
+    def clear(self) -> None:
+        """
+        Removes every cached entry.
+        """
+        for path in self.entries():
+            rmtree(path, ignore_errors=True)
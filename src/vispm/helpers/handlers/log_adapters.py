@@ -0,0 +1,339 @@
+"""
+Adapters between the event log types understood by vispm and the
+SequenceDataExtractor.\n
+An adapter is selected once per log, by asking each registered adapter (most
+recently registered first) whether it accepts the log. The selected adapter
+then reads the log a column at a time, so that missing keys are detected once
+per column rather than once per event.\n
+
+Call sequence:
+---
+```
+class MyLogAdapter(LogAdapter):
+    def accepts(self, log):
+        return isinstance(log, MyLog)
+    ...
+
+register_adapter(MyLogAdapter())
+presentor = StaticDottedChartPresentor(my_log)
+```
+"""
+from .xes_readers import XesStreamReader
+
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from typing import Any, List, Optional, Tuple, TYPE_CHECKING
+from datetime import datetime
+from os import PathLike
+
+if TYPE_CHECKING:
+    from ..data.log_data import SequenceTable
+    from .log_runners import SequenceDataExtractor
+
+Column = Tuple[List[Any],bool]
+
+class LogAdapter(ABC):
+    """
+    Base class for reading a type of event log during extraction.\n
+    Subclasses must implement `accepts`, `traces` and `column`. By default
+    logs are extracted trace by trace, an adapter for a columnar log type can
+    override `extract` to build the SequenceTable itself.
+    """
+
+    @abstractmethod
+    def accepts(self, log:Any) -> bool:
+        """
+        Returns whether this adapter can read the given log.
+        """
+        pass
+
+    @abstractmethod
+    def traces(self, log:Any) -> List[Any]:
+        """
+        Returns the traces of the log, in log order.
+        """
+        pass
+
+    @abstractmethod
+    def column(self, trace:Any, key:str) -> Column:
+        """
+        Returns the values of key for each event in the trace, using None
+        where an event does not have the key, and whether any were missing.
+        """
+        pass
+
+    def attribute(self, trace:Any, key:str) -> Any:
+        """
+        Returns the value of a case attribute of the trace, or None if the 
+        trace does not have it.
+        """
+        try :
+            return trace.attributes[key]
+        except:
+            return None
+
+    def name(self, log:Any) -> Optional[str]:
+        """
+        Returns the name of the log, or None if it is not known.
+        """
+        try :
+            return log.attributes['concept:name']
+        except:
+            return None
+
+    def variants(self, log:Any) -> Optional[List[int]]:
+        """
+        Returns the variant of each trace (in the order of `traces`) when the
+        log already groups its traces by variant, otherwise None.
+        """
+        return None
+
+    def _first_time(self, extractor:'SequenceDataExtractor',
+                    trace:Any) -> Optional[datetime]:
+        """
+        Returns the timestamp of the first event of the trace, or None.
+        """
+        stamps, _ = self.column(trace, extractor.TIME_ATTR)
+        if len(stamps) < 1:
+            return None
+        return stamps[0]
+
+    def origins(self, extractor:'SequenceDataExtractor', traces:List[Any],
+                start_time:datetime=None) -> List[float]:
+        """
+        Returns the starting time (as seconds) to convert each trace
+        relative to, for the timestamp transform of the extractor.
+        """
+        transform = extractor.TimestampTransform
+        if extractor._time_transform == transform.raw:
+            return [ 0.0 for _ in traces ]
+        if extractor._time_transform == transform.relative_to_trace:
+            firsts = [ self._first_time(extractor, trace) for trace in traces ]
+            return [ 
+                first.timestamp() if first != None else 0.0 
+                for first in firsts 
+            ]
+        if extractor._time_transform == transform.constant_per_event:
+            startingTime = datetime.now()
+        elif start_time != None:
+            startingTime = start_time
+        else:
+            startingTime = None
+            for trace in traces:
+                time = self._first_time(extractor, trace)
+                if time != None and (startingTime == None or time < startingTime):
+                    startingTime = time
+        if startingTime == None:
+            return [ 0.0 for _ in traces ]
+        return [ startingTime.timestamp() for _ in traces ]
+
+    def extract(self, extractor:'SequenceDataExtractor', log:Any,
+                start_time:datetime=None, workers:int=1) -> 'SequenceTable':
+        """
+        Extracts the sequence table for the log.
+        """
+        return extractor._convert_log(log, start_time=start_time,
+                                      workers=workers, adapter=self)
+
+class DataFrameAdapter(LogAdapter):
+    """
+    Reads a pandas DataFrame, where each row is an event, using columnar
+    operations.
+    """
+
+    def accepts(self, log:Any) -> bool:
+        try :
+            from pandas import DataFrame
+            return isinstance(log, DataFrame)
+        except ImportError:
+            return False
+
+    def traces(self, log:Any) -> List[Any]:
+        raise ValueError("Dataframes are extracted by column, not by trace.")
+
+    def column(self, trace:Any, key:str) -> Column:
+        raise ValueError("Dataframes are extracted by column, not by trace.")
+
+    def name(self, log:Any) -> Optional[str]:
+        try :
+            return log.attrs['concept:name']
+        except:
+            return None
+
+    def extract(self, extractor:'SequenceDataExtractor', log:Any,
+                start_time:datetime=None, workers:int=1) -> 'SequenceTable':
+        return extractor._convert_dataframe(log, start_time=start_time)
+
+class XesStreamAdapter(LogAdapter):
+    """
+    Reads a XES (or XES.gz) file incrementally, given either its path or a
+    XesStreamReader.
+    """
+
+    def accepts(self, log:Any) -> bool:
+        return isinstance(log, (str, PathLike, XesStreamReader))
+
+    def traces(self, log:Any) -> List[Any]:
+        raise ValueError("XES files are extracted as they are read.")
+
+    def column(self, trace:Any, key:str) -> Column:
+        raise ValueError("XES files are extracted as they are read.")
+
+    def name(self, log:Any) -> Optional[str]:
+        if isinstance(log, XesStreamReader):
+            return log.attributes.get('concept:name', None)
+        return None
+
+    def extract(self, extractor:'SequenceDataExtractor', log:Any,
+                start_time:datetime=None, workers:int=1) -> 'SequenceTable':
+        if not isinstance(log, XesStreamReader):
+            log = XesStreamReader(log, default=extractor.DEFAULT)
+        return extractor._convert_stream(log, start_time=start_time)
+
+class MappingLogAdapter(LogAdapter):
+    """
+    Reads a log of traces where each event is a mapping from keys to values,
+    such as a list of lists of dicts.
+    """
+
+    def accepts(self, log:Any) -> bool:
+        try :
+            return isinstance(log[0][0], Mapping)
+        except:
+            return False
+
+    def traces(self, log:Any) -> List[Any]:
+        return list(log)
+
+    def column(self, trace:Any, key:str) -> Column:
+        values = [ event.get(key) for event in trace ]
+        return values, None in values
+
+    def attribute(self, trace:Any, key:str) -> Any:
+        value = super().attribute(trace, key)
+        if value is None and len(trace) > 0:
+            # flattened logs carry case attributes on each event
+            value = trace[0].get(f"case:{key}")
+        return value
+
+class Pm4pyLogAdapter(MappingLogAdapter):
+    """
+    Reads a pm4py.objects.log.obj.EventLog.
+    """
+
+    def accepts(self, log:Any) -> bool:
+        try :
+            from pm4py.objects.log.obj import EventLog
+            return isinstance(log, EventLog)
+        except ImportError:
+            return False
+
+class ComplexLogAdapter(LogAdapter):
+    """
+    Reads a pmkoalas.complex.ComplexEventLog, where traces are grouped by
+    variant.
+    """
+
+    UNDEFINED = "UNDEFINED"
+    LABEL_ATTR = "concept:name"
+
+    def accepts(self, log:Any) -> bool:
+        try :
+            from pmkoalas.complex import ComplexEventLog
+            return isinstance(log, ComplexEventLog)
+        except ImportError:
+            return False
+
+    def traces(self, log:Any) -> List[Any]:
+        return [
+            trace
+            for _, instances in log
+            for trace in instances
+        ]
+
+    def column(self, trace:Any, key:str) -> Column:
+        if key == self.LABEL_ATTR:
+            return [ event.activity() for event in trace ], False
+        values = [ event[key] for event in trace ]
+        if self.UNDEFINED in values:
+            values = [ None if v == self.UNDEFINED else v for v in values ]
+            return values, True
+        return values, False
+
+    def variants(self, log:Any) -> Optional[List[int]]:
+        return [
+            variant
+            for variant, (_, instances) in enumerate(log)
+            for _ in instances
+        ]
+
+    def attribute(self, trace:Any, key:str) -> Any:
+        return trace.data().get(key, None)
+
+    def name(self, log:Any) -> Optional[str]:
+        return log.name
+
+    def _first_time(self, extractor:'SequenceDataExtractor',
+                    trace:Any) -> Optional[datetime]:
+        if len(trace) < 1:
+            return None
+        stamps, missing = self.column([ trace[0] ], extractor.TIME_ATTR)
+        if missing:
+            extractor._missing_key(extractor.TIME_ATTR, "event")
+        return stamps[0]
+
+class GenericLogAdapter(LogAdapter):
+    """
+    Reads any iterable of traces, where each event supports `event[key]`.
+    Used when no other adapter accepts the log.
+    """
+
+    def accepts(self, log:Any) -> bool:
+        return True
+
+    def traces(self, log:Any) -> List[Any]:
+        return list(log)
+
+    def _get(self, event:Any, key:str) -> Any:
+        try :
+            return event[key]
+        except:
+            return None
+
+    def column(self, trace:Any, key:str) -> Column:
+        values = [ self._get(event, key) for event in trace ]
+        return values, None in values
+
+_ADAPTERS:List[LogAdapter] = [
+    GenericLogAdapter(),
+    MappingLogAdapter(),
+    Pm4pyLogAdapter(),
+    ComplexLogAdapter(),
+    XesStreamAdapter(),
+    DataFrameAdapter(),
+]
+
+def register_adapter(adapter:LogAdapter) -> LogAdapter:
+    """
+    Registers an adapter, which is asked before any previously registered
+    adapters whether it accepts a log. Returns the adapter.
+    """
+    if not isinstance(adapter, LogAdapter):
+        raise AttributeError(f"Given adapter is not a subclass of LogAdapter :: {adapter.__class__.__name__}")
+    _ADAPTERS.append(adapter)
+    return adapter
+
+def unregister_adapter(adapter:LogAdapter) -> None:
+    """
+    Removes a previously registered adapter.
+    """
+    _ADAPTERS.remove(adapter)
+
+def find_adapter(log:Any) -> LogAdapter:
+    """
+    Returns the most recently registered adapter that accepts the log.
+    """
+    for adapter in reversed(_ADAPTERS):
+        if adapter.accepts(log):
+            return adapter
+    raise ValueError(f"No adapter accepts the given log :: {log.__class__.__name__}")
@@ -1,20 +1,55 @@
 
-from ..data.log_data import SequenceData
+from ..data.log_data import ExtractionInfo, SequenceTable, SequenceTableBuilder
 from ..metaclasses.pm4py import EventLog,Trace,Event
+from .xes_readers import XesStreamReader
+from .extraction_cache import ExtractionCache
+from .log_adapters import LogAdapter, find_adapter
+from .trace_sampling import TraceSample
 
-from typing import List, Any
+from typing import Callable, Collection, List, Any, Optional, Tuple, Union
 from enum import Enum,auto
 
-from datetime import timedelta, datetime
-from time import time as curr_time
+import numpy as np
+
+from datetime import timedelta, datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
 
 class SequenceDataExtractor():
     """
     Given a event log, this class extracts the minimum amount of data needed for visualisation. Should be used a one-shot.\n
+    The extracted data is returned as a columnar SequenceTable, if a 
+    SequenceTable is given instead of an event log, it is returned as is.\n
+    A pandas DataFrame (such as the one returned by `pm4py.read_xes`) can 
+    also be given, where each row is an event and the case identifier is 
+    found in `CASE_ATTR`. Naive timestamps in a DataFrame are taken as UTC.\n
+    A path to a XES (or XES.gz) file, or a XesStreamReader, can also be 
+    given, in which case the file is read incrementally straight into the 
+    extraction buffers without building an event log in memory.\n
+    If an ExtractionCache is given, extractions are looked up in (and 
+    stored to) the cache before converting the log.\n
+    Events can be filtered during extraction with a time window, a case 
+    filter and an activity filter, so that skipped traces and events are 
+    never converted. Filters only decide which events are kept, times are 
+    still made relative to the whole log (or trace), so a filtered chart 
+    lines up with the unfiltered chart.\n
+    A sample of traces can be extracted instead of the whole log, see 
+    vispm.helpers.handlers.trace_sampling, in which case only the sampled
+    traces are converted and the rate of sampling is kept with the table.\n
+    Traces can also be collapsed to one trace per variant, the first trace of
+    each variant in the log, with the number of traces of each variant kept
+    in the table (see SequenceTable.collapse_variants).\n
+    New traces can be added to an extraction with `append`, which converts
+    only the new traces and merges them into the existing order.\n
+    The log is read through the LogAdapter selected for its type, see 
+    vispm.helpers.handlers.log_adapters to register adapters for other log
+    types.\n
     Assumptions:\n
     \tThe given event log has been sorted by starting event timestamp.
     """
 
+    CASE_ATTR = "case:concept:name"
+    CASE_ID_ATTR = "concept:name"
     TIME_ATTR = "time:timestamp"
     LABEL_ATTR = "concept:name"
     LIFE_ATTR = "lifecycle:transition"
@@ -24,10 +59,19 @@ class SequenceDataExtractor():
 
     class TraceSorting(Enum):
         """
-        Determines how the returned sequence data is ordered.
+        Determines how the returned sequence data is ordered.\n
+        `caseattribute` orders traces by the case attribute named by 
+        `sort_by`, and `activitystart` by the first time the activity named
+        by `sort_by` occurs in each trace. `variantfrequency` groups traces
+        by variant, with the most frequent variant first.
         """
         firstevent = auto()
         tracelength= auto()
+        lastevent = auto()
+        duration = auto()
+        variantfrequency = auto()
+        caseattribute = auto()
+        activitystart = auto()
 
     class TimestampTransform(Enum):
         """
@@ -40,110 +84,844 @@ class SequenceDataExtractor():
 
 
     _constant_time_per_event = 10
+    _NAIVE_EPOCH = datetime(1970, 1, 1)
+    _chunks_per_worker = 4
 
-    def __init__(self) -> None:
+    def __init__(self, cache:ExtractionCache=None) -> None:
         self._errored_keys = dict() 
+        self._cache = cache
+        self._origin = None
+        self._set_filters()
+        self._set_sample()
+        self._collapse = False
 
     def __call__(self, event_log:EventLog,start_time=None,
                  sorting:TraceSorting=TraceSorting.firstevent,
-                 time_transform:TimestampTransform=TimestampTransform.relative_to_log
-                 ) -> List[SequenceData]:
-        """Begins extracting SequenceData from an EventLog"""
+                 time_transform:TimestampTransform=TimestampTransform.relative_to_log,
+                 workers:int=1, log_key:str=None, sort_by:str=None,
+                 time_window:Tuple[Optional[datetime],Optional[datetime]]=None,
+                 case_filter:Union[Collection[str],Callable[[str],bool]]=None,
+                 activity_filter:Union[Collection[str],Callable[[str],bool]]=None,
+                 sample:Union[int,TraceSample]=None,
+                 collapse_variants:bool=False
+                 ) -> SequenceTable:
+        """
+        Begins extracting SequenceData from an EventLog.\n
+        The time_window keeps events from its start (inclusive) to its end 
+        (exclusive), either may be None. The case_filter keeps the traces 
+        whose case identifier is in the given collection or passes the given
+        predicate, and the activity_filter does the same for event labels.
+        Traces left without events by the time window or the activity 
+        filter are dropped. Predicates must be picklable to use workers. A
+        ValueError is raised if the filters remove every event.\n
+        The sample is either the number of traces to keep (uniformly, with
+        a seed of zero) or a TraceSample. Traces are sampled from those that
+        pass the case filter, before events are filtered.\n
+        When collapse_variants is set, the returned table has one trace per
+        variant (after filtering), logs that already group traces by 
+        variant only have the first trace of each variant converted.\n
+        The sort_by names the case attribute or activity for sortings that
+        need one, case attributes used for sorting are kept in the returned 
+        table's attributes.\n
+        When workers is more than one, traces are converted in chunks over a
+        pool of processes, values below one use every available core. 
+        Dataframes and streamed XES files are always extracted in process.\n
+        The log_key can be given to name the log for the cache, instead of 
+        fingerprinting it.
+        """
+        self._set_sorting(sorting, sort_by)
+        self._time_transform = time_transform
+        self._set_filters(time_window, case_filter, activity_filter)
+        self._set_sample(sample)
+        self._collapse = collapse_variants
+        if isinstance(event_log, SequenceTable):
+            if collapse_variants and not event_log.collapsed:
+                return event_log.collapse_variants()
+            return event_log
+        key = None
+        if self._cache != None and self._cacheable_filters():
+            key = self._cache.key(event_log, start_time=start_time, 
+                                  sorting=sorting, 
+                                  time_transform=time_transform,
+                                  log_key=log_key, sort_by=sort_by,
+                                  filters=self._filter_key(),
+                                  sample=self._sample,
+                                  collapse_variants=collapse_variants)
+            if key != None:
+                table = self._cache.get(key)
+                if table is not None:
+                    return table
+        table = self._extract(event_log, start_time=start_time, workers=workers)
+        if self._filter_key() != None and table.num_events == 0:
+            raise ValueError("Given filters removed every event from the log, so there is nothing to plot.")
+        if key != None:
+            self._cache.put(key, table)
+        return table
+
+    def _extract(self, event_log:EventLog, start_time=None, 
+                 workers:int=1) -> SequenceTable:
+        self._origin = None
+        self._sample_rate = 1.0
+        adapter = find_adapter(event_log)
+        table = adapter.extract(self, event_log, start_time=start_time,
+                                workers=workers)
+        table.extraction = ExtractionInfo(
+            self._sorting.name, self._time_transform.name, self._origin,
+            self._sort_by, self._sample_rate
+        )
+        return table
+
+    def _set_sorting(self, sorting:TraceSorting, sort_by:str=None) -> None:
+        if sorting in (self.TraceSorting.caseattribute, 
+                       self.TraceSorting.activitystart) and sort_by == None:
+            raise ValueError(f"Sorting by {sorting.name} requires sort_by to name a case attribute or activity.")
+        self._sorting = sorting
+        self._sort_by = sort_by
+
+    def _set_filters(self, time_window:Tuple[Optional[datetime],Optional[datetime]]=None,
+                     case_filter:Union[Collection[str],Callable[[str],bool]]=None,
+                     activity_filter:Union[Collection[str],Callable[[str],bool]]=None
+                     ) -> None:
+        self._time_window = None
+        if time_window is not None:
+            start, end = time_window
+            self._time_window = (
+                start.timestamp() if start != None else -np.inf,
+                end.timestamp() if end != None else np.inf
+            )
+        self._case_filter = self._as_predicate(case_filter)
+        self._activity_filter = self._as_predicate(activity_filter)
+
+    def _configure(self, sorting:TraceSorting, time_transform:TimestampTransform,
+                   time_window:Optional[Tuple[float,float]]=None,
+                   activity_filter:Optional[Callable[[Any],bool]]=None) -> None:
+        """
+        Sets the settings needed to convert traces, as already resolved by 
+        another extractor, e.g. for converting a chunk in a worker process.
+        """
         self._sorting = sorting
         self._time_transform = time_transform
-        return self._convert_log(event_log,start_time=start_time)
+        self._time_window = time_window
+        self._activity_filter = activity_filter
+
+    def _set_sample(self, sample:Union[int,TraceSample]=None) -> None:
+        if sample is not None and not isinstance(sample, TraceSample):
+            sample = TraceSample(sample)
+        self._sample = sample
+        self._sample_rate = 1.0
 
-    def _extract_xes_key(self, key:str, event:Event,default:Any) -> Any:
+    def _sample_positions(self, population:int, 
+                          strata:Callable[[],np.ndarray]) -> Optional[np.ndarray]:
+        """
+        Returns the positions of the sampled traces out of the population, 
+        or None if every trace is kept. The strata are only found when 
+        needed.
+        """
+        if self._sample is None or population <= self._sample.size:
+            return None
+        chosen = self._sample.select(population,
+                                     strata() if self._sample.stratified else None)
+        self._sample_rate = len(chosen) / population
+        return chosen
+
+    def _trace_strata(self, labels:List[List[Any]], 
+                      firsts:List[float]) -> np.ndarray:
+        """
+        Returns the stratum of each trace for a stratified sample, given the
+        labels and the first time (NaN if none) of each trace.
+        """
+        if self._sample.strategy == TraceSample.Strategy.starttime:
+            return self._sample.start_strata(np.asarray(firsts, dtype=np.float64))
+        variants = dict()
+        return np.array([ 
+            variants.setdefault(tuple(trace), len(variants)) 
+            for trace in labels 
+        ], dtype=np.int64)
+
+    def _as_predicate(self, given:Union[Collection[Any],Callable[[Any],bool]]) -> Optional[Callable[[Any],bool]]:
+        if given is None:
+            return None
+        if callable(given):
+            return given
+        return _MemberOf(given)
+
+    def _cacheable_filters(self) -> bool:
+        return all(
+            given is None or isinstance(given, _MemberOf)
+            for given in (self._case_filter, self._activity_filter)
+        )
+
+    def _filter_key(self) -> Optional[Tuple[Any,...]]:
+        if self._time_window is None and self._case_filter is None \
+            and self._activity_filter is None:
+            return None
+        return (self._time_window, self._case_filter, self._activity_filter)
+
+    def _filters_events(self) -> bool:
+        return self._time_window is not None or self._activity_filter is not None
+
+    def _select_events(self, stamps:List[Optional[datetime]], 
+                       labels:List[Any]) -> Optional[List[int]]:
+        """
+        Returns the positions of the events that pass the time window and 
+        activity filter, or None if every event is kept.
+        """
+        if not self._filters_events():
+            return None
+        keep = range(len(stamps))
+        if self._activity_filter is not None:
+            keep = [ i for i in keep if self._activity_filter(labels[i]) ]
+        if self._time_window is not None:
+            start, end = self._time_window
+            keep = [ 
+                i for i in keep 
+                if stamps[i] != None and start <= stamps[i].timestamp() < end 
+            ]
+        return list(keep)
+
+    def _kept_attributes(self) -> List[str]:
+        """
+        Returns the case attributes that need to be kept during extraction.
+        """
+        if self._sorting == self.TraceSorting.caseattribute:
+            return [ self._sort_by ]
+        return []
+
+    def sort(self, table:SequenceTable, sorting:TraceSorting, 
+             sort_by:str=None) -> SequenceTable:
+        """
+        Returns the table reordered by the given sorting, as a permutation of
+        its traces rather than a new extraction. Sorting by a case attribute
+        requires the attribute to have been kept in the table.
+        """
+        self._set_sorting(sorting, sort_by)
+        self._collapse = False
+        sorted_table = self._sort(table)
+        info = table.extraction
+        if info != None:
+            sorted_table.extraction = ExtractionInfo(
+                sorting.name, info.time_transform, info.origin, sort_by,
+                info.sample_rate
+            )
+        return sorted_table
+
+    def append(self, table:SequenceTable, traces:EventLog, 
+               workers:int=1,
+               time_window:Tuple[Optional[datetime],Optional[datetime]]=None,
+               case_filter:Union[Collection[str],Callable[[str],bool]]=None,
+               activity_filter:Union[Collection[str],Callable[[str],bool]]=None
+               ) -> SequenceTable:
+        """
+        Converts the given traces (any log type accepted by this extractor) 
+        and merges them into a previous extraction, returning a new table.\n
+        The new traces use the sorting, timestamp transform and origin of 
+        the given table, so times relative to the log stay consistent. 
+        Traces which tie with existing traces are placed after them. Filters 
+        are not kept with the table, so pass them again to filter the new 
+        traces. Sampled tables cannot be appended to, as the new traces 
+        would change the rate of sampling.
+        """
+        info = table.extraction
+        if info == None:
+            raise ValueError("Given table was not returned by an extractor, so cannot append to it.")
+        if info.sample_rate < 1.0:
+            raise ValueError("Given table is a sample of a log, so cannot append to it.")
+        if table.collapsed:
+            raise ValueError("Given table has collapsed variants, so cannot append to it.")
+        self._set_sorting(self.TraceSorting[info.sorting], info.sort_by)
+        self._time_transform = self.TimestampTransform[info.time_transform]
+        self._set_filters(time_window, case_filter, activity_filter)
+        self._set_sample()
+        self._collapse = False
+        start_time = None
+        if info.origin != None:
+            start_time = datetime.fromtimestamp(info.origin, tz=timezone.utc)
+        new = self._extract(traces, start_time=start_time, workers=workers)
+        merged = self._merge(table, new)
+        merged.extraction = info
+        return merged
+
+    def _trace_keys(self, table:SequenceTable) -> np.ndarray:
+        """
+        Returns the key that traces are ordered by for the sorting of this
+        extraction, traces without a key (such as empty traces) are last.
+        """
+        if self._sorting == self.TraceSorting.firstevent:
+            return table.first_times(default=np.inf)
+        elif self._sorting == self.TraceSorting.tracelength:
+            return table.trace_lengths()
+        elif self._sorting == self.TraceSorting.lastevent:
+            return table.last_times(default=np.inf)
+        elif self._sorting == self.TraceSorting.duration:
+            return table.last_times(default=np.inf) - table.first_times(default=0.0)
+        elif self._sorting == self.TraceSorting.caseattribute:
+            return self._attribute_keys(table)
+        elif self._sorting == self.TraceSorting.activitystart:
+            return self._activity_keys(table)
+        elif self._sorting == self.TraceSorting.variantfrequency:
+            variant, counts = table.variants()
+            return -counts[variant]
+        return np.zeros(len(table))
+
+    def _attribute_keys(self, table:SequenceTable) -> np.ndarray:
+        """
+        Returns the rank of each trace's value for the case attribute.
+        """
+        if not self._sort_by in table.attributes:
+            raise ValueError(f"Given table does not keep the case attribute :: {self._sort_by}")
+        values = table.attributes[self._sort_by]
+        present = set( v for v in values if v is not None )
         try :
-            from pmkoalas.complex import ComplexEvent
-            if isinstance(event, ComplexEvent) and key == self.LABEL_ATTR:
-                return event.activity()
-            else:
-                try :
-                    return event[key]
-                except:
-                    if not key in self._errored_keys.keys():
-                        print(f"[{self.__class__.__name__}] Unable to extract XES key on event : missing {key}. Plotting may be affected.")
-                        self._errored_keys[key] = event
-                    return default
-        except:
-            try :
-                return event[key]
-            except:
-                if not key in self._errored_keys.keys():
-                    print(f"[{self.__class__.__name__}] Unable to extract XES key on event : missing {key}. Plotting may be affected.")
-                    self._errored_keys[key] = event
-                return default
-
-    def _convert_trace(self,trace:Trace, startingTime:float) -> List[SequenceData]:
-        timepoints = [] 
-        for ev_no, event in enumerate(trace):
-            time = self._extract_xes_key(self.TIME_ATTR, event, None)#event[self.TIME_ATTR].timestamp() - startingTime
-            if time != None:
-                weekday = time.weekday()
-                monthday = time.day
-                hour = time.hour
-                if self._time_transform == self.TimestampTransform.constant_per_event:
-                    time = self._constant_time_per_event * ev_no
-                else:
-                    time = time.timestamp() - startingTime
+            uniques = sorted(present)
+        except TypeError:
+            # values of mixed types are ranked by their string form
+            uniques = sorted(present, key=str)
+        ranks = { value : rank for rank, value in enumerate(uniques) }
+        return np.array([ 
+            ranks[v] if v is not None else len(uniques)
+            for v in values 
+        ], dtype=np.float64)
+
+    def _activity_keys(self, table:SequenceTable) -> np.ndarray:
+        """
+        Returns the time that each trace first performs the activity.
+        """
+        keys = np.full(len(table), np.inf)
+        if not self._sort_by in table.label_vocab:
+            return keys
+        found = np.flatnonzero(table.label == table.label_vocab.index(self._sort_by))
+        # events are in time order, so writing in reverse keeps the first
+        found = found[::-1]
+        keys[table.trace_index()[found]] = table.time[found]
+        return keys
+
+    def _order_traces(self, table:SequenceTable) -> np.ndarray:
+        """
+        Returns the order of traces for the sorting of this extraction, as 
+        a permutation of trace indices.
+        """
+        keys = self._trace_keys(table)
+        if self._sorting == self.TraceSorting.variantfrequency:
+            # group traces by variant, where variants of the same frequency
+            # are ordered by their earliest trace, then order traces within
+            # a variant by their first event
+            variant, counts = table.variants()
+            firsts = table.first_times(default=np.inf)
+            earliest = np.full(len(counts), np.inf)
+            np.minimum.at(earliest, variant, firsts)
+            return np.lexsort((firsts, variant, earliest[variant], keys))
+        return np.argsort(keys, kind="stable")
+
+    def _sort(self, table:SequenceTable) -> SequenceTable:
+        if self._collapse:
+            # tables are in log order here, so the first trace of each 
+            # variant in the log stands for the variant
+            table = table.collapse_variants()
+        return table.take(self._order_traces(table))
+
+    def _merge(self, table:SequenceTable, new:SequenceTable) -> SequenceTable:
+        """
+        Merges two tables that are each in the order of this extraction.
+        """
+        if len(new) == 0:
+            return table
+        if self._sorting == self.TraceSorting.variantfrequency:
+            # frequencies change with the new traces, so order them again
+            return self._sort(SequenceTable.concat([table, new]))
+        joined = SequenceTable.concat([table, new])
+        # keys come from both tables, as case attributes are ranked among 
+        # the values of every trace
+        keys = self._trace_keys(joined)
+        # find where each new trace falls among the existing traces
+        places = np.searchsorted(keys[:len(table)], keys[len(table):],
+                                 side="right")
+        places = places + np.arange(len(new))
+        order = np.empty(len(table) + len(new), dtype=np.int64)
+        taken = np.zeros(len(order), dtype=bool)
+        taken[places] = True
+        order[places] = len(table) + np.arange(len(new))
+        order[~taken] = np.arange(len(table))
+        return joined.take(order)
+
+    def _missing_key(self, key:str, where:str) -> None:
+        if not key in self._errored_keys.keys():
+            print(f"[{self.__class__.__name__}] Unable to extract XES key on {where} : missing {key}. Plotting may be affected.")
+            self._errored_keys[key] = where
+
+    def _extract_frame_column(self, frame:Any, key:str) -> Any:
+        if key in frame.columns:
+            return frame[key]
+        self._missing_key(key, "dataframe")
+        return None
+
+    def _encode_frame_column(self, frame:Any, key:str, order:np.ndarray) -> Tuple[np.ndarray,List[str]]:
+        """
+        Returns integer codes (in the given event order) and the vocabulary
+        for a string-like column of a dataframe.
+        """
+        from pandas import factorize
+        column = self._extract_frame_column(frame, key)
+        if column is None:
+            return np.zeros(len(order), dtype=np.int32), [self.DEFAULT]
+        values = column.to_numpy()[order]
+        codes, uniques = factorize(values)
+        vocab = [ str(u) for u in uniques ]
+        if (codes < 0).any():
+            codes[codes < 0] = len(vocab)
+            vocab.append(self.DEFAULT)
+        # values which only differ before str, e.g. 1 and "1", share a code
+        vocab_codes, vocab = factorize(np.asarray(vocab, dtype=object))
+        return vocab_codes[codes].astype(np.int32), list(vocab)
+
+    def _convert_dataframe(self, frame:Any, start_time=None) -> SequenceTable:
+        """
+        Extracts sequence data from a dataframe using columnar operations, 
+        without creating an object per event.
+        """
+        from pandas import NaT, Series, factorize, to_datetime
+        if not self.CASE_ATTR in frame.columns:
+            raise ValueError(f"Given dataframe does not have a case identifier column :: expected {self.CASE_ATTR}")
+        num_events = len(frame)
+        cases, case_ids = factorize(frame[self.CASE_ATTR].to_numpy(), sort=False)
+        cases = cases.astype(np.int64)
+        # collect timestamps as seconds since the epoch
+        column = self._extract_frame_column(frame, self.TIME_ATTR)
+        if column is None:
+            stamps = to_datetime(Series([ NaT for _ in range(num_events) ]))
+        else:
+            stamps = to_datetime(column, utc=False)
+        missing = np.asarray(stamps.isna())
+        if getattr(stamps.dt, "tz", None) is not None:
+            utc = stamps.dt.tz_convert("UTC").dt.tz_localize(None)
+            wall = stamps.dt.tz_localize(None)
+        else:
+            utc = stamps
+            wall = stamps
+        utc = utc.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        wall = wall.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        utc_offset = np.where(missing, 0, (wall - utc) // 10**9).astype(np.int32)
+        seconds = utc / 1e9
+        seconds[missing] = 0.0
+        timestamp = np.where(missing, np.nan, seconds)
+        # group events by case, keeping the order of first appearance
+        lengths = np.bincount(cases, minlength=cases.max()+1 if num_events else 0)
+        offsets = np.zeros(len(lengths)+1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        by_case = np.argsort(cases, kind="stable")
+        positions = np.arange(num_events, dtype=np.int64) - np.repeat(offsets[:-1], lengths)
+        # apply the timestamp transform
+        if self._time_transform == self.TimestampTransform.constant_per_event:
+            times = np.empty(num_events, dtype=np.float64)
+            times[by_case] = positions * float(self._constant_time_per_event)
+        elif self._time_transform == self.TimestampTransform.raw:
+            times = seconds
+        elif self._time_transform == self.TimestampTransform.relative_to_trace:
+            starts = np.full(len(lengths), np.inf)
+            np.minimum.at(starts, cases[~missing], seconds[~missing])
+            starts[np.isinf(starts)] = 0.0
+            times = np.where(missing, 0.0, seconds - starts[cases])
+        else:
+            if start_time != None:
+                startingTime = start_time.timestamp()
+            elif (~missing).any():
+                startingTime = seconds[~missing].min()
             else:
-                weekday = -1
-                monthday = -1 
-                time = 0.0
-            label = self._extract_xes_key(self.LABEL_ATTR, event, self.DEFAULT)
-            lifecycle = self._extract_xes_key(self.LIFE_ATTR, event, self.DEFAULT)
-            resource = str(self._extract_xes_key(self.RESOURCE_ATTR, event , self.DEFAULT))
-            data = SequenceData(time,weekday,monthday,hour,label,lifecycle,resource)
-            timepoints.append(data)
-        timepoints = sorted(timepoints, key=lambda x: x.time)
-        return timepoints
-
-    def _convert_log(self,log:EventLog,start_time=None) -> List[List[SequenceData]]:
-        log_sequences = []
-        try :
-            from pmkoalas.complex import ComplexEventLog
-            if isinstance(log, ComplexEventLog):
-                if self._time_transform == self.TimestampTransform.relative_to_log:
-                    if start_time != None:
-                        startingTime = start_time.timestamp()
-                    else:
-                        startingTime = None
-                        for variant, traces in log:
-                            for trace in traces:
-                                time = self._extract_xes_key(self.TIME_ATTR, trace[0], None)
-                                if time == None:
-                                    continue
-                                elif startingTime == None and time != None:
-                                    startingTime = time 
-                                else:
-                                    if (time < startingTime):
-                                        startingTime = time
-                if self._time_transform == self.TimestampTransform.constant_per_event:
-                    startingTime = datetime.fromtimestamp(curr_time())
-                for variant, traces in log:
-                        for trace in traces:
-                            if self._time_transform == self.TimestampTransform.relative_to_trace:
-                                startingTime = self._extract_xes_key(self.TIME_ATTR, trace[0], None)
-                            if self._time_transform != self.TimestampTransform.raw:
-                                log_sequences.append(self._convert_trace(trace,startingTime.timestamp()))
-                            else:
-                                log_sequences.append(self._convert_trace(trace,0))
+                startingTime = 0.0
+            self._origin = float(startingTime)
+            times = np.where(missing, 0.0, seconds - startingTime)
+        # only keep the rows that pass the filters, times are found first so
+        # that they stay relative to the whole log
+        rows = self._select_rows(frame, cases, case_ids, seconds, missing)
+        if rows is not None:
+            cases, _ = factorize(cases[rows], sort=False)
+            cases = cases.astype(np.int64)
+            lengths = np.bincount(cases, minlength=cases.max()+1 if len(rows) else 0)
+            offsets = np.zeros(len(lengths)+1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            by_case = rows[np.argsort(cases, kind="stable")]
+        else:
+            rows = np.arange(num_events, dtype=np.int64)
+        # order events by time within each case
+        order = rows[np.lexsort((times[rows], cases))]
+        label, label_vocab = self._encode_frame_column(frame, self.LABEL_ATTR, order)
+        lifecycle, lifecycle_vocab = self._encode_frame_column(frame, self.LIFE_ATTR, order)
+        resource, resource_vocab = self._encode_frame_column(frame, self.RESOURCE_ATTR, order)
+        # keep case attributes from the first row of each case
+        firsts = by_case[offsets[:-1]]
+        attributes = dict()
+        for key in self._kept_attributes():
+            column = frame.get(f"case:{key}", frame.get(key, None))
+            if column is None:
+                self._missing_key(key, "dataframe")
+                attributes[key] = [ None for _ in firsts ]
             else:
-                raise ValueError("not a pmkoalas data structure")
-        except:
-            if start_time == None:
-                startingTime = log[0][0][self.TIME_ATTR].timestamp()
+                values = column.to_numpy()[firsts]
+                attributes[key] = [ 
+                    None if v is None or v != v else v 
+                    for v in values.tolist() 
+                ]
+        table = SequenceTable(
+            times[order], timestamp[order], utc_offset[order],
+            label, lifecycle, resource, offsets,
+            label_vocab, lifecycle_vocab, resource_vocab,
+            attributes=attributes
+        )
+        return self._sort(table)
+
+    def _read_column(self, trace:Trace, key:str, adapter:LogAdapter, 
+                     default:Any) -> List[Any]:
+        values, missing = adapter.column(trace, key)
+        if missing:
+            self._missing_key(key, "event")
+            if default != None:
+                values = [ default if v is None else v for v in values ]
+        return values
+
+    def _select_rows(self, frame:Any, cases:np.ndarray, case_ids:np.ndarray,
+                     seconds:np.ndarray, missing:np.ndarray) -> Optional[np.ndarray]:
+        """
+        Returns the rows of a dataframe that pass the filters (and sample),
+        or None if every row is kept. Predicates are called once per 
+        distinct value.
+        """
+        if self._case_filter is None and not self._filters_events() \
+            and self._sample is None:
+            return None
+        from pandas import factorize
+        keep = np.ones(len(frame), dtype=bool)
+        passed = np.ones(len(case_ids), dtype=bool)
+        if self._case_filter is not None:
+            passed = np.array([ bool(self._case_filter(c)) for c in case_ids ], dtype=bool)
+        population = np.flatnonzero(passed)
+        chosen = self._sample_positions(len(population), 
+            lambda: self._frame_strata(frame, cases, population, seconds, missing))
+        if chosen is not None:
+            passed[:] = False
+            passed[population[chosen]] = True
+        if self._case_filter is not None or chosen is not None:
+            keep &= passed[cases]
+        if self._activity_filter is not None:
+            column = self._extract_frame_column(frame, self.LABEL_ATTR)
+            if column is None:
+                keep &= bool(self._activity_filter(self.DEFAULT))
             else:
-                startingTime = start_time.timestamp()
-            for trace in log:
-                log_sequences.append(self._convert_trace(trace,startingTime))
-        # handle sorting the returned extraction
-        if self._sorting == self.TraceSorting.firstevent:
-            log_sequences = sorted(log_sequences,
-                key=lambda x: x[0].time if len(x)> 0 else startingTime
+                codes, uniques = factorize(column.to_numpy())
+                # missing labels have a code of -1, i.e. the last entry
+                passed = np.array(
+                    [ bool(self._activity_filter(u)) for u in uniques ] 
+                    + [ bool(self._activity_filter(self.DEFAULT)) ],
+                    dtype=bool
+                )
+                keep &= passed[codes]
+        if self._time_window is not None:
+            start, end = self._time_window
+            keep &= ~missing & (seconds >= start) & (seconds < end)
+        return np.flatnonzero(keep)
+
+    def _frame_strata(self, frame:Any, cases:np.ndarray, population:np.ndarray,
+                      seconds:np.ndarray, missing:np.ndarray) -> np.ndarray:
+        """
+        Returns the stratum of each case in the population of a dataframe.
+        """
+        from pandas import factorize
+        num_cases = cases.max() + 1 if len(cases) else 0
+        if self._sample.strategy == TraceSample.Strategy.starttime:
+            firsts = np.full(num_cases, np.inf)
+            np.minimum.at(firsts, cases[~missing], seconds[~missing])
+            firsts[np.isinf(firsts)] = np.nan
+            return self._sample.start_strata(firsts[population])
+        column = self._extract_frame_column(frame, self.LABEL_ATTR)
+        if column is None:
+            return np.zeros(len(population), dtype=np.int64)
+        codes, _ = factorize(column.to_numpy())
+        # the labels of each case, in the order of the rows
+        by_case = np.argsort(cases, kind="stable")
+        codes = codes[by_case].astype(np.int64)
+        offsets = np.zeros(num_cases+1, dtype=np.int64)
+        np.cumsum(np.bincount(cases, minlength=num_cases), out=offsets[1:])
+        variants = dict()
+        return np.array([
+            variants.setdefault(codes[offsets[c]:offsets[c+1]].tobytes(), len(variants))
+            for c in population
+        ], dtype=np.int64)
+
+    def _convert_trace(self, trace:Trace, startingTime:float, 
+                       adapter:LogAdapter) -> Tuple[List[Any],...]:
+        stamps = self._read_column(trace, self.TIME_ATTR, adapter, None)
+        labels = self._read_column(trace, self.LABEL_ATTR, adapter, self.DEFAULT)
+        positions = self._select_events(stamps, labels)
+        if positions is not None:
+            # only read the remaining columns for the kept events
+            events = list(trace)
+            trace = [ events[i] for i in positions ]
+            stamps = [ stamps[i] for i in positions ]
+            labels = [ labels[i] for i in positions ]
+        lifecycles = self._read_column(trace, self.LIFE_ATTR, adapter, self.DEFAULT)
+        resources = self._read_column(trace, self.RESOURCE_ATTR, adapter, self.DEFAULT)
+        return self._convert_columns(stamps, labels, lifecycles, resources, 
+                                     startingTime, positions=positions)
+
+    def _convert_columns(self, stamps:List[Optional[datetime]], labels:List[str],
+                         lifecycles:List[str], resources:List[str], 
+                         startingTime:float, 
+                         positions:List[int]=None) -> Tuple[List[Any],...]:
+        """
+        Converts the columns of a trace, positions are the event numbers of
+        the given events in the trace (when some events were not kept).
+        """
+        if None in stamps:
+            instants = [ np.nan if time == None else time.timestamp() for time in stamps ]
+        else:
+            instants = [ time.timestamp() for time in stamps ]
+        if self._time_transform == self.TimestampTransform.constant_per_event:
+            if positions is None:
+                positions = range(len(stamps))
+            times = [ 
+                0.0 if time == None else float(self._constant_time_per_event * ev_no)
+                for ev_no, time in zip(positions, stamps)
+            ]
+        else:
+            times = [ 
+                0.0 if instant != instant else instant - startingTime
+                for instant in instants
+            ]
+        utc_offsets = self._utc_offsets(stamps)
+        # order events by time, keeping the log order for ties
+        order = sorted(range(len(times)), key=times.__getitem__)
+        return tuple(
+            [ col[i] for i in order ]
+            for col 
+            in (times, instants, utc_offsets, labels, lifecycles, resources)
+        )
+
+    def _utc_offsets(self, stamps:List[Optional[datetime]]) -> List[int]:
+        """
+        Returns the offset (as seconds) of the wall clock time of each 
+        timestamp from UTC, which the calendar fields are derived from.
+        """
+        zone = None
+        for time in stamps:
+            if time != None:
+                zone = time.tzinfo
+                break
+        if isinstance(zone, timezone):
+            # a fixed offset shared by the trace only needs to be found once
+            zones = [ zone if time == None else time.tzinfo for time in stamps ]
+            if zones.count(zone) == len(zones):
+                offset = int(zone.utcoffset(None).total_seconds())
+                return [ offset ] * len(stamps)
+        return [ self._utc_offset(time) for time in stamps ]
+
+    def _utc_offset(self, time:Optional[datetime]) -> int:
+        if time == None:
+            return 0
+        offset = time.utcoffset()
+        if offset == None:
+            # naive timestamps are wall clock times in the local timezone
+            wall = (time - self._NAIVE_EPOCH).total_seconds()
+            return int(round(wall - time.timestamp()))
+        return int(offset.total_seconds())
+
+    def _convert_stream(self, reader:XesStreamReader, start_time=None) -> SequenceTable:
+        """
+        Extracts sequence data from a streamed XES file, traces are converted
+        as they are read and only their columns are kept. A uniform sample 
+        keeps the sampled traces in a reservoir and converts them once the 
+        file is read, while a stratified sample converts every trace and 
+        then keeps the sampled rows.
+        """
+        builder = SequenceTableBuilder()
+        relative = self._time_transform == self.TimestampTransform.relative_to_log
+        startingTime = None
+        if relative and start_time != None:
+            startingTime = start_time.timestamp()
+        earliest = None
+        attributes = { key : [] for key in self._kept_attributes() }
+        reservoir = None
+        if self._sample is not None and not self._sample.stratified:
+            reservoir = self._sample.reservoir()
+        # for a stratified sample, the row of each trace (or -1) and the 
+        # columns needed to find its stratum
+        rows, labels_seen, firsts_seen = [], [], []
+
+        def add(stamps, labels, lifecycles, resources, origin, values):
+            positions = self._select_events(stamps, labels)
+            if positions is not None:
+                if len(positions) == 0:
+                    return False
+                stamps = [ stamps[i] for i in positions ]
+                labels = [ labels[i] for i in positions ]
+                lifecycles = [ lifecycles[i] for i in positions ]
+                resources = [ resources[i] for i in positions ]
+            for key, value in zip(attributes.keys(), values):
+                attributes[key].append(value)
+            builder.add_trace(
+                *self._convert_columns(stamps, labels, lifecycles, resources, 
+                                       origin, positions=positions)
             )
-        elif self._sorting == self.TraceSorting.tracelength:
+            return True
+
+        for case, stamps, labels, lifecycles, resources in reader:
+            origin = 0.0
+            first = stamps[0] if len(stamps) > 0 else None
+            if first != None:
+                if earliest == None or first < earliest:
+                    earliest = first
+                if self._time_transform == self.TimestampTransform.relative_to_trace:
+                    origin = first.timestamp()
+            if relative and startingTime != None:
+                origin = startingTime
+            if self._case_filter is not None and not self._case_filter(case):
+                continue
+            values = [ reader.trace_attributes.get(key, None) for key in attributes ]
+            if reservoir is not None:
+                reservoir.offer(
+                    (stamps, labels, lifecycles, resources, origin, values)
+                    if reservoir.wants() else None
+                )
+                continue
+            if self._sample is not None:
+                labels_seen.append(labels)
+                firsts_seen.append(min(
+                    [ time.timestamp() for time in stamps if time != None ],
+                    default=np.nan
+                ))
+                rows.append(len(builder))
+                if not add(stamps, labels, lifecycles, resources, origin, values):
+                    rows[-1] = -1
+                continue
+            add(stamps, labels, lifecycles, resources, origin, values)
+        if reservoir is not None:
+            for item in reservoir.items():
+                add(*item)
+            if reservoir.seen > self._sample.size:
+                self._sample_rate = self._sample.size / reservoir.seen
+        table = builder.build()
+        table.attributes = attributes
+        if self._sample is not None and reservoir is None:
+            chosen = self._sample_positions(len(rows), 
+                        lambda: self._trace_strata(labels_seen, firsts_seen))
+            if chosen is not None:
+                kept = np.asarray(rows, dtype=np.int64)[chosen]
+                table = table.take(kept[kept >= 0])
+        if relative and startingTime == None and earliest != None:
+            # the origin of the log is only known after reading the last trace
+            startingTime = earliest.timestamp()
+            found = ~np.isnan(table.timestamp)
+            table.time[found] -= startingTime
+        self._origin = startingTime
+        return self._sort(table)
+
+    def _convert_traces(self, traces:List[Trace], origins:List[float], 
+                        adapter:LogAdapter) -> SequenceTable:
+        builder = SequenceTableBuilder()
+        for trace, origin in zip(traces, origins):
+            builder.add_trace(*self._convert_trace(trace, origin, adapter))
+        return builder.build()
+
+    def _log_strata(self, traces:List[Trace], adapter:LogAdapter) -> np.ndarray:
+        """
+        Returns the stratum of each trace, reading only the column needed.
+        """
+        if self._sample.strategy == TraceSample.Strategy.starttime:
+            firsts = []
+            for trace in traces:
+                stamps = [ 
+                    time.timestamp() 
+                    for time in self._read_column(trace, self.TIME_ATTR, adapter, None) 
+                    if time != None 
+                ]
+                firsts.append(min(stamps) if len(stamps) > 0 else np.nan)
+            return self._trace_strata(None, firsts)
+        return self._trace_strata([ 
+            self._read_column(trace, self.LABEL_ATTR, adapter, self.DEFAULT)
+            for trace in traces
+        ], None)
+
+    def _convert_log(self,log:EventLog,start_time=None,workers:int=1,
+                     adapter:LogAdapter=None) -> SequenceTable:
+        if adapter == None:
+            adapter = find_adapter(log)
+        traces = adapter.traces(log)
+        origins = adapter.origins(self, traces, start_time=start_time)
+        if self._time_transform == self.TimestampTransform.relative_to_log \
+            and len(origins) > 0:
+            self._origin = float(origins[0])
+        if self._case_filter is not None:
+            # origins are found before filtering, to keep times relative to
+            # the whole log
+            kept = [ 
+                i for i, trace in enumerate(traces) 
+                if self._case_filter(adapter.attribute(trace, self.CASE_ID_ATTR))
+            ]
+            traces = [ traces[i] for i in kept ]
+            origins = [ origins[i] for i in kept ]
+        chosen = self._sample_positions(len(traces), 
+                                        lambda: self._log_strata(traces, adapter))
+        if chosen is not None:
+            traces = [ traces[i] for i in chosen ]
+            origins = [ origins[i] for i in chosen ]
+        frequencies = None
+        if self._collapse and chosen is None and self._case_filter is None \
+            and not self._filters_events():
+            groups = adapter.variants(log)
+            if groups is not None:
+                # only convert the first trace of each variant
+                _, firsts, frequencies = np.unique(groups, return_index=True,
+                                                   return_counts=True)
+                traces = [ traces[i] for i in firsts ]
+                origins = [ origins[i] for i in firsts ]
+        if workers < 1:
+            workers = cpu_count()
+        if workers > 1 and len(traces) > workers:
+            # convert chunks of traces in a process pool, each chunk returns 
+            # a table and the tables are merged back in log order
+            chunks = workers * self._chunks_per_worker
+            size = int(np.ceil(len(traces) / chunks))
+            settings = (self._sorting, self._time_transform,
+                        self._time_window, self._activity_filter)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                tables = list(pool.map(
+                    _convert_chunk,
+                    [ settings for _ in range(0, len(traces), size) ],
+                    [ adapter for _ in range(0, len(traces), size) ],
+                    [ traces[i:i+size] for i in range(0, len(traces), size) ],
+                    [ origins[i:i+size] for i in range(0, len(traces), size) ],
+                ))
+            table = SequenceTable.concat(tables)
+        else:
+            table = self._convert_traces(traces, origins, adapter)
+        for key in self._kept_attributes():
+            table.attributes[key] = [ adapter.attribute(t, key) for t in traces ]
+        if frequencies is not None:
+            table.attributes[SequenceTable.FREQUENCY] = frequencies.tolist()
+        if self._filters_events():
+            table = table.take(np.flatnonzero(table.trace_lengths() > 0))
+        # handle sorting the returned extraction
+        if self._sorting == self.TraceSorting.tracelength:
             print("sorting by trace length")
-            log_sequences = sorted(log_sequences,key=lambda x: len(x))
-        return log_sequences
\ No newline at end of file
+        return self._sort(table)
+
+class _MemberOf():
+    """
+    A (picklable) predicate for whether a value is one of the given values.
+    """
+
+    def __init__(self, values:Collection[Any]) -> None:
+        self._values = frozenset(values)
+
+    def __call__(self, value:Any) -> bool:
+        return value in self._values
+
+    def __repr__(self) -> str:
+        return f"_MemberOf({sorted(repr(v) for v in self._values)})"
+
+def _convert_chunk(settings:Tuple[Any,...], adapter:LogAdapter, 
+                   traces:List[Trace], origins:List[float]) -> SequenceTable:
+    """
+    Converts a chunk of traces in a worker process, where settings are the
+    arguments for SequenceDataExtractor._configure.
+    """
+    extractor = SequenceDataExtractor()
+    extractor._configure(*settings)
+    return extractor._convert_traces(traces, origins, adapter)
@@ -0,0 +1,216 @@
+"""
+Sampling traces during extraction, so that huge event logs can be plotted
+from a representative subset of their traces.\n
+Samples are repeatable, the same seed picks the same traces from the same
+log, whether the log is given as a list of traces or streamed from a file.
+
+Call sequence:
+---
+```
+sample = TraceSample(5000, strategy=TraceSample.Strategy.variant, seed=7)
+presentor = StaticDottedChartPresentor(log, sample=sample)
+```
+"""
+from typing import Any, List, Optional, Tuple
+from enum import Enum, auto
+from math import exp, floor, log
+from random import Random
+
+import numpy as np
+
+class TraceSample():
+    """
+    Describes a sample of traces to extract from an event log.\n
+
+    Parameters:
+    ----
+    size:`int`\n
+    [Required] The number of traces to keep, logs with fewer traces are not
+    sampled.\n
+    \n
+    strategy:`TraceSample.Strategy=Strategy.uniform`\n
+    [Optional] How traces are picked, see TraceSample.Strategy.\n
+    \n
+    seed:`int=0`\n
+    [Optional] The seed for picking traces.\n
+    \n
+    buckets:`int=10`\n
+    [Optional] The number of equal width start time buckets to stratify by,
+    when the strategy is `starttime`.\n
+    """
+
+    class Strategy(Enum):
+        """
+        Determines how traces are sampled.\n
+        `uniform` keeps a uniform random sample of traces with a reservoir,
+        in a single pass over the log. `variant` and `starttime` stratify
+        traces, by their sequence of labels or by the bucket of their first
+        event, and sample each stratum in proportion to its size. Each
+        stratum keeps at least one trace when the size allows, so that rare
+        variants are still shown.
+        """
+        uniform = auto()
+        variant = auto()
+        starttime = auto()
+
+    def __init__(self, size:int, strategy:Strategy=Strategy.uniform,
+                 seed:int=0, buckets:int=10) -> None:
+        if size < 1:
+            raise ValueError(f"Sample size must be at least one :: given {size}")
+        if buckets < 1:
+            raise ValueError(f"Sample buckets must be at least one :: given {buckets}")
+        self.size = int(size)
+        self.strategy = strategy
+        self.seed = seed
+        self.buckets = int(buckets)
+
+    @property
+    def stratified(self) -> bool:
+        return self.strategy != self.Strategy.uniform
+
+    def reservoir(self) -> 'Reservoir':
+        """
+        Returns an empty reservoir for a uniform sample.
+        """
+        return Reservoir(self.size, seed=self.seed)
+
+    def select(self, population:int, strata:np.ndarray=None) -> Optional[np.ndarray]:
+        """
+        Returns the (sorted) positions of the sampled traces out of a
+        population of traces, or None if every trace is kept. Stratified
+        samples need the stratum of each trace.
+        """
+        if population <= self.size:
+            return None
+        if not self.stratified:
+            reservoir = self.reservoir()
+            reservoir.offer_range(population)
+            return np.asarray(reservoir.items(), dtype=np.int64)
+        _, strata = np.unique(np.asarray(strata), return_inverse=True)
+        strata = strata.reshape(-1)
+        counts = np.bincount(strata)
+        quotas = self._allocate(counts)
+        # give each trace a random priority, then keep the traces with the
+        # lowest priorities in each stratum
+        priority = np.random.default_rng(self.seed).random(population)
+        order = np.lexsort((priority, strata))
+        starts = np.zeros(len(counts), dtype=np.int64)
+        np.cumsum(counts[:-1], out=starts[1:])
+        ranks = np.empty(population, dtype=np.int64)
+        ranks[order] = np.arange(population) - np.repeat(starts, counts)
+        return np.flatnonzero(ranks < quotas[strata])
+
+    def _allocate(self, counts:np.ndarray) -> np.ndarray:
+        """
+        Returns the number of traces to keep from each stratum, in proportion
+        to their sizes with at least one per stratum when the size allows.
+        """
+        quotas = np.zeros(len(counts), dtype=np.int64)
+        if self.size < len(counts):
+            # too few to cover each stratum, so cover the largest strata
+            quotas[np.argsort(-counts, kind="stable")[:self.size]] = 1
+            return quotas
+        shares = (self.size - len(counts)) * (counts - 1) / max(counts.sum() - len(counts), 1)
+        quotas = 1 + np.floor(shares).astype(np.int64)
+        # hand out what is left by the largest remainder
+        left = self.size - quotas.sum()
+        if left > 0:
+            quotas[np.argsort(-(shares - np.floor(shares)), kind="stable")[:left]] += 1
+        return np.minimum(quotas, counts)
+
+    def start_strata(self, firsts:np.ndarray) -> np.ndarray:
+        """
+        Returns the start time bucket of each trace, given the time of each
+        trace's first event (NaN for traces without one).
+        """
+        firsts = np.asarray(firsts, dtype=np.float64)
+        found = ~np.isnan(firsts)
+        strata = np.full(len(firsts), self.buckets, dtype=np.int64)
+        if found.any():
+            low = firsts[found].min()
+            width = (firsts[found].max() - low) / self.buckets
+            if width > 0:
+                strata[found] = np.minimum(
+                    ((firsts[found] - low) // width).astype(np.int64),
+                    self.buckets - 1
+                )
+            else:
+                strata[found] = 0
+        return strata
+
+    def __repr__(self) -> str:
+        return f"TraceSample({self.size}, {self.strategy.name}, seed={self.seed!r}, buckets={self.buckets})"
+
+class Reservoir():
+    """
+    A uniform random sample of a fixed size over a stream of items, see
+    Li (1994) "Reservoir-sampling algorithms of time complexity
+    O(n(1+log(N/n)))". Items are offered one at a time, and after the first
+    `size` items only the items that replace a sampled item need any work.
+    """
+
+    def __init__(self, size:int, seed:int=0) -> None:
+        self._size = size
+        self._random = Random(seed)
+        self._kept:List[Tuple[int,Any]] = []
+        self._seen = 0
+        self._weight = 1.0
+        self._next = size
+
+    @property
+    def seen(self) -> int:
+        """
+        The number of items offered so far.
+        """
+        return self._seen
+
+    def _uniform(self) -> float:
+        value = 0.0
+        while value <= 0.0 or value >= 1.0:
+            value = self._random.random()
+        return value
+
+    def _advance(self) -> None:
+        # find the position of the next item to replace a sampled item
+        self._weight *= exp(log(self._uniform()) / self._size)
+        self._next += floor(log(self._uniform()) / log(1.0 - self._weight)) + 1
+
+    def wants(self) -> bool:
+        """
+        Returns whether the next offered item will be sampled.
+        """
+        return self._seen < self._size or self._seen == self._next
+
+    def offer(self, item:Any) -> None:
+        """
+        Offers the next item of the stream.
+        """
+        position = self._seen
+        self._seen += 1
+        if position < self._size:
+            self._kept.append((position, item))
+            if position == self._size - 1:
+                self._next = position
+                self._advance()
+        elif position == self._next:
+            self._kept[self._random.randrange(self._size)] = (position, item)
+            self._advance()
+
+    def offer_range(self, count:int) -> None:
+        """
+        Offers the positions of the next count items as the items, skipping
+        straight to the items that are sampled.
+        """
+        end = self._seen + count
+        while self._seen < min(end, self._size):
+            self.offer(self._seen)
+        while self._next < end:
+            self._seen = self._next
+            self.offer(self._seen)
+        self._seen = end
+
+    def items(self) -> List[Any]:
+        """
+        Returns the sampled items, in the order they were offered.
+        """
+        return [ item for _, item in sorted(self._kept, key=lambda k: k[0]) ]
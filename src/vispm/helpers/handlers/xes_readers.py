@@ -0,0 +1,185 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from xml.etree.ElementTree import iterparse
+from datetime import datetime
+from os import PathLike
+import gzip
+import re
+
+XesTrace = Tuple[Optional[str], List[Optional[datetime]], List[str], List[str], List[str]]
+
+class XesStreamReader():
+    """
+    Incrementally reads a XES (or XES.gz) file, yielding a trace at a time
+    and only keeping the attributes needed for visualisation. Elements are
+    discarded as soon as they are read, so memory stays flat regardless of
+    the size of the log or the number of unused attributes it carries.\n
+    Iterating over the reader yields a tuple for each trace of:\n
+    \t(case identifier, timestamps, labels, lifecycles, resources)\n
+    where missing timestamps are None and missing labels, lifecycles and
+    resources are the given default. The other attributes of the trace 
+    last yielded are found in `trace_attributes`.\n
+
+    Call sequence:
+    ---
+    ```
+    reader = XesStreamReader("BPI_Challenge_2012.xes.gz")
+    for case, times, labels, lifecycles, resources in reader:
+        ...
+    ```
+
+    Parameters:
+    ----
+    path:`str`\n
+    [Required] The path to the XES file, gzipped files are detected by their
+    content rather than the extension.\n
+    \n
+    case_key:`str="concept:name"`\n
+    [Optional] The trace attribute used as the case identifier.\n
+    \n
+    time_key, label_key, lifecycle_key, resource_key:`str`\n
+    [Optional] The event attributes to keep, default to the XES standard
+    extension keys.\n
+    \n
+    default:`str="MISSING"`\n
+    [Optional] The value used when an event is missing a label, lifecycle or
+    resource.\n
+    """
+
+    GZIP_MAGIC = b"\x1f\x8b"
+    ISO_DATE = re.compile(
+        r"(\d{4}-\d{2}-\d{2})[T ](\d{2}:\d{2}(?::\d{2})?)(?:[.,](\d+))?"
+        r"(Z|[+-]\d{2}(?::?\d{2})?)?$"
+    )
+
+    def __init__(self, path:Union[str,PathLike], case_key:str="concept:name",
+                 time_key:str="time:timestamp", label_key:str="concept:name",
+                 lifecycle_key:str="lifecycle:transition",
+                 resource_key:str="org:resource",
+                 default:str="MISSING") -> None:
+        self._path = path
+        self._case_key = case_key
+        self._time_key = time_key
+        self._event_keys = {
+            label_key : 1,
+            lifecycle_key : 2,
+            resource_key : 3,
+        }
+        self._default = default
+        self.attributes:Dict[str,str] = dict()
+        self.trace_attributes:Dict[str,Any] = dict()
+
+    def _open(self) -> Any:
+        with open(self._path, "rb") as handle:
+            magic = handle.read(2)
+        if magic == self.GZIP_MAGIC:
+            return gzip.open(self._path, "rb")
+        return open(self._path, "rb")
+
+    @staticmethod
+    def _local(tag:str) -> str:
+        return tag.rsplit("}", 1)[-1]
+
+    @classmethod
+    def parse_date(cls, value:str) -> datetime:
+        """
+        Parses the value of a XES date attribute, raising a ValueError if it
+        is not an ISO 8601 date.
+        """
+        try :
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+        # older versions of python only read three or six fractional digits,
+        # offsets with a colon and no Z for UTC
+        found = cls.ISO_DATE.match(value.strip())
+        if found == None:
+            raise ValueError(f"XES date is not in ISO 8601 format :: {value}")
+        date, time, fraction, offset = found.groups()
+        if time.count(":") == 1:
+            time = time + ":00"
+        if fraction != None:
+            time = time + "." + fraction[:6].ljust(6, "0")
+        if offset == "Z":
+            offset = "+00:00"
+        elif offset != None and ":" not in offset:
+            offset = offset[:3] + ":" + (offset[3:] or "00")
+        try :
+            return datetime.fromisoformat(f"{date}T{time}{offset or ''}")
+        except ValueError:
+            raise ValueError(f"XES date is not a valid date :: {value}")
+
+    @classmethod
+    def parse_value(cls, tag:str, value:str) -> Any:
+        """
+        Parses the value of a XES attribute with the given (local) tag.
+        """
+        try :
+            if tag == "date":
+                return cls.parse_date(value)
+            elif tag == "int":
+                return int(value)
+            elif tag == "float":
+                return float(value)
+            elif tag == "boolean":
+                return value.lower() == "true"
+        except ValueError:
+            pass
+        return value
+
+    def __iter__(self) -> Iterator[XesTrace]:
+        depth = 0
+        trace_depth = None
+        event_depth = None
+        root = None
+        case = None
+        event = None
+        times, labels, lifecycles, resources = [], [], [], []
+        with self._open() as handle:
+            for action, elem in iterparse(handle, events=("start","end")):
+                if action == "start":
+                    depth += 1
+                    if root is None:
+                        root = elem
+                    elif depth == 2:
+                        if self._local(elem.tag) == "trace":
+                            trace_depth = depth
+                            case = None
+                            self.trace_attributes = dict()
+                            times, labels, lifecycles, resources = [], [], [], []
+                    elif trace_depth != None and depth == trace_depth + 1 \
+                        and self._local(elem.tag) == "event":
+                        event_depth = depth
+                        event = [ None, self._default, self._default, self._default ]
+                    continue
+                # handle the end of an element
+                if event_depth != None:
+                    if depth == event_depth + 1:
+                        key = elem.get("key")
+                        if key == self._time_key and self._local(elem.tag) == "date":
+                            event[0] = self.parse_date(elem.get("value"))
+                        elif key in self._event_keys:
+                            event[self._event_keys[key]] = elem.get("value")
+                    elif depth == event_depth:
+                        times.append(event[0])
+                        labels.append(event[1])
+                        lifecycles.append(event[2])
+                        resources.append(event[3])
+                        event_depth = None
+                        elem.clear()
+                elif trace_depth != None:
+                    if depth == trace_depth + 1 and elem.get("key") != None:
+                        key = elem.get("key")
+                        if key == self._case_key:
+                            case = elem.get("value")
+                        self.trace_attributes[key] = self.parse_value(
+                            self._local(elem.tag), elem.get("value")
+                        )
+                    elif depth == trace_depth:
+                        trace_depth = None
+                        root.clear()
+                        yield (case, times, labels, lifecycles, resources)
+                elif depth == 2 and elem.get("key") != None \
+                    and self._local(elem.tag) in ("string", "date", "int", "float", "boolean", "id"):
+                    self.attributes[elem.get("key")] = elem.get("value")
+                    root.remove(elem)
+                depth -= 1
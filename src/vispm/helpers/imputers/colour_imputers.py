@@ -2,9 +2,11 @@
 from typing import Set, Tuple,Any,List
 from abc import ABC,abstractmethod
 
+import numpy as np
+
 from vispm.helpers.colours.colourmaps import CATEGORICAL
 
-from vispm.helpers.data.log_data import SequenceData
+from vispm.helpers.data.log_data import SequenceData, SequenceTable, TraceView
 
 class ColourImputer(ABC):
 
@@ -12,6 +14,20 @@ class ColourImputer(ABC):
     def __call__(self, *args:Any, **kwds: Any) -> Any:
         pass
 
+    def colour_table(self, table:SequenceTable) -> np.ndarray:
+        """
+        Returns the colour of every event in the table as an array of RGBA
+        rows, in the order of the table's events. By default each trace is
+        coloured in turn, subclasses can colour a whole column at once.
+        """
+        colours = np.zeros((table.num_events, 4), dtype=np.float64)
+        offsets = table.offsets.tolist()
+        for trace_id, trace in enumerate(table):
+            if len(trace) > 0:
+                colours[offsets[trace_id]:offsets[trace_id+1]] = \
+                    self(trace_id=trace_id, seq_data=trace)
+        return colours
+
     @abstractmethod
     def _set_cm(self,cm):
         pass
@@ -23,15 +39,21 @@ class ColourImputer(ABC):
 class EventLabelColourer(ColourImputer):
     """
     Colours event data by event label, will return the same colour for each label.\n
-    Colour choice is decided by FIFO.
+    Colour choice is decided by FIFO.\n
+    When given a TraceView, colours are looked up by the integer codes of 
+    the table rather than by hashing each label.
     """
 
+    _column = "label"
+
     def __init__(self,cm=None) -> None:
         self._cm = CATEGORICAL
         self._loop_back_counter = 25
         self._seen_labels = dict()
         self._seen_order = list()
         self._counter = 0
+        self._vocab = None
+        self._code_colours = dict()
 
         if cm != None:
             self._cm = cm 
@@ -39,16 +61,56 @@ class EventLabelColourer(ColourImputer):
             self._loop_back_counter = len(self._cm.colors)
 
     def __call__(self, seq_data:List[SequenceData], *args, **kwags) -> List[Tuple[float,float,float,float]]:
+        if isinstance(seq_data, TraceView):
+            return self._colour_codes(
+                getattr(seq_data, self._column), 
+                seq_data.table.vocab(self._column)
+            )
         colours = []
         for seq in seq_data:
             colours.append(self._get_colour(seq))
         return colours
 
+    def colour_table(self, table:SequenceTable) -> np.ndarray:
+        codes = np.asarray(getattr(table, self._column))
+        vocab = table.vocab(self._column)
+        palette = np.zeros((len(vocab), 4), dtype=np.float64)
+        if len(codes) == 0:
+            return np.zeros((0, 4), dtype=np.float64)
+        # colours are handed out in order of first appearance, as when
+        # colouring trace by trace
+        found, firsts = np.unique(codes, return_index=True)
+        for code in found[np.argsort(firsts)].tolist():
+            palette[code] = self._colour_for_key(vocab[code])
+        return palette[codes]
+
+    def _colour_codes(self, codes:np.ndarray, vocab:List[str]) -> List[Tuple[float,float,float,float]]:
+        """
+        Returns the colour for each code into the given vocabulary.
+        """
+        if vocab is not self._vocab:
+            self._vocab = vocab
+            self._code_colours = dict()
+        colours = []
+        for code in codes.tolist():
+            colour = self._code_colours.get(code)
+            if colour is None:
+                colour = self._colour_for_key(vocab[code])
+                self._code_colours[code] = colour
+            colours.append(colour)
+        return colours
+
+    def _key(self, data:SequenceData) -> str:
+        return data.label
+
     def _get_colour(self, data:SequenceData) -> Tuple[float,float,float,float]:
-        if data.label in self._seen_labels.keys():
-            return self._query_colour(self._seen_labels[data.label])
+        return self._colour_for_key(self._key(data))
+
+    def _colour_for_key(self, key:str) -> Tuple[float,float,float,float]:
+        if key in self._seen_labels.keys():
+            return self._query_colour(self._seen_labels[key])
         else:
-            self._seen_labels[data.label] = self._counter
+            self._seen_labels[key] = self._counter
             c = self._query_colour(self._counter)
             if c not in self._seen_order:
                 self._seen_order.append(c)
@@ -60,6 +122,7 @@ class EventLabelColourer(ColourImputer):
 
     def _set_cm(self, cm):
         self._cm = cm
+        self._vocab = None
         if hasattr(self._cm, 'colors'):
             self._loop_back_counter = len(self._cm.colors)
         else: 
@@ -74,19 +137,13 @@ class ResourceColourer(EventLabelColourer):
     Colour choice is decided by FIFO.
     """
 
+    _column = "resource"
+
     def __init__(self,cm=None) -> None:
         super().__init__(cm=cm)
 
-    def _get_colour(self, data:SequenceData) -> Tuple[float,float,float,float]:
-        if data.resource in self._seen_labels.keys():
-            return self._query_colour(self._seen_labels[data.resource])
-        else:
-            self._seen_labels[data.resource] = self._counter
-            c = self._query_colour(self._counter)
-            if c not in self._seen_order:
-                self._seen_order.append(c)
-            self._counter += 1
-            return c
+    def _key(self, data:SequenceData) -> str:
+        return data.resource
 
 class TraceColourer(ColourImputer):
     """
@@ -110,6 +167,18 @@ class TraceColourer(ColourImputer):
             self._seen_order.append(color)
         return [color for _ in range(len(seq_data))]
 
+    def colour_table(self, table:SequenceTable) -> np.ndarray:
+        lengths = table.trace_lengths()
+        trace_ids = np.arange(len(table))
+        # colours repeat after the first loop of traces
+        for trace_id in trace_ids[:self._loop_back_counter].tolist():
+            self(trace_id=trace_id, seq_data=[])
+        colours = np.asarray(
+            self._cm((trace_ids % self._loop_back_counter)/self._loop_back_counter),
+            dtype=np.float64
+        ).reshape(-1, 4)
+        return np.repeat(colours, lengths, axis=0)
+
     def _set_cm(self, cm):
         self._cm = cm
         if hasattr(self._cm, 'colors'):
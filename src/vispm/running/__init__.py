@@ -0,0 +1,2 @@
+from .dotted import RunningDottedChartPresentor
+from .sources import replay, feed_queue
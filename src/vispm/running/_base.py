@@ -0,0 +1,44 @@
+from ..helpers.metaclasses.vispm import Presentor
+
+from abc import abstractmethod
+from typing import Any
+
+from matplotlib.figure import Figure
+from matplotlib.axes import Axes
+
+class RunningPresentor(Presentor):
+    """
+    Meta class for any running presentor, which updates its chart as new
+    data arrives. Each sub-class must implement this interface to be used
+    in the library.
+    """
+
+    def __init__(self, debug:bool=True) -> None:
+        self._show_debug = debug
+
+    def _debug(self, message:str, end:str="\n"):
+        if self._show_debug:
+            print(f"[{self.__class__.__name__}] {message} ",end=end)
+
+    @abstractmethod
+    def push(self, event:Any) -> None:
+        """
+        Adds a new event to the chart.
+        """
+        pass
+
+    @abstractmethod
+    def refresh(self, force:bool=False) -> bool:
+        """
+        Redraws the chart with the events added so far, returns whether the
+        chart was redrawn.
+        """
+        pass
+
+    @abstractmethod
+    def get_axes(self) -> Axes:
+        pass
+
+    @abstractmethod
+    def get_figure(self) -> Figure:
+        pass
@@ -0,0 +1,301 @@
+from enum import Enum
+from ..helpers.data.event_buffer import EventBuffer
+from ..helpers.colours.colourmaps import CATEGORICAL
+from ._base import RunningPresentor
+from .sources import CASE_KEY, TIME_KEY, LABEL_KEY, RESOURCE_KEY
+
+from typing import Any, AsyncIterable, Dict, Iterable, List, Mapping, Tuple, Union
+from datetime import datetime
+from time import monotonic
+import asyncio
+
+import numpy as np
+
+from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+from matplotlib.colors import ListedColormap
+from matplotlib.ticker import FuncFormatter
+
+class RunningDottedChartPresentor(RunningPresentor):
+    """
+    Presentor for a dotted chart that updates as events arrive, e.g. to
+    watch a live case stream. Each case is given a row in the order that
+    cases are first seen, and events are placed by their timestamp.\n
+    Events are kept in preallocated arrays that grow as needed, see
+    vispm.helpers.data.event_buffer.EventBuffer. Events are pushed in
+    batches and the chart is redrawn at most `refresh_rate` times a second,
+    by updating a single collection with all the kept events.
+
+    Call sequence:
+    ---
+    To use presentor call the following methods:
+    ```
+    presentor = RunningDottedChartPresentor(window=100000)
+    for event in stream:
+        presentor.push(event)
+    # or
+    presentor.consume(stream)
+    # or from an asyncio.Queue, until None is received
+    await presentor.consume_queue(queue)
+    ```
+    See vispm.running.sources for local stand-ins of a stream.
+
+    Parameters:
+    ----
+    dpi:`int=96`\n
+    [Optional] The dpi of the figure, if generating one.\n
+    \n
+    figsize:`Tuple[float,float]=(8,8)`\n
+    [Optional] The size of the figure, if generating one.\n
+    \n
+    ax:`Axes=None`\n
+    [Optional] The axes to draw on, otherwise a figure is generated.\n
+    \n
+    markersize:`float=4.0`\n
+    [Optional] The area of each marker in points squared.\n
+    \n
+    colormap:`ListedColormap=CATEGORICAL`\n
+    [Optional] The colours to use for events.\n
+    \n
+    event_colour_scheme:`EventColourScheme=EventColourScheme.Trace`\n
+    [Optional] How events are coloured.\n
+    \n
+    refresh_rate:`float=4.0`\n
+    [Optional] The most times a second that the chart is redrawn.\n
+    \n
+    window:`int=None`\n
+    [Optional] The most events to keep, once reached the oldest events are
+    dropped so memory stays bounded for long running monitoring. Cases with
+    no kept events may be given a new row if seen again.\n
+    \n
+    capacity:`int=4096`\n
+    [Optional] The number of events to allocate for at first.\n
+    \n
+    title:`str="Running Dotted Chart"`\n
+    [Optional] The title of the chart.\n
+    \n
+    debug:`bool=True`\n
+    [Optional] Whether to print debug messages.\n
+    """
+
+    class EventColourScheme(Enum):
+        """
+        Parameter Enum for event_colour_scheme of
+        RunningDottedChartPresentor. Sets how events are coloured as they
+        arrive.
+
+        Selection
+        -----
+        `EventColourScheme.Trace`\n
+        \t Events will be coloured via trace identifier.\n
+        `EventColourScheme.EventLabel`\n
+        \t Events will be coloured via event label, in a FIFO manner.\n
+        `EventColourScheme.Resource`\n
+        \t Events will be coloured via resource, in a FIFO manner.
+        """
+        Trace=CASE_KEY
+        EventLabel=LABEL_KEY
+        Resource=RESOURCE_KEY
+
+    def __init__(self, dpi:int=96, figsize:Tuple[float,float]=(8,8),
+        ax:Axes=None, markersize:float=4.0,
+        colormap:ListedColormap=CATEGORICAL,
+        event_colour_scheme:EventColourScheme=EventColourScheme.Trace,
+        refresh_rate:float=4.0,
+        window:int=None,
+        capacity:int=4096,
+        title:str="Running Dotted Chart",
+        debug:bool=True
+        ) -> None:
+        super().__init__(debug=debug)
+        if refresh_rate <= 0:
+            raise ValueError(f"Refresh rate must be positive :: given {refresh_rate}")
+        self._colour_scheme = self.EventColourScheme(event_colour_scheme)
+        self._cm = colormap
+        self._loop_back_counter = 25
+        if hasattr(self._cm, 'colors'):
+            self._loop_back_counter = len(self._cm.colors)
+        self._min_interval = 1.0 / refresh_rate
+        self._buffer = EventBuffer(capacity=capacity, window=window)
+        self._cases:Dict[Any,int] = dict()
+        self._case_count = 0
+        self._keys:Dict[Any,int] = dict()
+        self._pending_time:List[float] = []
+        self._pending_row:List[int] = []
+        self._pending_key:List[int] = []
+        self._last_draw = None
+        self._stale = False
+        # as with static presentors, only show the figure when asked to
+        reset_it = plt.isinteractive()
+        if reset_it:
+            plt.ioff()
+        if ax == None:
+            self._fig = plt.figure(figsize=figsize,dpi=dpi,constrained_layout=True)
+            self._ax = self._fig.add_subplot(1,1,1)
+        else:
+            self._fig = ax.get_figure()
+            self._ax = ax
+        if reset_it:
+            plt.ion()
+        self._layer = self._ax.scatter(
+            np.zeros(0), np.zeros(0), s=markersize, linewidths=0
+        )
+        self._title = title
+        self._ax.set_title(title)
+        self._ax.set_xlabel("Time")
+        self._ax.set_ylabel("Trace")
+        self._ax.xaxis.set_major_formatter(FuncFormatter(self._format_time))
+        self._ax.tick_params(axis="x", labelrotation=-90, labelsize=6)
+        self._debug("Ready to receive events...")
+
+    def _format_time(self, tick:float, position:int=None) -> str:
+        try :
+            return datetime.fromtimestamp(tick).strftime('%d/%m/%Y\n%H:%M:%S')
+        except (OverflowError, OSError, ValueError):
+            return ""
+
+    def _intern(self, seen:Dict[Any,int], key:Any) -> int:
+        code = seen.get(key)
+        if code == None:
+            code = len(seen)
+            seen[key] = code
+        return code
+
+    def push(self, event:Mapping[str,Any]) -> None:
+        """
+        Adds an event to the chart, redrawing the chart if it is due.\n
+        The event is a mapping with the keys of SequenceDataExtractor, i.e.
+        `case:concept:name`, `time:timestamp` and optionally `concept:name`
+        and `org:resource`. The timestamp is either a datetime or seconds
+        since the epoch.
+        """
+        time = event[TIME_KEY]
+        if isinstance(time, datetime):
+            time = time.timestamp()
+        row = self._cases.get(event[CASE_KEY])
+        if row == None:
+            # rows keep counting up, even when old cases have been dropped
+            row = self._case_count
+            self._cases[event[CASE_KEY]] = row
+            self._case_count += 1
+        self._pending_time.append(float(time))
+        self._pending_row.append(row)
+        if self._colour_scheme == self.EventColourScheme.Trace:
+            self._pending_key.append(row)
+        else:
+            self._pending_key.append(
+                self._intern(self._keys, event.get(self._colour_scheme.value))
+            )
+        self.refresh()
+
+    def _colours(self, keys:np.ndarray) -> np.ndarray:
+        return self._cm((keys % self._loop_back_counter)/self._loop_back_counter)
+
+    def flush(self) -> int:
+        """
+        Moves the pushed events into the kept events, without redrawing,
+        returning the number of events moved.
+        """
+        count = len(self._pending_time)
+        if count == 0:
+            return 0
+        keys = np.asarray(self._pending_key, dtype=np.int64)
+        self._buffer.extend(
+            np.asarray(self._pending_time, dtype=np.float64),
+            np.asarray(self._pending_row, dtype=np.int64),
+            self._colours(keys)
+        )
+        self._pending_time = []
+        self._pending_row = []
+        self._pending_key = []
+        self._stale = True
+        window = self._buffer.window
+        if window != None and len(self._cases) > 2 * window:
+            # forget cases that no longer have any kept events
+            _, rows, _ = self._buffer.columns()
+            lowest = rows.min()
+            self._cases = dict(
+                (case, row) for case, row in self._cases.items() if row >= lowest
+            )
+        return count
+
+    def refresh(self, force:bool=False) -> bool:
+        """
+        Redraws the chart with the events pushed so far, if a redraw is due
+        under the refresh rate or forced. Returns whether the chart was
+        redrawn.
+        """
+        if not force and self._last_draw != None and \
+            monotonic() - self._last_draw < self._min_interval:
+            return False
+        self.flush()
+        if not self._stale:
+            return False
+        times, rows, colors = self._buffer.columns()
+        self._layer.set_offsets(np.column_stack((times, rows)))
+        self._layer.set_facecolors(colors)
+        if len(times) > 0:
+            left, right = times.min(), times.max()
+            pad = max((right - left) * 0.02, 1.0)
+            self._ax.set_xlim(left - pad, right + pad)
+            self._ax.set_ylim(rows.min() - 1, rows.max() + 1)
+        self._set_title()
+        self._stale = False
+        self._fig.canvas.draw_idle()
+        self._fig.canvas.flush_events()
+        # measured after drawing, so slow draws do not starve the stream
+        self._last_draw = monotonic()
+        return True
+
+    def _set_title(self) -> None:
+        title = f"{self._title}\n ({self._buffer.total} events"
+        if self._buffer.total > len(self._buffer):
+            title += f", showing the last {len(self._buffer)}"
+        self._ax.set_title(title + ")")
+
+    def consume(self, events:Iterable[Mapping[str,Any]]) -> int:
+        """
+        Pushes each event from an iterable, redrawing the chart at the end of
+        the stream. Returns the number of events pushed.
+        """
+        count = 0
+        for event in events:
+            self.push(event)
+            count += 1
+        self.refresh(force=True)
+        self._debug(f"Consumed {count} events...")
+        return count
+
+    async def consume_queue(self, source:Union[asyncio.Queue,AsyncIterable[Mapping[str,Any]]]) -> int:
+        """
+        Pushes each event from an asyncio queue, until None is received, or
+        from an asynchronous iterable. The chart is redrawn at the end of the
+        stream. Returns the number of events pushed.
+        """
+        count = 0
+        if isinstance(source, asyncio.Queue):
+            while True:
+                event = await source.get()
+                source.task_done()
+                if event == None:
+                    break
+                self.push(event)
+                count += 1
+        else:
+            async for event in source:
+                self.push(event)
+                count += 1
+        self.refresh(force=True)
+        self._debug(f"Consumed {count} events...")
+        return count
+
+    @property
+    def buffer(self) -> EventBuffer:
+        return self._buffer
+
+    def get_axes(self) -> Axes:
+        return self._ax
+
+    def get_figure(self) -> Figure:
+        return self._fig
@@ -0,0 +1,116 @@
+"""
+Local stand-ins for a live stream of events, which replay a recorded log in
+time order. Each event is a dict with the case, timestamp, label and
+resource of the event, using the keys of SequenceDataExtractor.
+
+Call sequence:
+---
+```
+presentor = RunningDottedChartPresentor()
+presentor.consume(replay(log))
+# or with asyncio
+queue = asyncio.Queue(maxsize=1024)
+await asyncio.gather(
+    feed_queue(queue, replay(log)),
+    presentor.consume_queue(queue)
+)
+```
+"""
+from ..helpers.handlers.log_runners import SequenceDataExtractor
+from ..helpers.handlers.log_adapters import find_adapter
+from ..helpers.handlers.xes_readers import XesStreamReader
+from ..helpers.metaclasses.pm4py import EventLog
+
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+from os import PathLike
+import asyncio
+
+CASE_KEY = SequenceDataExtractor.CASE_ATTR
+TIME_KEY = SequenceDataExtractor.TIME_ATTR
+LABEL_KEY = SequenceDataExtractor.LABEL_ATTR
+RESOURCE_KEY = SequenceDataExtractor.RESOURCE_ATTR
+
+def _frame_events(frame:Any) -> Iterator[Dict[str,Any]]:
+    keys = [ key for key in (CASE_KEY, TIME_KEY, LABEL_KEY, RESOURCE_KEY)
+             if key in frame.columns ]
+    frame = frame[keys].dropna(subset=[TIME_KEY])
+    frame = frame.sort_values(TIME_KEY, kind="stable")
+    for row in frame.itertuples(index=False, name=None):
+        event = dict(zip(keys, row))
+        event[TIME_KEY] = event[TIME_KEY].to_pydatetime()
+        yield event
+
+def _traces(event_log:Any) -> Iterator[Tuple[Any,List[Any],List[Any],List[Any]]]:
+    """
+    Yields the case, timestamps, labels and resources of each trace.
+    """
+    if isinstance(event_log, XesStreamReader):
+        for case, times, labels, _, resources in event_log:
+            yield case, times, labels, resources
+        return
+    adapter = find_adapter(event_log)
+    for number, trace in enumerate(adapter.traces(event_log)):
+        case = adapter.attribute(trace, SequenceDataExtractor.CASE_ID_ATTR)
+        yield (
+            case if case != None else number,
+            adapter.column(trace, TIME_KEY)[0],
+            adapter.column(trace, LABEL_KEY)[0],
+            adapter.column(trace, RESOURCE_KEY)[0]
+        )
+
+def replay(event_log:Union[EventLog,str]) -> Iterator[Dict[str,Any]]:
+    """
+    Yields the events of a recorded log in time order, as a stand-in for a
+    live stream. Events without a timestamp are skipped.\n
+
+    Parameters:
+    ----
+    event_log:`Union[EventLog,str]`\n
+    [Required] The log to replay, any log that StaticDottedChartPresentor
+    can extract, or the path to a xes file.\n
+    """
+    if isinstance(event_log, (str, PathLike)):
+        event_log = XesStreamReader(event_log)
+    if hasattr(event_log, "columns") and TIME_KEY in event_log.columns:
+        yield from _frame_events(event_log)
+        return
+    events = []
+    for case, times, labels, resources in _traces(event_log):
+        for time, label, resource in zip(times, labels, resources):
+            if time != None:
+                events.append((time, case, label, resource))
+    events.sort(key=lambda event: event[0])
+    for time, case, label, resource in events:
+        yield {
+            CASE_KEY : case,
+            TIME_KEY : time,
+            LABEL_KEY : label,
+            RESOURCE_KEY : resource
+        }
+
+async def feed_queue(queue:asyncio.Queue, events:Iterable[Dict[str,Any]],
+                     delay:float=0.0) -> int:
+    """
+    Puts the events onto an asyncio queue, followed by None to mark the end
+    of the stream, returning the number of events put.\n
+
+    Parameters:
+    ----
+    queue:`asyncio.Queue`\n
+    [Required] The queue to put events onto.\n
+    \n
+    events:`Iterable[Dict[str,Any]]`\n
+    [Required] The events to put, e.g. from `replay`.\n
+    \n
+    delay:`float=0.0`\n
+    [Optional] Seconds to wait between events. Without a delay, other tasks
+    only run while the queue is full, so the queue should have a maxsize.\n
+    """
+    count = 0
+    for event in events:
+        await queue.put(event)
+        count += 1
+        if delay > 0:
+            await asyncio.sleep(delay)
+    await queue.put(None)
+    return count
@@ -1,3 +1,5 @@
 
 
 from .dotted import StaticDottedChartPresentor
+from .batch import RenderJob, RenderResult, render_batch
+from .export import SaveReport, save_hybrid
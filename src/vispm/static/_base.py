@@ -1,9 +1,11 @@
 
 from ..helpers.metaclasses.vispm import Presentor
 from ..extensions._base import ChartExtension
+from .export import SaveReport, save_hybrid
 
 from abc import abstractmethod
-from typing import Any, List
+from typing import Any, List, Union
+from os import PathLike
 
 from matplotlib.figure import Figure
 from matplotlib.axes import Axes
@@ -36,6 +38,21 @@ class StaticPresentor(Presentor):
     def get_figure(self) -> Figure:
         pass 
 
+    def export(self, path:Union[str,PathLike], raster_dpi:int=300, 
+               **kwargs:Any) -> SaveReport:
+        """
+        Saves the figure, where saving to a vector format (e.g. pdf or svg) 
+        rasterizes the layers that draw events, and the bars of histograms 
+        with many bars, into one image per axes of the presentor and of its
+        extensions, at raster_dpi. Axes, ticks, text and colourbars stay as
+        vectors. Returns the size of the file and
+        the time taken to save, see vispm.static.export.\n
+        Other keyword arguments are passed to `Figure.savefig`.
+        """
+        report = save_hybrid(self.get_figure(), path, raster_dpi=raster_dpi, **kwargs)
+        self._debug(f"Saved {report}")
+        return report
+
     def _adjust_for_extensions(self, fig:Figure) -> Axes:
         # work out gridspec 
         norths = [ ext for ext in self._extensions if ext.get_direction() == ChartExtension.Direction.NORTH ]
@@ -0,0 +1,355 @@
+"""
+Rendering many dotted charts to image files without a display, e.g. a chart
+per log, colour scheme and set of extensions.\n
+Jobs are rendered over a pool of processes on the Agg backend. Each log is
+extracted once for all the jobs that use it with the same extraction
+options, the extraction is saved with vispm.helpers.data.sequence_storage
+and memory-mapped by each job that renders it.
+
+Call sequence:
+---
+```
+jobs = [
+    RenderJob(log, "bpic_trace.png"),
+    RenderJob(log, ["bpic_label.png", "bpic_label.pdf"],
+        event_colour_scheme=StaticDottedChartPresentor.EventColourScheme.EventLabel,
+        extensions=[DottedEventHistogramExtension()]
+    ),
+]
+for result in render_batch(jobs, workers=4):
+    print(result)
+```
+"""
+from ..helpers.data.log_data import SequenceTable
+from ..helpers.data.sequence_storage import save_table, load_table
+from ..helpers.handlers.log_runners import SequenceDataExtractor
+from ..helpers.handlers.log_adapters import find_adapter
+from ..helpers.handlers.xes_readers import XesStreamReader
+from ..extensions._base import ChartExtension
+from .dotted import StaticDottedChartPresentor
+from .export import save_hybrid
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from os import PathLike, cpu_count
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import os
+
+from matplotlib import pyplot as plt
+
+# the options of StaticDottedChartPresentor that change the extraction, and
+# their names for SequenceDataExtractor
+EXTRACTION_OPTIONS = {
+    "starting_time" : "start_time",
+    "trace_sorting" : "sorting",
+    "time_transform" : "time_transform",
+    "sort_by" : "sort_by",
+    "time_window" : "time_window",
+    "case_filter" : "case_filter",
+    "activity_filter" : "activity_filter",
+    "sample" : "sample",
+    "collapse_variants" : "collapse_variants",
+}
+
+class RenderJob():
+    """
+    A dotted chart to render to one or more files.\n
+
+    Parameters:
+    ----
+    event_log:`Union[EventLog,SequenceTable,str]`\n
+    [Required] The log to plot, as given to StaticDottedChartPresentor.\n
+    \n
+    paths:`Union[str,List[str]]`\n
+    [Required] The files to save the chart to, the format of each file is
+    taken from its suffix (e.g. png, svg or pdf).\n
+    \n
+    extensions:`List[vispm.extensions._base.ChartExtension]=None`\n
+    [Optional] The extensions to add to the chart, each job plots its own
+    copy of the extensions.\n
+    \n
+    log_key:`str=None`\n
+    [Optional] Names the log, so that jobs with the same key share an
+    extraction. Otherwise jobs share an extraction when they are given the
+    same path or the same log object.\n
+    \n
+    raster_dpi:`int=None`\n
+    [Optional] When given, vector formats (e.g. pdf or svg) are saved with 
+    the events of each axes rasterized as one image at this dpi, see 
+    vispm.static.export.\n
+    \n
+    **options\n
+    [Optional] Keyword arguments for StaticDottedChartPresentor.\n
+    """
+
+    def __init__(self, event_log:Any, paths:Union[str,PathLike,List[str]],
+                 extensions:List[ChartExtension]=None, log_key:str=None,
+                 raster_dpi:int=None, **options:Any) -> None:
+        if isinstance(paths, (str, PathLike)):
+            paths = [ paths ]
+        if len(paths) < 1:
+            raise ValueError("Render job needs at least one path to save to.")
+        self.event_log = event_log
+        self.paths = [ os.fspath(p) for p in paths ]
+        self.extensions = extensions if extensions != None else []
+        self.log_key = log_key
+        self.raster_dpi = raster_dpi
+        self.options = options
+
+    def log_identity(self) -> Tuple[str,Any]:
+        """
+        Returns what identifies the log of this job between jobs.
+        """
+        if self.log_key != None:
+            return ("key", self.log_key)
+        if isinstance(self.event_log, (str, PathLike)):
+            return ("path", os.path.abspath(os.fspath(self.event_log)))
+        if isinstance(self.event_log, XesStreamReader):
+            return ("path", os.path.abspath(os.fspath(self.event_log._path)))
+        return ("object", id(self.event_log))
+
+    def extraction_options(self) -> Dict[str,Any]:
+        """
+        Returns the options of this job for SequenceDataExtractor.
+        """
+        return dict(
+            (name, self.options[option])
+            for option, name in EXTRACTION_OPTIONS.items()
+            if option in self.options
+        )
+
+    def extraction_key(self) -> Tuple[Any,...]:
+        """
+        Returns the key of the extraction for this job, jobs with the same key
+        share an extraction.
+        """
+        options = self.extraction_options()
+        return (self.log_identity(),
+                tuple( (k, repr(options[k])) for k in sorted(options) ))
+
+    def __repr__(self) -> str:
+        return f"RenderJob({self.log_identity()!r}, {self.paths!r})"
+
+class RenderResult():
+    """
+    The outcome of a render job, with timings in seconds.\n
+    `extract_seconds` is the time spent extracting the log of the job, which
+    is shared with the `shared_with` other jobs that used the same
+    extraction. `plot_seconds` is the time spent plotting the chart, and
+    `save_seconds` the time spent saving each path, with the size of each
+    file in `save_bytes`. If the job failed,
+    `error` describes why and nothing after the failure was timed.
+    """
+
+    def __init__(self, job:RenderJob, extract_seconds:float=0.0,
+                 shared_with:int=0, plot_seconds:float=0.0,
+                 save_seconds:Dict[str,float]=None,
+                 save_bytes:Dict[str,int]=None,
+                 error:Optional[str]=None) -> None:
+        self.job = job
+        self.extract_seconds = extract_seconds
+        self.shared_with = shared_with
+        self.plot_seconds = plot_seconds
+        self.save_seconds = save_seconds if save_seconds != None else dict()
+        self.save_bytes = save_bytes if save_bytes != None else dict()
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error == None
+
+    @property
+    def total_seconds(self) -> float:
+        """
+        The time spent on this job, with the extraction split between the
+        jobs that shared it.
+        """
+        return self.extract_seconds / (self.shared_with + 1) + \
+            self.plot_seconds + sum(self.save_seconds.values())
+
+    def __repr__(self) -> str:
+        if not self.ok:
+            return f"RenderResult({self.job.paths!r}, error={self.error!r})"
+        saves = ", ".join( 
+            f"{os.path.basename(p)}={s:.2f}s/{self.save_bytes.get(p, 0) / 1e6:.2f}MB" 
+            for p,s in self.save_seconds.items() 
+        )
+        return f"RenderResult(extract={self.extract_seconds:.2f}s, plot={self.plot_seconds:.2f}s, save=[{saves}])"
+
+# the charts kept by a process to re-render jobs with the same options
+_TEMPLATES:Dict[str,StaticDottedChartPresentor] = dict()
+
+def _headless() -> None:
+    plt.switch_backend("Agg")
+
+def _extract(event_log:Any, options:Dict[str,Any], cache:Any, workers:int,
+             path:str) -> Tuple[Optional[str],float]:
+    """
+    Extracts the log and saves the table to path, returning the name of the
+    log and the time taken.
+    """
+    start = perf_counter()
+    if isinstance(event_log, (str, PathLike)):
+        event_log = XesStreamReader(event_log)
+    table = SequenceDataExtractor(cache=cache)(event_log, workers=workers, **options)
+    save_table(table, path)
+    name = None
+    if not isinstance(event_log, SequenceTable):
+        name = find_adapter(event_log).name(event_log)
+    return name, perf_counter() - start
+
+def _render(job:RenderJob, path:str, name:Optional[str]) -> Tuple[float,Dict[str,float],Dict[str,int]]:
+    """
+    Plots the job from the saved table at path and saves it to the paths of
+    the job, returning the time taken to plot, and the time taken to save 
+    and size of each path.
+    """
+    start = perf_counter()
+    options = dict(job.options)
+    options.setdefault("debug", False)
+    options["workers"] = 1
+    options.pop("cache", None)
+    table = load_table(path, mmap=True)
+    # jobs without extensions re-render a chart with the same options, so 
+    # that only the data dependent part of plotting is repeated, while jobs
+    # with extensions plot their own, as a re-rendered chart would redraw
+    # the extensions of the job that made it rather than those of this job
+    key = None if len(job.extensions) > 0 else \
+        repr(sorted( (k, repr(v)) for k,v in options.items() ))
+    presentor = _TEMPLATES.pop(key, None)
+    if presentor != None:
+        fig = presentor.rerender(table, log_name=name)
+    else:
+        presentor = StaticDottedChartPresentor(table, **options)
+        if name != None:
+            presentor._log_name = name
+        for extension in job.extensions:
+            presentor.add_extension(extension)
+        fig = presentor.plot()
+    plot_seconds = perf_counter() - start
+    saves = dict()
+    sizes = dict()
+    try :
+        for target in job.paths:
+            if job.raster_dpi != None:
+                report = save_hybrid(fig, target, raster_dpi=job.raster_dpi)
+                saves[target] = report.seconds
+            else:
+                start = perf_counter()
+                fig.savefig(target)
+                saves[target] = perf_counter() - start
+            sizes[target] = os.path.getsize(target)
+    except:
+        plt.close(fig)
+        raise
+    if key != None:
+        _TEMPLATES[key] = presentor
+    else:
+        plt.close(fig)
+    return plot_seconds, saves, sizes
+
+def _close_templates() -> None:
+    for presentor in _TEMPLATES.values():
+        plt.close(presentor.get_figure())
+    _TEMPLATES.clear()
+
+def _detach(job:RenderJob, copy_extensions:bool=False) -> RenderJob:
+    """
+    Returns a copy of the job without its log, as renders plot from the 
+    saved extraction, so that the log is not sent with every render.
+    """
+    extensions = deepcopy(job.extensions) if copy_extensions else job.extensions
+    return RenderJob(None, job.paths, extensions=extensions,
+                     log_key=job.log_key, raster_dpi=job.raster_dpi,
+                     **job.options)
+
+def _outcome(call:Any, *arguments:Any) -> Any:
+    """
+    Calls in this process, keeping either the returned value or the raised
+    exception like a future.
+    """
+    try :
+        return (call(*arguments), None)
+    except Exception as e:
+        return (None, e)
+
+def _result(outcome:Any) -> Any:
+    if isinstance(outcome, tuple):
+        value, error = outcome
+        if error != None:
+            raise error
+        return value
+    return outcome.result()
+
+def render_batch(jobs:List[RenderJob], workers:int=1) -> List[RenderResult]:
+    """
+    Renders the jobs, returning a result for each job in the same order.\n
+    When workers is more than one, logs are extracted and jobs are rendered
+    over a pool of processes on the Agg backend, values below one use every
+    available core. Otherwise jobs are rendered in this process on the
+    current backend. Each process re-renders the chart of its last job for
+    the next job with the same options, unless the job has extensions, as
+    each job plots its own copy of its extensions. Logs given as objects 
+    are pickled to the pool once per extraction. A failed job does not stop
+    the batch, see RenderResult.error.
+    """
+    if workers < 1:
+        workers = cpu_count()
+    groups:Dict[Tuple[Any,...],List[int]] = dict()
+    for position, job in enumerate(jobs):
+        groups.setdefault(job.extraction_key(), []).append(position)
+    results = [ RenderResult(job) for job in jobs ]
+    with TemporaryDirectory(prefix="vispm_batch_") as directory:
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_headless)
+        try :
+            # extract each log once per set of extraction options
+            extractions = []
+            for number, members in enumerate(groups.values()):
+                job = jobs[members[0]]
+                arguments = (job.event_log, job.extraction_options(),
+                             job.options.get("cache", None),
+                             1 if pool != None else job.options.get("workers", 1),
+                             os.path.join(directory, f"log_{number}"))
+                if pool != None:
+                    extractions.append(pool.submit(_extract, *arguments))
+                else:
+                    extractions.append(_outcome(_extract, *arguments))
+            # then render each job from its extraction
+            renders = []
+            for number, members in enumerate(groups.values()):
+                try :
+                    name, seconds = _result(extractions[number])
+                except Exception as e:
+                    for position in members:
+                        results[position].error = f"extraction failed :: {e!r}"
+                    continue
+                for position in members:
+                    results[position].extract_seconds = seconds
+                    results[position].shared_with = len(members) - 1
+                    job = jobs[position]
+                    path = os.path.join(directory, f"log_{number}")
+                    if pool != None:
+                        renders.append((position, pool.submit(
+                            _render, _detach(job), path, name)))
+                    else:
+                        # plot copies of the extensions, as a pool would
+                        renders.append((position, _outcome(
+                            _render, _detach(job, copy_extensions=True), path, name)))
+            for position, render in renders:
+                try :
+                    plot_seconds, saves, sizes = _result(render)
+                    results[position].plot_seconds = plot_seconds
+                    results[position].save_seconds = saves
+                    results[position].save_bytes = sizes
+                except Exception as e:
+                    results[position].error = f"render failed :: {e!r}"
+        finally:
+            if pool != None:
+                pool.shutdown()
+            else:
+                _close_templates()
+    return results
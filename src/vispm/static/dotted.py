@@ -1,19 +1,29 @@
-from enum import Enum
-from ..helpers.data.log_data import SequenceData
+from enum import Enum, auto
+from ..helpers.data.log_data import SequenceTable
+from ..helpers.data.density import density_image, DetailIndex
+from ..helpers.data.spatial_index import EventGrid
 from ..helpers.metaclasses.pm4py import EventLog
 from ..helpers.handlers.log_runners import SequenceDataExtractor
+from ..helpers.handlers.xes_readers import XesStreamReader
+from ..helpers.handlers.extraction_cache import ExtractionCache
+from ..helpers.handlers.log_adapters import find_adapter
+from ..helpers.handlers.trace_sampling import TraceSample
 from ..helpers.imputers.colour_imputers import ColourImputer, TraceColourer 
 from ..helpers.imputers.colour_imputers import EventLabelColourer, ResourceColourer
 from ..helpers.colours.colourmaps import CATEGORICAL
-from ..helpers.iters.tools import iter_chunker
 from ..extensions._base import ChartExtension
 from ._base import StaticPresentor
+from .export import SaveReport
 
-from typing import List, Tuple, Union
-from datetime import datetime
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple, Union
+from datetime import datetime, timedelta, timezone
+from os import PathLike
 from math import ceil, floor
 
+import numpy as np
+
 from matplotlib import pyplot as plt
+from matplotlib.cm import get_cmap
 from matplotlib.artist import Artist
 from matplotlib.axes import Axes
 from matplotlib.figure import Figure
@@ -45,6 +55,13 @@ class StaticDottedChartPresentor(StaticPresentor):
     attributes attached to the event log.\n
     Currently assumes that the given log, is very similar to the pm4py 
     implementation.\n
+    A previously extracted `SequenceTable` can also be given, which will be 
+    plotted as is.\n
+    A pandas DataFrame with a row per event (as returned by 
+    `pm4py.read_xes`) can also be given, which is extracted using columnar 
+    operations.\n
+    A path to a XES (or XES.gz) file can also be given, which is read 
+    incrementally without building an event log in memory.\n
     \n
     dpi:`int=96`\n
     [Optional] The dpi of the figure, if generating one.\n
@@ -65,7 +82,8 @@ class StaticDottedChartPresentor(StaticPresentor):
     \n
     trace_sorting:`StaticDottedChartPresentor.TraceSorting=firstevent`\n
     [Optional] Decides how traces are sorted on the y-axis for plotting,
-    default value sorts traces by the timestamp of their first event.
+    default value sorts traces by the timestamp of their first event. The 
+    order can be changed after extraction with `sort`.
     \n
     time_transform:`StaticDottedChartPresentor.TimeTransform=relative_to_log`\n
     [Optional] Decides how the timestamp for events are handled for plotting 
@@ -86,6 +104,82 @@ class StaticDottedChartPresentor(StaticPresentor):
     \n
     debug:`bool=True`\n
     [Optional] Sets whether debug messages are printed.\n
+    \n
+    connect_events:`bool=False`\n
+    [Optional] Sets whether the events of each trace are joined by a line.\n
+    \n
+    connect_colours:`bool=False`\n
+    [Optional] Sets whether the line of each trace has the colour (and a 
+    third of the alpha) of the first event of the trace, rather than a faint
+    black.\n
+    \n
+    workers:`int=1`\n
+    [Optional] The number of processes used to extract sequence data from 
+    the event log, values below one use every available core.\n
+    \n
+    cache:`vispm.helpers.handlers.extraction_cache.ExtractionCache=None`\n
+    [Optional] An on-disk cache of extractions, when given the extraction 
+    is skipped if the same log has been extracted with the same options.\n
+    \n
+    sort_by:`str=None`\n
+    [Optional] The case attribute or activity to sort traces by, required 
+    when trace_sorting is `caseattribute` or `activitystart`.\n
+    \n
+    time_window:`Tuple[datetime.datetime,datetime.datetime]=None`\n
+    [Optional] Only plot events from the start (inclusive) to the end 
+    (exclusive) of the window, either may be None. Events outside of the 
+    window are skipped during extraction.\n
+    \n
+    case_filter:`Union[Collection[str],Callable[[str],bool]]=None`\n
+    [Optional] Only plot the traces whose case identifier is in the given
+    collection, or passes the given predicate.\n
+    \n
+    activity_filter:`Union[Collection[str],Callable[[str],bool]]=None`\n
+    [Optional] Only plot the events whose label is in the given collection,
+    or passes the given predicate.\n
+    \n
+    sample:`Union[int,vispm.helpers.handlers.trace_sampling.TraceSample]=None`\n
+    [Optional] Only plot a sample of the traces, either the number of traces
+    to sample uniformly or a TraceSample. The rate of sampling is shown in 
+    the title and given to extensions as `sample_rate`.\n
+    \n
+    collapse_variants:`bool=False`\n
+    [Optional] Plot one row per variant, using the first trace of each 
+    variant in the log, rather than a row per trace.\n
+    \n
+    variant_encoding:`StaticDottedChartPresentor.VariantEncoding=VariantEncoding.Thickness`\n
+    [Optional] Sets how the number of traces of each variant is shown, when
+    variants are collapsed.\n
+    \n
+    rasterized:`bool=False`\n
+    [Optional] Sets whether events are drawn as a raster image when saving
+    to vector formats (e.g. pdf or svg), which keeps the file size and save
+    time down for large logs. To also rasterize the bins of extensions only
+    when saving, see `export`.\n
+    \n
+    render_mode:`Union[StaticDottedChartPresentor.RenderMode,str]=RenderMode.Points`\n
+    [Optional] Sets whether events are drawn as markers, or aggregated to 
+    the pixels of the chart and drawn as a single image (`"density"`).\n
+    \n
+    density_blend:`bool=True`\n
+    [Optional] Sets whether a pixel in the density mode has the mean colour
+    of its events, or the most common colour of its events.\n
+    \n
+    detail_points:`int=50000`\n
+    [Optional] The most events that are drawn as markers in the level of 
+    detail mode, when more events are in view they are drawn as an image.\n
+    \n
+    hover:`bool=False`\n
+    [Optional] Sets whether a tooltip describes the event nearest to the 
+    mouse, see `nearest_event`.\n
+    \n
+    hover_radius:`float=5.0`\n
+    [Optional] How close (in pixels) the mouse must be to an event, to hover
+    over or pick the event.\n
+    \n
+    on_pick:`Callable[[Dict[str,Any]],None]=None`\n
+    [Optional] Called with the event nearest to the mouse when the chart is
+    clicked, as described by `nearest_event`.\n
 
     """
 
@@ -97,6 +191,8 @@ class StaticDottedChartPresentor(StaticPresentor):
     _colour_schemer = None
     _show_debug = True
     _marksize =0.5
+    _layers = None
+    _tooltip = None
 
     TraceSorting = SequenceDataExtractor.TraceSorting
     TimeTransform = SequenceDataExtractor.TimestampTransform
@@ -119,7 +215,47 @@ class StaticDottedChartPresentor(StaticPresentor):
         def __call__(self,*args, **kwags) -> ColourImputer:
             return self.value(*args,**kwags)
 
-    def __init__(self, event_log:EventLog, dpi:int=96, 
+    class VariantEncoding(Enum):
+        """
+        Parameter Enum for variant_encoding of StaticDottedChartPresentor. 
+        Sets how the frequency of a variant is shown, when variants are 
+        collapsed. Frequencies are shown on a log scale.
+
+        Selection
+        -----
+        `VariantEncoding.Thickness`\n
+        \t Events of more frequent variants are drawn larger.\n
+        `VariantEncoding.Colour`\n
+        \t Events are coloured by the frequency of their variant, instead of
+        \t the event colour scheme.
+        """
+        Thickness=auto()
+        Colour=auto()
+
+    class RenderMode(Enum):
+        """
+        Parameter Enum for render_mode of StaticDottedChartPresentor. Sets 
+        how events are drawn, either by the Enum or its value.
+
+        Selection
+        -----
+        `RenderMode.Points`\n
+        \t Each event is drawn as a marker.\n
+        `RenderMode.Density`\n
+        \t Events are counted per pixel of the chart and drawn as a single 
+        \t image, so the cost of drawing depends on the size of the chart 
+        \t rather than the number of events.\n
+        `RenderMode.LevelOfDetail`\n
+        \t Only the events in view are drawn, as markers when few enough are
+        \t in view and otherwise as an image like `RenderMode.Density`. The
+        \t events in view are redrawn whenever the limits of the axes change,
+        \t e.g. when zooming or panning.
+        """
+        Points="points"
+        Density="density"
+        LevelOfDetail="lod"
+
+    def __init__(self, event_log:Union[EventLog,SequenceTable,str], dpi:int=96, 
         figsize:Tuple[float,float]=(8,8), ax:Axes=None,
         markersize:float=0.5, 
         starting_time=None,
@@ -127,12 +263,47 @@ class StaticDottedChartPresentor(StaticPresentor):
         time_transform:TimeTransform=TimeTransform.relative_to_log,
         colormap:ListedColormap=CATEGORICAL,debug:bool=True,
         event_colour_scheme:Union[EventColourScheme,ColourImputer]=EventColourScheme.Trace,
-        connect_events:bool=False
+        connect_events:bool=False,
+        connect_colours:bool=False,
+        workers:int=1,
+        cache:ExtractionCache=None,
+        sort_by:str=None,
+        time_window:Tuple[datetime,datetime]=None,
+        case_filter:Union[Collection[str],Callable[[str],bool]]=None,
+        activity_filter:Union[Collection[str],Callable[[str],bool]]=None,
+        sample:Union[int,TraceSample]=None,
+        collapse_variants:bool=False,
+        variant_encoding:VariantEncoding=VariantEncoding.Thickness,
+        rasterized:bool=False,
+        render_mode:Union[RenderMode,str]=RenderMode.Points,
+        density_blend:bool=True,
+        detail_points:int=50000,
+        hover:bool=False,
+        hover_radius:float=5.0,
+        on_pick:Callable[[Dict[str,Any]],None]=None
         ) -> None:
         super().__init__(debug=debug)
         self._sorting = trace_sorting
         self._time_transform = time_transform
         self._connect_events = connect_events
+        self._connect_colours = connect_colours
+        self._variant_encoding = variant_encoding
+        self._rasterized = rasterized
+        self._render_mode = self.RenderMode(render_mode)
+        self._density_blend = density_blend
+        self._detail_points = detail_points
+        self._detail_callbacks = []
+        self._detail_axes = None
+        self._detail_stale = False
+        self._density_artist = None
+        self._density_data = None
+        self._density_callback = None
+        self._hover = hover
+        self._hover_radius = hover_radius
+        self._on_pick = on_pick
+        self._pick_callbacks = []
+        self._pick_data = None
+        self._pick_grid = None
         # set default values
         self._marksize = markersize
         # so turns out its painful to not show a figure and still show it when needed.
@@ -157,13 +328,34 @@ class StaticDottedChartPresentor(StaticPresentor):
         self._marker_raidus = r_
         # process event data
         self._debug("Processing event data...")
+        if isinstance(event_log, (str, PathLike)):
+            event_log = XesStreamReader(event_log)
+        if cache != None:
+            self._extractor = SequenceDataExtractor(cache=cache)
+        self._workers = workers
+        self._filters = dict(
+            time_window=time_window, 
+            case_filter=case_filter, 
+            activity_filter=activity_filter
+        )
+        self._extraction = dict(
+            start_time=starting_time,
+            time_transform=time_transform,
+            workers=workers,
+            sample=sample,
+            collapse_variants=collapse_variants,
+            **self._filters
+        )
         self._sequences = self._extractor(event_log, 
-                                          start_time=starting_time,
                                           sorting=trace_sorting,
-                                          time_transform=time_transform
+                                          sort_by=sort_by,
+                                          **self._extraction
                                           )
+        self._sort_by = sort_by
         # handle colourer input
+        self._colour_scheme = None
         if isinstance(event_colour_scheme, self.EventColourScheme):
+            self._colour_scheme = (event_colour_scheme, colormap)
             self._colour_schemer = event_colour_scheme(cm=colormap)
         else:
             if issubclass(event_colour_scheme.__class__, ColourImputer):
@@ -171,113 +363,461 @@ class StaticDottedChartPresentor(StaticPresentor):
             else:
                 self._debug(f"Unknown ColourImputer passed, unsafe to continue : passed {event_colour_scheme.__class__.__name__} which is not a subclass of vispm.helpers.imputers.colour_imputers.ColourImputer.")
                 raise AttributeError("Given event colourer is not a subclass of ColourImputer.")
+        self._find_log_name(event_log)
+        self._debug("Ready to plot...")
+
+    def _find_log_name(self, event_log:EventLog) -> None:
         #try to find event log name in attributes
-        try:
-            from pmkoalas.complex import ComplexEventLog
-            if (isinstance(event_log, ComplexEventLog)):
-                self._log_name = event_log.name
+        if not isinstance(event_log, SequenceTable):
+            name = find_adapter(event_log).name(event_log)
+            if name != None:
+                self._log_name = name
             else:
-                raise ValueError("not a pmkoalas data structure")
-        except:
-            try :
-                self._log_name = event_log.attributes['concept:name'] 
-            except:
                 self._debug("Cannot find concept:name in eventlog attributes.")
-        self._debug("Ready to plot...")
 
-    def _create_dotted_frame(self,sequences:List[List[SequenceData]], ax:Axes) -> List[Artist]:
+    def _compile_frame(self, sequences:SequenceTable) -> Tuple[np.ndarray,np.ndarray,np.ndarray,Union[float,np.ndarray]]:
+        """
+        Returns the x and y position, colour and marker size of each event.
+        """
+        # each event is placed by its time and the row of its trace
+        lengths = sequences.trace_lengths()
+        x_data = np.asarray(sequences.time, dtype=np.float64) * self._x_scaler
+        y_data = np.repeat(np.arange(len(sequences)) * self._y_step, lengths)
+        colors = self._colour_schemer.colour_table(sequences)
+        # encode the frequency of collapsed variants on a log scale
+        sizes = self._marksize
+        if sequences.collapsed and sequences.num_events > 0:
+            frequencies = np.repeat(sequences.frequencies(), lengths)
+            share = np.log1p(frequencies) / np.log1p(frequencies.max())
+            if self._variant_encoding == self.VariantEncoding.Thickness:
+                sizes = self._marksize * (0.25 + 3.75 * share)
+            else:
+                colors = get_cmap("viridis")(share)
+        return x_data, y_data, colors, sizes
+
+    def _create_dotted_frame(self,sequences:SequenceTable, ax:Axes) -> List[Artist]:
+        """
+        Draws the events of the sequences, or when the chart is being 
+        re-rendered, swaps the data of the artists already drawn.
+        """
         self.update_plot_state(PLOT_STATE.PLOTTING)
         self._debug("Compiling plot data...             ", end="\r")
         all_artists = []
-        # preallocate mem space for speed
-        x_data = [  0.0 for trace in sequences for ev in trace ]
-        y_data = [ 0.0 for trace in sequences for ev in trace]
-        colors = [ (0.0,0.0,0.0,0.0) for trace in sequences for ev in trace ]
-        #collect markers
-        total_seqs = len(sequences)
-        percentile = ceil(total_seqs * 0.01)
-        start_idx = 0
-        for y,sequence in enumerate(sequences):
-            end_idx = start_idx + len(sequence)
-            new_colors = self._colour_schemer(trace_id=y,seq_data=sequence)
-            for idx,seq in enumerate(sequence): 
-                colors[start_idx+idx] = new_colors[idx]
-                x_data[start_idx+idx] = seq.time * self._x_scaler
-                y_data[start_idx+idx] = (y * self._y_step)
-            if y > 0 and y % percentile == 0:
-                self._debug(f" {(y/total_seqs)*100:03.1f}% compiled...        ",end="\r")
-            start_idx = end_idx
+        x_data, y_data, colors, sizes = self._compile_frame(sequences)
+        # the events to pick from, indexed when first picked
+        self._pick_data = (x_data, y_data)
+        self._pick_grid = None
+        top_y = y_data.max() if len(y_data) > 0 else 0.0
         # plot markers
         self._debug("Compiling finished...        ")
         self._debug("Plotting data...")
-        self.update_extensions(x_data=x_data, y_data=y_data, colors=colors, colour_imputer=self._colour_schemer,sequences=sequences)
+        self.update_extensions(x_data=x_data, y_data=y_data, colors=colors, colour_imputer=self._colour_schemer,sequences=sequences, sample_rate=self.sample_rate)
+        layers = self._layers
         if (self._connect_events):
-            line_data = []
-            start_idx = 0
-            for sequence in sequences:
-                    end_idx = start_idx + len(sequence)
-                    line_data.append(
-                        [
-                            (x,y)
-                            for x,y 
-                            in zip(x_data[start_idx:end_idx],y_data[start_idx:end_idx])
-                        ]
-                    )
-                    start_idx = end_idx
-            lc = LineCollection(
-                segments=line_data,
-                colors="black",
-                linewidth= self._marksize * 0.8,
-                alpha=0.13
-            )
-            ax.add_artist(lc)
+            segments, line_colors = self._connect_lines(sequences, x_data, y_data, colors)
+            if layers != None:
+                lc = layers[0]
+                lc.set_segments(segments)
+                lc.set_color(line_colors)
+            else:
+                lc = LineCollection(
+                    segments=segments,
+                    colors=line_colors,
+                    linewidth= self._marksize * 0.8,
+                    alpha=None if self._connect_colours else 0.13,
+                    rasterized=self._rasterized
+                )
+                ax.add_artist(lc)
             all_artists.append(lc)
 
-        for xers,yers,cers in zip(iter_chunker(x_data,500),iter_chunker(y_data,500),iter_chunker(colors,500)):
-            # patches = []
-            # for x,y,c in zip(xers,yers,cers):
-            #     patches.append(
-            #         Circle(
-            #             (x,y),
-            #             radius=self._marker_raidus * 0.85,
-            #             edgecolor='None',
-            #             facecolor=c,
-            #             alpha=0.80
-            #         )
-            #     )
+        min_y = -self._marksize * 3
+        max_y = top_y + self._marksize * 3
+        self._ax.set_ylim(min_y, max_y)
+        if layers != None and self._render_mode == self.RenderMode.Points:
+            artists = layers[-1]
+            artists.set_offsets(np.column_stack((x_data, y_data)))
+            artists.set_facecolors(colors)
+            artists.set_sizes(np.atleast_1d(sizes))
+        elif layers != None and self._render_mode == self.RenderMode.Density:
+            artists = layers[-1]
+            left, right = ax.get_xlim()
+            artists.set_extent((left, right, min_y, max_y))
+            self._density_data = (x_data, y_data, colors)
+            self._fit_density(force=True)
+        elif self._render_mode == self.RenderMode.Density:
+            artists = self._draw_density(ax, x_data, y_data, colors, (min_y, max_y))
+        elif self._render_mode == self.RenderMode.LevelOfDetail:
+            artists = self._start_detail(ax, x_data, y_data, colors, sizes)
+        else:
+            # draw every event in a single collection
             artists = ax.scatter(
-                x=xers,
-                y=yers,
+                x=x_data,
+                y=y_data,
                 edgecolors='none',
-                s = self._marksize,
-                facecolors=cers,
-                alpha=0.66
+                s = sizes,
+                facecolors=colors,
+                alpha=0.66,
+                rasterized=self._rasterized
             )
-            # pc = PatchCollection(
-            #     patches,
-            #     match_original=True
-            # )
-            # ax.add_artist(pc)
-            all_artists.append(artists)
+        all_artists.append(artists)
             
         # handle y ticks using y_data
-        max_y = max(y_data)+self._marksize * 3
-        self._ax.set_ylim(-self._marksize * 3, max_y)
         self._ax.set_yticks([])
-        self._ax.set_yticks([0,max(y_data)])
+        self._ax.set_yticks([0,top_y])
         self._ax.set_yticklabels([ "1",f"{int(len(sequences))}"])
         return all_artists
 
+    def _connect_lines(self, sequences:SequenceTable, x_data:np.ndarray,
+                       y_data:np.ndarray, colors:np.ndarray) -> Tuple[List[np.ndarray],Any]:
+        """
+        Builds the lines between the events of each trace from the event 
+        arrays, as a single path broken by NaNs or, when lines are coloured,
+        as a segment per trace. Returns the segments and their colours.
+        """
+        points = np.column_stack((x_data, y_data))
+        offsets = np.asarray(sequences.offsets)
+        lengths = np.diff(offsets)
+        # a trace needs at least two events to have a line
+        lined = lengths > 1
+        if not self._connect_colours:
+            # add a break after each trace, then drop the traces without lines
+            breaks = np.insert(points, offsets[1:], np.nan, axis=0)
+            return [ breaks[np.repeat(lined, lengths + 1)] ], "black"
+        segments = np.split(points, offsets[1:-1])
+        # colour each line by the first event of its trace
+        lined = np.flatnonzero(lined)
+        line_colors = np.array(colors, dtype=np.float64).reshape(-1, 4)[offsets[lined]]
+        line_colors[:, 3] *= 0.33
+        return [ segments[trace] for trace in lined ], line_colors
+
+    def _draw_density(self, ax:Axes, x_data:np.ndarray, y_data:np.ndarray,
+                      colors:np.ndarray, ylim:Tuple[float,float]) -> Artist:
+        """
+        Draws the events as a single image, with a pixel for each pixel of 
+        the axes.
+        """
+        left, right = ax.get_xlim()
+        bottom, top = ylim
+        image = density_image(x_data, y_data, colors, (left, right, bottom, top),
+                              self._density_shape(ax), blend=self._density_blend)
+        self._density_data = (x_data, y_data, colors)
+        self._density_artist = ax.imshow(
+            image,
+            extent=(left, right, bottom, top),
+            origin="lower",
+            interpolation="nearest",
+            aspect=ax.get_aspect()
+        )
+        return self._density_artist
+
+    def _density_shape(self, ax:Axes) -> Tuple[int,int]:
+        """
+        Returns the size of the axes in pixels, as rows and columns.
+        """
+        bbox = ax.get_window_extent()
+        return (max(ceil(bbox.height), 1), max(ceil(bbox.width), 1))
+
+    def _fit_density(self, force:bool=False) -> bool:
+        """
+        Redraws the density image when its size no longer matches the size
+        of its axes in pixels, e.g. once the figure has been laid out or 
+        after it is resized. Returns whether the image was redrawn.
+        """
+        image = self._density_artist
+        if image == None or image.axes == None:
+            return False
+        shape = self._density_shape(image.axes)
+        if not force and image.get_array().shape[:2] == shape:
+            return False
+        x_data, y_data, colors = self._density_data
+        image.set_data(density_image(x_data, y_data, colors, image.get_extent(),
+                                     shape, blend=self._density_blend))
+        return True
+
+    def _on_draw_density(self, event:Any) -> None:
+        if self._fit_density():
+            self._fig.canvas.draw_idle()
+
+    def _layout_density(self) -> None:
+        """
+        Lays out the figure, so that the density image is drawn with a pixel
+        for each pixel of the axes as laid out, and keeps the image fitted 
+        to its axes whenever the figure is drawn.
+        """
+        if self._density_artist == None:
+            return
+        canvas = self._fig.canvas
+        if self._density_callback != None:
+            canvas.mpl_disconnect(self._density_callback)
+        canvas.draw()
+        self._fit_density()
+        self._density_callback = canvas.mpl_connect("draw_event", self._on_draw_density)
+
+    def _start_detail(self, ax:Axes, x_data:np.ndarray, y_data:np.ndarray,
+                      colors:np.ndarray, sizes:Union[float,np.ndarray]) -> Artist:
+        """
+        Indexes the events for the level of detail mode and draws the events
+        in view. When the limits of the axes change, the events in view are
+        redrawn once, as the axes are next drawn, however many limits were
+        changed.
+        """
+        for axes, callback in self._detail_callbacks:
+            axes.callbacks.disconnect(callback)
+        if self._layers != None and self._detail_artist.axes != None:
+            self._detail_artist.remove()
+        self._detail_index = DetailIndex(x_data, y_data)
+        self._detail_colors = np.asarray(colors)
+        self._detail_sizes = sizes
+        self._detail_artist = None
+        self._detail_limits = None
+        self._detail_bounds = None
+        self._detail_callbacks = [
+            (ax, ax.callbacks.connect(signal, self._mark_detail))
+            for signal in ["xlim_changed", "ylim_changed"]
+        ]
+        if self._detail_axes is not ax:
+            # matplotlib has no event before drawing, so the axes refresh the
+            # events in view before they are drawn
+            draw = ax.draw
+            def refresh_then_draw(renderer:Any, *args:Any, **kwargs:Any) -> Any:
+                self._refresh_stale_detail()
+                return draw(renderer, *args, **kwargs)
+            ax.draw = refresh_then_draw
+            self._detail_axes = ax
+        return self._refresh_detail(ax)
+
+    def _mark_detail(self, ax:Axes) -> None:
+        self._detail_stale = True
+
+    def _refresh_stale_detail(self) -> None:
+        if self._detail_stale and self._detail_axes != None:
+            self._refresh_detail(self._detail_axes)
+
+    def _refresh_detail(self, ax:Axes) -> Artist:
+        """
+        Draws the events in view, replacing the events drawn for the last 
+        view.
+        """
+        self._detail_stale = False
+        limits = (tuple(ax.get_xlim()), tuple(ax.get_ylim()))
+        if limits == self._detail_limits:
+            return self._detail_artist
+        self._detail_limits = limits
+        bounds = self._detail_index.bounds(*limits)
+        if bounds == self._detail_bounds and self._density_artist == None:
+            # the same events are in view, and points do not depend on it
+            return self._detail_artist
+        self._detail_bounds = bounds
+        if self._detail_artist != None:
+            self._detail_artist.remove()
+        self._density_artist = None
+        visible = self._detail_index.visible(*limits)
+        x_data = self._detail_index.x[visible]
+        y_data = self._detail_index.y[visible]
+        colors = self._detail_colors[visible]
+        if len(visible) > self._detail_points:
+            self._detail_artist = self._draw_density(ax, x_data, y_data, colors, limits[1])
+        else:
+            sizes = self._detail_sizes
+            if np.ndim(sizes) > 0:
+                sizes = sizes[visible]
+            self._detail_artist = ax.scatter(
+                x=x_data,
+                y=y_data,
+                edgecolors='none',
+                s = sizes,
+                facecolors=colors,
+                alpha=0.66,
+                rasterized=self._rasterized
+            )
+        return self._detail_artist
+
+    def _pick_index(self) -> EventGrid:
+        """
+        Returns the index of the events in view, rebuilding the index when the
+        limits or size of the axes have changed since it was built.
+        """
+        bbox = self._ax.get_window_extent()
+        key = (tuple(self._ax.get_xlim()), tuple(self._ax.get_ylim()), tuple(bbox.bounds))
+        if self._pick_grid != None and self._pick_key == key:
+            return self._pick_grid
+        x_data, y_data = self._pick_data
+        (left, right), (bottom, top) = sorted(key[0]), sorted(key[1])
+        # only the events in view can be picked
+        self._pick_events = np.flatnonzero(
+            (x_data >= left) & (x_data <= right) & (y_data >= bottom) & (y_data <= top)
+        )
+        points = self._ax.transData.transform(
+            np.column_stack((x_data[self._pick_events], y_data[self._pick_events]))
+        ).reshape(-1, 2)
+        self._pick_grid = EventGrid(points[:, 0], points[:, 1],
+                                    cell=max(self._hover_radius, 1.0))
+        self._pick_key = key
+        return self._pick_grid
+
+    def nearest_event(self, x:float, y:float, radius:float=None) -> Optional[Dict[str,Any]]:
+        """
+        Returns the event drawn nearest to (x,y) in display coordinates (i.e.
+        pixels, as given by matplotlib's mouse events), or None if no event in
+        view is within radius pixels (defaults to hover_radius).\n
+        The event is described by its `trace` (the row of the chart, from
+        zero), its position in the sequences as `event`, its `label`,
+        `resource` and `timestamp` (a datetime in the timezone of the event,
+        or None if missing).\n
+        Events are found through a grid over the events in view, which is
+        built when first needed and rebuilt after zooming, panning or
+        resizing.
+        """
+        if self._pick_data == None:
+            return None
+        if radius == None:
+            radius = self._hover_radius
+        found = self._pick_index().nearest(x, y, radius)
+        if found < 0:
+            return None
+        return self._describe_event(int(self._pick_events[found]))
+
+    def _describe_event(self, event:int) -> Dict[str,Any]:
+        table = self._sequences
+        trace = int(np.searchsorted(table.offsets, event, side="right")) - 1
+        timestamp = None
+        if not np.isnan(table.timestamp[event]):
+            zone = timezone(timedelta(seconds=int(table.utc_offset[event])))
+            timestamp = datetime.fromtimestamp(float(table.timestamp[event]), tz=zone)
+        return dict(
+            trace=trace,
+            event=event,
+            label=table.label_vocab[table.label[event]],
+            resource=table.resource_vocab[table.resource[event]],
+            timestamp=timestamp
+        )
+
+    def _start_picking(self) -> None:
+        """
+        Connects the tooltip and the on_pick callback to the mouse.
+        """
+        canvas = self._fig.canvas
+        for callback in self._pick_callbacks:
+            canvas.mpl_disconnect(callback)
+        self._pick_callbacks = []
+        if self._hover:
+            if self._tooltip != None and self._tooltip.axes != None:
+                self._tooltip.remove()
+            self._tooltip = self._ax.annotate(
+                "", xy=(0,0), xytext=(8,8), textcoords="offset points",
+                fontsize=7, visible=False,
+                bbox=dict(boxstyle="round", facecolor="white", alpha=0.9)
+            )
+            self._tooltip_event = None
+            self._pick_callbacks.append(
+                canvas.mpl_connect("motion_notify_event", self._on_hover))
+        if self._on_pick != None:
+            self._pick_callbacks.append(
+                canvas.mpl_connect("button_press_event", self._on_click))
+
+    def _on_hover(self, mouse:Any) -> None:
+        found = None
+        if mouse.inaxes is self._ax:
+            found = self.nearest_event(mouse.x, mouse.y)
+        if found == None:
+            if self._tooltip_event != None:
+                self._tooltip_event = None
+                self._tooltip.set_visible(False)
+                self._fig.canvas.draw_idle()
+            return
+        if found["event"] == self._tooltip_event:
+            return
+        self._tooltip_event = found["event"]
+        x_data, y_data = self._pick_data
+        self._tooltip.xy = (x_data[found["event"]], y_data[found["event"]])
+        stamp = "missing timestamp"
+        if found["timestamp"] != None:
+            stamp = found["timestamp"].strftime('%d/%m/%Y %H:%M:%S')
+        self._tooltip.set_text(
+            f"trace {found['trace'] + 1}\n{found['label']}\n{found['resource']}\n{stamp}"
+        )
+        self._tooltip.set_visible(True)
+        self._fig.canvas.draw_idle()
+
+    def _on_click(self, mouse:Any) -> None:
+        if mouse.inaxes is not self._ax:
+            return
+        found = self.nearest_event(mouse.x, mouse.y)
+        if found != None:
+            self._on_pick(found)
+
     def plot(self) -> Figure:
         self._ax = self._adjust_for_extensions(self._fig)
+        self._layout_axes = list(self._fig.get_axes())
         self.update_plot_state(PLOT_STATE.DRAWING)
         self._debug("setting up axis for plot...")
+        self._set_axis_labels()
+        self._ax.grid(True,color="grey",alpha=0.33)
+        self.update_extensions(sequences=self._sequences, sample_rate=self.sample_rate)
+        self._layers = None
+        self._layers = self._create_dotted_frame(self._sequences,self._ax)
+        if self._hover or self._on_pick != None:
+            self._start_picking()
+        self._layout_density()
+        self._debug("Plot is ready to show...")
+        return self._fig
+
+    def rerender(self, event_log:Union[EventLog,SequenceTable,str],
+                 log_name:str=None) -> Figure:
+        """
+        Replaces the log of the chart, keeping the figure, axes and artists
+        of the chart. The log is extracted with the same options as the 
+        chart, then the data of the drawn events is swapped and only the 
+        limits, ticks and labels of the axes are updated. Extensions are 
+        redrawn within their axes.\n
+        Plots the chart if it has not been plotted yet. The log_name names 
+        the log in the title, otherwise it is found in the log.
+        """
+        if isinstance(event_log, (str, PathLike)):
+            event_log = XesStreamReader(event_log)
+        self._sequences = self._extractor(event_log, sorting=self._sorting,
+                                          sort_by=self._sort_by,
+                                          **self._extraction)
+        self._log_name = self.__class__._log_name
+        if log_name != None:
+            self._log_name = log_name
+        else:
+            self._find_log_name(event_log)
+        if self._colour_scheme != None:
+            scheme, colormap = self._colour_scheme
+            self._colour_schemer = scheme(cm=colormap)
+        if self._plot_state == PLOT_STATE.INIT or self._layers == None:
+            return self.plot()
+        # remove the colourbars of extensions, which are registered with the
+        # axes they were made for and would otherwise outlive their own axes
+        for axes in self._fig.get_axes():
+            if getattr(axes, "_colorbar", None) != None:
+                axes._colorbar.remove()
+        # clear the axes of extensions, and any axes they added when drawn
+        for axes in self._fig.get_axes():
+            if axes not in self._layout_axes:
+                axes.remove()
+            elif axes is not self._ax:
+                axes.clear()
+                axes.set_axes_locator(None)
+        self.update_plot_state(PLOT_STATE.DRAWING)
+        self._set_axis_labels()
+        self.update_extensions(sequences=self._sequences, sample_rate=self.sample_rate)
+        self._layers = self._create_dotted_frame(self._sequences,self._ax)
+        self._layout_density()
+        return self._fig
+
+    def _set_axis_labels(self) -> None:
+        """
+        Sets the limits, ticks, labels and title of the axes for the current
+        sequences.
+        """
         #clean up plot
         # self._ax.set_ylim([0,len(self._sequences) * self._marker_raidus])
         if self._sorting == self.TraceSorting.tracelength and \
             self._time_transform == self.TimeTransform.constant_per_event:
             min_x = -2 * SequenceDataExtractor._constant_time_per_event
-            max_x = len(self._sequences[-1]) * SequenceDataExtractor._constant_time_per_event
+            max_x = self._sequences.trace_lengths().max() * SequenceDataExtractor._constant_time_per_event
             diff_x = max_x
             # magic needed to make the circles really circle you know?
             self._y_step = ((self._marksize) * 3)
@@ -310,8 +850,10 @@ class StaticDottedChartPresentor(StaticPresentor):
             )    
             self._ax.set_xlabel("Event Number")
         else:
-            min_x = self._sequences[0][0].time
-            max_x = max([ seq[-1].time for seq in self._sequences if len(seq) > 0])
+            filled = self._sequences.trace_lengths() > 0
+            # the first row is not the earliest trace for every sorting
+            min_x = self._sequences.first_times()[filled].min()
+            max_x = self._sequences.last_times()[filled].max()
             # add suitable xticks 
             diff_x = max_x - min_x 
             # magic needed to make the circles really circle you know?
@@ -359,12 +901,50 @@ class StaticDottedChartPresentor(StaticPresentor):
             self._ax.set_xlabel("Time")
         #add labels
         self._ax.set_ylabel("Trace")
-        self._ax.set_title(f"Dotted Chart of\n {self._log_name}")
-        self._ax.grid(True,color="grey",alpha=0.33)
-        self.update_extensions(sequences=self._sequences)
-        self._create_dotted_frame(self._sequences,self._ax)
-        self._debug("Plot is ready to show...")
-        return self._fig
+        title = f"Dotted Chart of\n {self._log_name}"
+        if self.sample_rate < 1.0:
+            title += f"\n (sample of {self.sample_rate:.1%} of traces)"
+        if self._sequences.collapsed:
+            title += f"\n ({len(self._sequences)} variants of {self._sequences.frequencies().sum()} traces)"
+            self._ax.set_ylabel("Variant")
+        self._ax.set_title(title)
+
+    def append(self, traces:EventLog) -> SequenceTable:
+        """
+        Adds new traces to the chart, where only the new traces are extracted
+        (using the same filters as the chart) and then merged into the 
+        current trace order. Call plot again to redraw the chart.
+        """
+        self._sequences = self._extractor.append(self._sequences, traces,
+                                                 workers=self._workers,
+                                                 **self._filters)
+        if self._plot_state != PLOT_STATE.INIT:
+            self._ax.clear()
+        return self._sequences
+
+    def sort(self, trace_sorting:TraceSorting, sort_by:str=None) -> SequenceTable:
+        """
+        Changes how traces are sorted on the y-axis, by reordering the 
+        extracted traces rather than extracting the log again. Call plot 
+        again to redraw the chart.
+        """
+        self._sequences = self._extractor.sort(self._sequences, trace_sorting,
+                                               sort_by=sort_by)
+        self._sorting = trace_sorting
+        self._sort_by = sort_by
+        if self._plot_state != PLOT_STATE.INIT:
+            self._ax.clear()
+        return self._sequences
+
+    @property
+    def sample_rate(self) -> float:
+        """
+        The fraction of the log's traces that are plotted, less than one when
+        the log was sampled.
+        """
+        if self._sequences.extraction == None:
+            return 1.0
+        return self._sequences.extraction.sample_rate
 
     def get_axes(self) -> Axes:
         return self._ax
@@ -372,6 +952,12 @@ class StaticDottedChartPresentor(StaticPresentor):
     def get_figure(self) -> Figure:
         return self._fig 
 
+    def export(self, path:Union[str,PathLike], raster_dpi:int=300, 
+               **kwargs:Any) -> SaveReport:
+        # draw the events in view before finding the layers to rasterize
+        self._refresh_stale_detail()
+        return super().export(path, raster_dpi=raster_dpi, **kwargs)
+
     def _find_scale(self, seconds:float) -> Tuple[str,float]:
         if seconds < (60 * 3):
             return ("min" , 60)
@@ -0,0 +1,124 @@
+"""
+Saving charts as hybrid vector/raster files, where only the layers that
+draw events (markers, connecting lines, density images and, when there are
+many, histogram bars) are rasterized, while axes, ticks, text and colourbars
+stay as vectors.\n
+The event layers of each axes are drawn into a single image, so files of
+large logs stay small and quick to open, as each event is no longer written
+as its own shape, but the chart can still be scaled and its text selected.
+
+Call sequence:
+---
+```
+presentor = StaticDottedChartPresentor(log)
+presentor.plot()
+report = presentor.export("dotted.pdf", raster_dpi=300)
+print(report)
+```
+"""
+from typing import Any, Dict, List, Optional, Union
+from os import PathLike
+from time import perf_counter
+import os
+
+from matplotlib.artist import Artist
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+
+# formats where rasterizing only some layers makes a difference
+VECTOR_FORMATS = ("pdf", "svg", "svgz", "eps", "ps")
+# axes with more bars than this have their bars rasterized
+MAX_VECTOR_PATCHES = 500
+
+class SaveReport():
+    """
+    The outcome of saving a chart, i.e. the `path` saved to, the size of
+    the file in `bytes`, the `seconds` taken to save and the number of
+    axes whose event layers were `rasterized`, each as a single image.
+    """
+
+    def __init__(self, path:str, bytes:Optional[int], seconds:float,
+                 rasterized:int) -> None:
+        self.path = path
+        self.bytes = bytes
+        self.seconds = seconds
+        self.rasterized = rasterized
+
+    def __repr__(self) -> str:
+        size = "unknown size" if self.bytes == None else f"{self.bytes / 1e6:.2f}MB"
+        return f"SaveReport({self.path!r}, {size}, {self.seconds:.2f}s, rasterized={self.rasterized})"
+
+def event_layers(axes:Axes, max_vector_patches:int=MAX_VECTOR_PATCHES) -> List[Artist]:
+    """
+    Returns the layers of the axes that draw events or bins, i.e. its
+    collections and images, and its patches when there are more than 
+    max_vector_patches of them. Colourbars have no event layers.
+    """
+    if getattr(axes, "_colorbar", None) != None:
+        return []
+    layers = list(axes.collections) + list(axes.images)
+    if len(axes.patches) > max_vector_patches:
+        layers.extend(axes.patches)
+    return [ layer for layer in layers if layer.get_visible() ]
+
+def _format(path:Union[str,PathLike], format:str=None) -> str:
+    if format != None:
+        return format.lower()
+    return os.path.splitext(os.fspath(path))[1].lower().lstrip(".")
+
+def _lower_layers(axes:Axes, layers:List[Artist]) -> Dict[Artist,float]:
+    """
+    Moves the layers below every other artist of the axes, keeping their
+    order, and sets the rasterization zorder of the axes so that the layers
+    are drawn as one image. Returns the previous zorder of each layer.
+    """
+    previous = dict( (layer, layer.get_zorder()) for layer in layers )
+    others = [ child.get_zorder() for child in axes.get_children()
+               if child not in previous and child is not axes.patch ]
+    top = max(previous.values())
+    bottom = min(others) if len(others) > 0 else top + 1.0
+    shift = max(top - bottom + 1.0, 0.0)
+    for layer, zorder in previous.items():
+        layer.set_zorder(zorder - shift)
+    # artists up to the rasterization zorder are drawn as one image
+    axes.set_rasterization_zorder((top - shift + bottom) / 2)
+    return previous
+
+def save_hybrid(fig:Figure, path:Union[str,PathLike], raster_dpi:int=300,
+                max_vector_patches:int=MAX_VECTOR_PATCHES,
+                **kwargs:Any) -> SaveReport:
+    """
+    Saves the figure, rasterizing the event layers of each axes into a
+    single image at raster_dpi when saving to a vector format (see 
+    VECTOR_FORMATS), see event_layers for max_vector_patches. Other formats
+    are saved as given. Other keyword arguments are passed to 
+    `Figure.savefig`.\n
+    The order of the layers and the rasterization of each axes are restored
+    after saving.
+    """
+    format = _format(path, kwargs.get("format", None))
+    grouped = []
+    if format in VECTOR_FORMATS:
+        grouped = [ (axes, event_layers(axes, max_vector_patches)) 
+                    for axes in fig.get_axes() ]
+        grouped = [ (axes, layers) for axes, layers in grouped if len(layers) > 0 ]
+        kwargs["dpi"] = raster_dpi
+    restore = []
+    start = perf_counter()
+    try :
+        for axes, layers in grouped:
+            restore.append(
+                (axes, axes.get_rasterization_zorder(), _lower_layers(axes, layers))
+            )
+        fig.savefig(path, **kwargs)
+    finally:
+        for axes, zorder, previous in restore:
+            axes.set_rasterization_zorder(zorder)
+            for layer, layer_zorder in previous.items():
+                layer.set_zorder(layer_zorder)
+    seconds = perf_counter() - start
+    size = None
+    if isinstance(path, (str, PathLike)):
+        size = os.path.getsize(path)
+        path = os.fspath(path)
+    return SaveReport(path, size, seconds, len(grouped))
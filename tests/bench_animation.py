@@ -0,0 +1,38 @@
+from vispm.helpers.handlers.log_runners import SequenceDataExtractor
+from vispm.animation.dotted import AnimatedDottedChartPresentor
+
+from time import perf_counter
+import sys
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+from bench_dotted_scatter import make_log
+
+def bench(table, mode:str, frames:int=60) -> tuple:
+    """
+    Times each frame of the sweep when blitting, as it would be shown.
+    """
+    presentor = AnimatedDottedChartPresentor(table, frames=frames, debug=False,
+                                             render_mode=mode)
+    animation = presentor.animate()
+    fig = presentor.get_figure()
+    fig.canvas.draw()
+    animation._init_draw()
+    times = []
+    for frame in range(frames):
+        start = perf_counter()
+        animation._draw_next_frame(frame, blit=True)
+        times.append(perf_counter() - start)
+    plt.close(fig)
+    return sum(times) / frames, times[0], times[-1]
+
+if __name__ == "__main__":
+    traces = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    table = SequenceDataExtractor()(make_log(traces))
+    print(f"animating {len(table)} traces ({table.num_events} events)")
+    print(f"{'mode':>8} {'mean':>8} {'first':>8} {'last':>8}")
+    for mode in ("points", "density"):
+        mean, first, last = bench(table, mode)
+        print(f"{mode:>8} {mean:>8.3f} {first:>8.3f} {last:>8.3f}")
@@ -0,0 +1,54 @@
+from vispm.static.batch import RenderJob, render_batch
+from vispm.static.dotted import StaticDottedChartPresentor
+
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import os
+import sys
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+from bench_dotted_scatter import make_log
+
+def jobs(logs:list, directory:str) -> list:
+    """
+    Creates a job per log and colour scheme, saving a png and a pdf.
+    """
+    return [
+        RenderJob(log, [
+                os.path.join(directory, f"log{number}_{scheme.name}.png"),
+                os.path.join(directory, f"log{number}_{scheme.name}.pdf")
+            ],
+            event_colour_scheme=scheme
+        )
+        for number, log in enumerate(logs)
+        for scheme in StaticDottedChartPresentor.EventColourScheme
+    ]
+
+def serial(logs:list, directory:str) -> None:
+    """
+    Renders the same charts one after another, extracting for each chart.
+    """
+    for job in jobs(logs, directory):
+        presentor = StaticDottedChartPresentor(job.event_log, debug=False,
+                                               **job.options)
+        fig = presentor.plot()
+        for path in job.paths:
+            fig.savefig(path)
+        plt.close(fig)
+
+if __name__ == "__main__":
+    traces = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    logs = [ make_log(traces, seed=seed) for seed in range(3) ]
+    with TemporaryDirectory() as directory:
+        start = perf_counter()
+        serial(logs, directory)
+        print(f"serial {perf_counter() - start:.2f}s")
+        start = perf_counter()
+        results = render_batch(jobs(logs, directory), workers=workers)
+        print(f"batch {perf_counter() - start:.2f}s over {workers if workers > 0 else os.cpu_count()} workers")
+        for result in results:
+            print(f"  {os.path.basename(result.job.paths[0]):>24} {result}")
@@ -0,0 +1,86 @@
+from vispm.helpers.handlers.log_runners import SequenceDataExtractor
+from vispm.static.dotted import StaticDottedChartPresentor
+
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+from random import Random
+from time import perf_counter
+import sys
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+def make_log(traces:int, seed:int=42, resources:int=1):
+    """
+    Creates a pm4py-like log (a list of traces of event mappings), where 
+    events are done by one of the given number of resources.
+    """
+    rand = Random(seed)
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    activities = [ f"activity {i}" for i in range(25) ]
+    users = [ f"user {i}" for i in range(resources) ]
+    log = []
+    for _ in range(traces):
+        curr = start + timedelta(hours=rand.randint(0, 24 * 365))
+        trace = []
+        for _ in range(rand.randint(3, 30)):
+            curr = curr + timedelta(minutes=rand.randint(1, 600))
+            trace.append({
+                "time:timestamp" : curr,
+                "concept:name" : rand.choice(activities),
+                "lifecycle:transition" : "complete",
+                "org:resource" : rand.choice(users),
+            })
+        log.append(trace)
+    return log
+
+def chunk_scatter(presentor:StaticDottedChartPresentor, size:int=500) -> None:
+    """
+    Replaces the dotted layer with the previous layout, i.e. a scatter call
+    for each chunk of 500 events.
+    """
+    ax = presentor.get_axes()
+    layer = ax.collections[-1]
+    points = layer.get_offsets()
+    colours = layer.get_facecolors()
+    layer.remove()
+    for start in range(0, len(points), size):
+        ax.scatter(
+            x=points[start:start+size,0],
+            y=points[start:start+size,1],
+            edgecolors='none',
+            s=presentor._marksize,
+            facecolors=colours[start:start+size],
+            alpha=0.66
+        )
+
+def bench(table, layout:str) -> tuple:
+    presentor = StaticDottedChartPresentor(table, debug=False,
+                    rasterized=layout == "rasterized")
+    presentor.plot()
+    if layout == "chunked":
+        chunk_scatter(presentor)
+    fig = presentor.get_figure()
+    # the first draw also lays out the figure, so is not timed
+    fig.canvas.draw()
+    times = []
+    start = perf_counter()
+    fig.canvas.draw()
+    times.append(perf_counter() - start)
+    for format in ("png", "pdf"):
+        start = perf_counter()
+        fig.savefig(BytesIO(), format=format)
+        times.append(perf_counter() - start)
+    collections = len(presentor.get_axes().collections)
+    plt.close(fig)
+    return (collections, *times)
+
+if __name__ == "__main__":
+    traces = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    table = SequenceDataExtractor()(make_log(traces))
+    print(f"plotting {len(table)} traces ({table.num_events} events)")
+    print(f"{'layout':>12} {'collections':>12} {'draw':>8} {'png':>8} {'pdf':>8}")
+    for layout in ("chunked", "single", "rasterized"):
+        collections, draw, png, pdf = bench(table, layout)
+        print(f"{layout:>12} {collections:>12d} {draw:>8.3f} {png:>8.3f} {pdf:>8.3f}")
@@ -0,0 +1,40 @@
+from vispm.helpers.handlers.log_runners import SequenceDataExtractor
+from vispm.static.dotted import StaticDottedChartPresentor
+from vispm.extensions.dotted.event_histogram import DottedEventHistogramExtension
+
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import sys
+import os
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+from bench_dotted_scatter import make_log
+
+def bench(table, directory:str, fmt:str, raster_dpi:int=300) -> tuple:
+    """
+    Compares the size and save time of a chart saved as vectors, and saved 
+    with only the events and bins rasterized.
+    """
+    presentor = StaticDottedChartPresentor(table, debug=False, connect_events=True)
+    presentor.add_extension(DottedEventHistogramExtension(debug=False))
+    fig = presentor.plot()
+    path = os.path.join(directory, f"vector.{fmt}")
+    start = perf_counter()
+    fig.savefig(path)
+    vector = (os.path.getsize(path), perf_counter() - start)
+    report = presentor.export(os.path.join(directory, f"hybrid.{fmt}"), raster_dpi=raster_dpi)
+    plt.close(fig)
+    return vector, (report.bytes, report.seconds)
+
+if __name__ == "__main__":
+    traces = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    table = SequenceDataExtractor()(make_log(traces))
+    print(f"exporting {len(table)} traces ({table.num_events} events)")
+    print(f"{'format':>6} {'vector MB':>10} {'seconds':>8} {'hybrid MB':>10} {'seconds':>8}")
+    with TemporaryDirectory() as directory:
+        for fmt in ("svg", "pdf"):
+            (vb, vs), (hb, hs) = bench(table, directory, fmt)
+            print(f"{fmt:>6} {vb/1e6:>10.2f} {vs:>8.2f} {hb/1e6:>10.2f} {hs:>8.2f}")
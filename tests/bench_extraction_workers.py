@@ -0,0 +1,29 @@
+from vispm.helpers.handlers.log_runners import SequenceDataExtractor
+
+from os import cpu_count
+from time import perf_counter
+
+from bench_dotted_scatter import make_log
+
+def bench(log, workers:int, repeats:int=3) -> float:
+    best = None
+    for _ in range(repeats):
+        start = perf_counter()
+        SequenceDataExtractor()(log, workers=workers)
+        took = perf_counter() - start
+        best = took if best == None else min(best, took)
+    return best
+
+if __name__ == "__main__":
+    log = make_log(50000, resources=60)
+    events = sum(len(trace) for trace in log)
+    print(f"extracting {len(log)} traces ({events} events)")
+    counts = [1]
+    while counts[-1] * 2 <= cpu_count():
+        counts.append(counts[-1] * 2)
+    serial = None
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+    for workers in counts:
+        took = bench(log, workers)
+        serial = took if serial == None else serial
+        print(f"{workers:>8d} {took:>10.3f} {serial/took:>8.2f}")
@@ -0,0 +1,48 @@
+from vispm.helpers.handlers.log_runners import SequenceDataExtractor
+from vispm.static.dotted import StaticDottedChartPresentor
+
+from time import perf_counter
+import sys
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+from bench_dotted_scatter import make_log
+
+def bench(table, mode:str, steps:int=20) -> tuple:
+    """
+    Times drawing the whole chart, zooming into a fiftieth of each axis and
+    then panning across the log a quarter view at a time.
+    """
+    presentor = StaticDottedChartPresentor(table, debug=False, render_mode=mode)
+    fig = presentor.plot()
+    ax = presentor.get_axes()
+    fig.canvas.draw()
+    left, right = ax.get_xlim()
+    bottom, top = ax.get_ylim()
+    width = (right - left) / 50
+    start = perf_counter()
+    fig.canvas.draw()
+    full = perf_counter() - start
+    start = perf_counter()
+    ax.set_xlim(left, left + width)
+    ax.set_ylim(bottom, bottom + (top - bottom) / 50)
+    fig.canvas.draw()
+    zoom = perf_counter() - start
+    start = perf_counter()
+    for step in range(steps):
+        ax.set_xlim(left + step * width / 4, left + step * width / 4 + width)
+        fig.canvas.draw()
+    pan = (perf_counter() - start) / steps
+    plt.close(fig)
+    return full, zoom, pan
+
+if __name__ == "__main__":
+    traces = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    table = SequenceDataExtractor()(make_log(traces))
+    print(f"plotting {len(table)} traces ({table.num_events} events)")
+    print(f"{'mode':>8} {'full':>8} {'zoom':>8} {'pan':>8}")
+    for mode in ("points", "density", "lod"):
+        full, zoom, pan = bench(table, mode)
+        print(f"{mode:>8} {full:>8.3f} {zoom:>8.3f} {pan:>8.3f}")
@@ -0,0 +1,43 @@
+from vispm.helpers.handlers.log_runners import SequenceDataExtractor
+from vispm.static.dotted import StaticDottedChartPresentor
+
+from time import perf_counter
+import sys
+
+import numpy as np
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+from bench_dotted_scatter import make_log
+
+def bench(table, queries:int=500) -> tuple:
+    """
+    Times building the index of the events in view, then finding the event
+    nearest to the position of randomly chosen events.
+    """
+    presentor = StaticDottedChartPresentor(table, debug=False)
+    fig = presentor.plot()
+    fig.canvas.draw()
+    ax = presentor.get_axes()
+    x_data, y_data = presentor._pick_data
+    start = perf_counter()
+    presentor.nearest_event(0, 0)
+    build = perf_counter() - start
+    chosen = np.random.default_rng(0).integers(0, len(x_data), queries)
+    points = ax.transData.transform(np.column_stack((x_data[chosen], y_data[chosen])))
+    times = []
+    for x, y in points:
+        start = perf_counter()
+        presentor.nearest_event(x, y)
+        times.append(perf_counter() - start)
+    plt.close(fig)
+    return build, np.mean(times), np.percentile(times, 99)
+
+if __name__ == "__main__":
+    traces = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    table = SequenceDataExtractor()(make_log(traces))
+    print(f"picking from {len(table)} traces ({table.num_events} events)")
+    build, mean, p99 = bench(table)
+    print(f"build {build*1e3:.1f}ms, query mean {mean*1e3:.3f}ms, p99 {p99*1e3:.3f}ms")
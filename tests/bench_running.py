@@ -0,0 +1,39 @@
+from vispm.running.dotted import RunningDottedChartPresentor
+from vispm.running.sources import replay
+
+from time import perf_counter
+import sys
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+from bench_dotted_scatter import make_log
+
+def bench(events:list, window:int=None, refresh_rate:float=4.0) -> tuple:
+    """
+    Times pushing a stream of events, counting the redraws of the chart.
+    """
+    presentor = RunningDottedChartPresentor(debug=False, window=window,
+                                            refresh_rate=refresh_rate)
+    fig = presentor.get_figure()
+    draws = [ 0 ]
+    draw = fig.canvas.draw_idle
+    def counted():
+        draws[0] += 1
+        draw()
+    fig.canvas.draw_idle = counted
+    start = perf_counter()
+    presentor.consume(events)
+    seconds = perf_counter() - start
+    plt.close(fig)
+    return seconds, draws[0], presentor.buffer.capacity
+
+if __name__ == "__main__":
+    traces = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    events = list(replay(make_log(traces)))
+    print(f"streaming {len(events)} events")
+    print(f"{'window':>8} {'seconds':>8} {'draws':>8} {'capacity':>10}")
+    for window in (None, 100000, 10000):
+        seconds, draws, capacity = bench(events, window=window)
+        print(f"{str(window):>8} {seconds:>8.2f} {draws:>8} {capacity:>10}")
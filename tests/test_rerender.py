@@ -0,0 +1,42 @@
+from vispm.static.dotted import StaticDottedChartPresentor
+from vispm.extensions.dotted.colour_histogram import DottedColourHistogramExtension
+from vispm.extensions.dotted.description_histogram import DescriptionHistogramExtension
+from vispm.extensions.dotted.event_histogram import DottedEventHistogramExtension
+
+from io import BytesIO
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt
+
+from bench_dotted_scatter import make_log
+
+EXTENSIONS = {
+    "colour histogram" : lambda: DottedColourHistogramExtension(debug=False),
+    "description histogram" : lambda: DescriptionHistogramExtension(debug=False),
+    "event histogram" : lambda: DottedEventHistogramExtension(debug=False),
+}
+
+def rerender_then_save(extension, render_mode:str) -> int:
+    """
+    Plots a chart with the extension, re-renders it with two other logs and
+    saves it after each, returning the number of axes left in the figure.
+    """
+    presentor = StaticDottedChartPresentor(make_log(300, seed=1),
+                                           render_mode=render_mode,
+                                           debug=False)
+    presentor.add_extension(extension)
+    fig = presentor.plot()
+    fig.savefig(BytesIO(), format="png")
+    for seed in (2, 1):
+        fig = presentor.rerender(make_log(300, seed=seed))
+        fig.savefig(BytesIO(), format="png")
+    axes = len(fig.get_axes())
+    plt.close(fig)
+    return axes
+
+if __name__ == "__main__":
+    for mode in ("points", "density", "lod"):
+        for name, extension in EXTENSIONS.items():
+            axes = rerender_then_save(extension(), mode)
+            print(f"{mode:>8} {name:>22} :: saved after rerender, {axes} axes")